@@ -4,20 +4,20 @@ Sophisticated LLM processing with enhanced prompt engineering and multi-step ana
 """
 
 import torch
-from transformers import (
-    AutoTokenizer, AutoModelForCausalLM, AutoModelForSeq2SeqLM,
-    BitsAndBytesConfig, pipeline
-)
+import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 import re
 import time
 from datetime import datetime
 
 from config import config
+from component_cache import content_key, get_component_cache
 from content_analyzer import ContentAnalysis
+from model_registry import get_causal_lm, get_seq2seq
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -42,6 +42,22 @@ class LLMAnalysisResult:
     confidence_factors: Dict[str, float]
     processing_time: float
 
+# Longest shared prefix kept in the cache; leaves room for the task suffix within 2048 tokens
+PREFIX_MAX_TOKENS = 1536
+
+
+def _repeat_cache(cache: Any, n: int) -> Any:
+    """
+    Copy of a key/value cache with its batch dimension repeated n times
+
+    generate() extends the cache it is given in place, so every call gets its
+    own copy and the prefix cache stays reusable.
+    """
+    legacy = cache.to_legacy_cache() if hasattr(cache, "to_legacy_cache") else cache
+    repeated = tuple(tuple(t.repeat(n, 1, 1, 1) for t in layer) for layer in legacy)
+    return type(cache).from_legacy_cache(repeated) if hasattr(cache, "from_legacy_cache") else repeated
+
+
 class AdvancedLLMProcessor:
     """Sophisticated LLM processor for fact-checking analysis"""
     
@@ -52,38 +68,22 @@ class AdvancedLLMProcessor:
         self.model_path = config.LLAMA_MODEL_PATH
         self.max_length = config.MAX_LENGTH
         self.temperature = config.TEMPERATURE
+        self.do_sample = config.LLM_DO_SAMPLE
+        self._load_lock = threading.Lock()
         
     def load_model(self):
-        """Load the LLM model with optimizations"""
+        """Load the model once; concurrent first requests wait for the same load"""
+        with self._load_lock:
+            if self.model is None:
+                self._load_model()
+
+    def _load_model(self):
+        """Load the LLM model from the shared registry (4-bit quantized on CUDA)"""
         logger.info(f"🤖 Loading advanced LLM model: {self.model_path}")
         
         try:
-            # Configure quantization for memory efficiency
-            if self.device == "cuda" and torch.cuda.is_available():
-                quantization_config = BitsAndBytesConfig(
-                    load_in_4bit=True,
-                    bnb_4bit_compute_dtype=torch.float16,
-                    bnb_4bit_use_double_quant=True,
-                    bnb_4bit_quant_type="nf4"
-                )
-                
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_path,
-                    quantization_config=quantization_config,
-                    device_map="auto",
-                    torch_dtype=torch.float16
-                )
-                logger.info("✅ Model loaded with 4-bit quantization on CUDA")
-            else:
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_path,
-                    torch_dtype=torch.float32
-                )
-                logger.info("✅ Model loaded on CPU")
-            
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer, self.model = get_causal_lm(self.model_path)
+            logger.info(f"✅ Model ready on {self.model.device}")
                 
         except Exception as e:
             logger.error(f"❌ Failed to load model: {e}")
@@ -92,12 +92,9 @@ class AdvancedLLMProcessor:
             self._load_fallback_model()
     
     def _load_fallback_model(self):
-        """Load fallback T5 model"""
+        """Load fallback T5 model (shared with the paraphraser)"""
         try:
-            self.model = AutoModelForSeq2SeqLM.from_pretrained("t5-base")
-            self.tokenizer = AutoTokenizer.from_pretrained("t5-base")
-            if self.device == "cuda":
-                self.model = self.model.to(self.device)
+            self.tokenizer, self.model = get_seq2seq("t5-base")
             logger.info("✅ Fallback T5 model loaded")
         except Exception as e:
             logger.error(f"❌ Failed to load fallback model: {e}")
@@ -116,27 +113,41 @@ class AdvancedLLMProcessor:
         start_time = time.time()
         
         if not self.model:
-            self.load_model()
+            await asyncio.get_event_loop().run_in_executor(None, self.load_model)
         
         logger.info(f"🧠 Processing advanced LLM analysis for: {content_analysis.original_claim[:100]}...")
         
-        # Step 1: Multi-step analysis
-        reasoning_chain = []
-        
-        # Step 1a: Initial fact assessment
-        fact_assessment = await self._assess_factual_content(content_analysis)
-        reasoning_chain.append(f"Fact Assessment: {fact_assessment}")
-        
-        # Step 1b: Source credibility evaluation
-        credibility_assessment = await self._evaluate_source_credibility(content_analysis)
-        reasoning_chain.append(f"Source Credibility: {credibility_assessment}")
-        
-        # Step 1c: Evidence consistency analysis
-        consistency_analysis = await self._analyze_evidence_consistency(content_analysis)
-        reasoning_chain.append(f"Evidence Consistency: {consistency_analysis}")
+        # Every prompt is the same evidence prefix followed by a task; the
+        # prefix is prefilled once (on the first cache miss) and its key/value
+        # cache reused by all four
+        prefix = self._create_shared_prefix(content_analysis)
+        prefills: Dict[str, Any] = {}
+        
+        # Step 1: Multi-step analysis. Fact assessment, source credibility and
+        # evidence consistency are independent, so they run as one batch
+        fact_assessment, credibility_assessment, consistency_analysis = await self._generate_llm_responses(
+            prefix,
+            [
+                self._create_fact_assessment_task(),
+                self._create_credibility_task(),
+                self._create_consistency_task(),
+            ],
+            max_tokens=[200, 150, 200],
+            prefills=prefills
+        )
+        reasoning_chain = [
+            f"Fact Assessment: {fact_assessment}",
+            f"Source Credibility: {credibility_assessment}",
+            f"Evidence Consistency: {consistency_analysis}",
+        ]
         
         # Step 2: Generate comprehensive analysis
-        comprehensive_analysis = await self._generate_comprehensive_analysis(content_analysis, reasoning_chain)
+        comprehensive_analysis = (await self._generate_llm_responses(
+            prefix,
+            [self._create_comprehensive_task(reasoning_chain)],
+            max_tokens=[500],
+            prefills=prefills
+        ))[0]
         
         # Step 3: Calculate sophisticated scores
         scores = self._calculate_sophisticated_scores(content_analysis, comprehensive_analysis)
@@ -169,36 +180,13 @@ class AdvancedLLMProcessor:
         
         return result
     
-    async def _assess_factual_content(self, analysis: ContentAnalysis) -> str:
-        """Assess factual content of the claim"""
-        prompt = self._create_fact_assessment_prompt(analysis)
-        response = await self._generate_llm_response(prompt, max_tokens=200)
-        return response
-    
-    async def _evaluate_source_credibility(self, analysis: ContentAnalysis) -> str:
-        """Evaluate credibility of sources"""
-        prompt = self._create_credibility_prompt(analysis)
-        response = await self._generate_llm_response(prompt, max_tokens=150)
-        return response
-    
-    async def _analyze_evidence_consistency(self, analysis: ContentAnalysis) -> str:
-        """Analyze consistency of evidence"""
-        prompt = self._create_consistency_prompt(analysis)
-        response = await self._generate_llm_response(prompt, max_tokens=200)
-        return response
-    
-    async def _generate_comprehensive_analysis(self, analysis: ContentAnalysis, reasoning_chain: List[str]) -> str:
-        """Generate comprehensive final analysis"""
-        prompt = self._create_comprehensive_prompt(analysis, reasoning_chain)
-        response = await self._generate_llm_response(prompt, max_tokens=500)
-        return response
-    
-    def _create_fact_assessment_prompt(self, analysis: ContentAnalysis) -> str:
-        """Create prompt for factual assessment"""
+    def _create_shared_prefix(self, analysis: ContentAnalysis) -> str:
+        """Claim and evidence block shared by every prompt of a request"""
         structured_data = analysis.structured_json_for_llm
+        credibility_data = analysis.source_credibility_analysis
         
-        prompt = f"""
-Analyze the following claim for factual accuracy based on the evidence provided:
+        prefix = f"""
+You are fact-checking the following claim against the evidence collected for it.
 
 CLAIM: {analysis.original_claim}
 
@@ -213,24 +201,6 @@ KEY SUPPORTING EVIDENCE:
 KEY CONTRADICTING EVIDENCE:
 {self._format_evidence_list(analysis.contradicting_articles[:3])}
 
-Provide a factual assessment focusing on:
-1. What aspects of the claim can be verified
-2. What aspects are disputed or unverified
-3. The quality and reliability of available evidence
-
-Assessment:"""
-        
-        return prompt
-    
-    def _create_credibility_prompt(self, analysis: ContentAnalysis) -> str:
-        """Create prompt for source credibility evaluation"""
-        credibility_data = analysis.source_credibility_analysis
-        
-        prompt = f"""
-Evaluate the credibility of sources for this fact-check:
-
-CLAIM: {analysis.original_claim}
-
 SOURCE CREDIBILITY ANALYSIS:
 - Overall credibility score: {credibility_data['overall_credibility_score']:.2f}
 - High credibility sources: {credibility_data['credibility_distribution']['high']}
@@ -240,17 +210,6 @@ SOURCE CREDIBILITY ANALYSIS:
 MOST CREDIBLE SOURCES:
 {self._format_credible_sources(credibility_data['most_credible_sources'][:3])}
 
-Evaluate the source reliability and its impact on the analysis:"""
-        
-        return prompt
-    
-    def _create_consistency_prompt(self, analysis: ContentAnalysis) -> str:
-        """Create prompt for evidence consistency analysis"""
-        prompt = f"""
-Analyze the consistency of evidence for this claim:
-
-CLAIM: {analysis.original_claim}
-
 EVIDENCE DISTRIBUTION:
 - Supporting: {len(analysis.supporting_articles)}
 - Contradicting: {len(analysis.contradicting_articles)}
@@ -264,24 +223,45 @@ REGIONAL DIVERSITY:
 - Regions covered: {analysis.regional_analysis['total_regions']}
 - Diversity score: {analysis.regional_analysis['regional_diversity_score']:.2f}
 
-Analyze the consistency and reliability of the evidence pattern:"""
+COMPLETE EVIDENCE SUMMARY:
+{json.dumps(structured_data, indent=2)[:1500]}...
+"""
         
-        return prompt
+        return prefix
     
-    def _create_comprehensive_prompt(self, analysis: ContentAnalysis, reasoning_chain: List[str]) -> str:
-        """Create comprehensive analysis prompt"""
-        prompt = f"""
-Provide a comprehensive fact-check analysis based on all available evidence:
+    def _create_fact_assessment_task(self) -> str:
+        """Task suffix for factual assessment"""
+        return """
+TASK: Analyze the claim for factual accuracy based on the evidence above.
 
-CLAIM: {analysis.original_claim}
+Provide a factual assessment focusing on:
+1. What aspects of the claim can be verified
+2. What aspects are disputed or unverified
+3. The quality and reliability of available evidence
+
+Assessment:"""
+    
+    def _create_credibility_task(self) -> str:
+        """Task suffix for source credibility evaluation"""
+        return """
+TASK: Evaluate the credibility of the sources for this fact-check.
+
+Evaluate the source reliability and its impact on the analysis:"""
+    
+    def _create_consistency_task(self) -> str:
+        """Task suffix for evidence consistency analysis"""
+        return """
+TASK: Analyze the consistency of the evidence for this claim, including its temporal and regional spread.
 
+Analyze the consistency and reliability of the evidence pattern:"""
+    
+    def _create_comprehensive_task(self, reasoning_chain: List[str]) -> str:
+        """Task suffix for the final comprehensive analysis"""
+        return f"""
 PREVIOUS ANALYSIS STEPS:
 {chr(10).join(reasoning_chain)}
 
-COMPLETE EVIDENCE SUMMARY:
-{json.dumps(analysis.structured_json_for_llm, indent=2)[:1500]}...
-
-Provide a comprehensive analysis including:
+TASK: Provide a comprehensive fact-check analysis based on all available evidence, including:
 1. Factual summary of what is actually true
 2. Truth percentage (0-100%)
 3. Confidence level (0-100%)
@@ -290,35 +270,165 @@ Provide a comprehensive analysis including:
 6. Regional and temporal context impact
 
 Comprehensive Analysis:"""
+    
+    async def _prefill_prefix(self, prefix: str) -> Optional[Tuple[Any, Any]]:
+        """
+        Run the shared prefix through the model once: (prefix ids, key/value cache)
         
-        return prompt
+        None for encoder-decoder models (the T5 fallback) or when prefill
+        fails; prompts are then encoded in full.
+        """
+        if getattr(self.model.config, "is_encoder_decoder", False):
+            return None
+        try:
+            prefix_ids = self.tokenizer(
+                prefix, return_tensors="pt", max_length=PREFIX_MAX_TOKENS, truncation=True
+            ).input_ids.to(self.model.device)
+            return await asyncio.get_event_loop().run_in_executor(None, self._prefill, prefix_ids)
+        except Exception as e:
+            logger.warning(f"⚠️ Prefix prefill failed, encoding prompts in full: {e}")
+            return None
     
-    async def _generate_llm_response(self, prompt: str, max_tokens: int = 300) -> str:
-        """Generate response from LLM"""
+    def _prefill(self, prefix_ids) -> Tuple[Any, Any]:
+        with torch.no_grad():
+            outputs = self.model(input_ids=prefix_ids, use_cache=True)
+        return prefix_ids, outputs.past_key_values
+    
+    async def _generate_llm_responses(self, prefix: str, tasks: List[str], max_tokens: List[int],
+                                      prefills: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Responses to `prefix + task` for each task, from the cache or one batched generate() call
+        
+        Greedy responses are cached by model, prompt and token budget;
+        sampled ones are not, since they differ between calls. When
+        `prefills` is given, the prefix is prefilled on the first cache miss
+        and the state kept there for later calls with the same prefix.
+        """
+        cache = get_component_cache("llm_outputs") if not self.do_sample else None
+        model_name = getattr(self.model, "name_or_path", self.model_path)
+        keys = [
+            content_key(model_name, limit, prefix + task)
+            for task, limit in zip(tasks, max_tokens)
+        ]
+        responses = await cache.get_many_async(keys) if cache is not None else [None] * len(tasks)
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if not missing:
+            logger.info(f"♻️ LLM output cache hit for {len(tasks)} prompts")
+            return responses
+        
+        prefix_state = None
+        if prefills is not None:
+            if prefix not in prefills:
+                prefills[prefix] = await self._prefill_prefix(prefix)
+            prefix_state = prefills[prefix]
+        
+        generated = await self._generate_uncached(
+            prefix, [tasks[i] for i in missing], [max_tokens[i] for i in missing], prefix_state
+        )
+        if generated is None:
+            generated = ["Analysis unavailable due to processing error."] * len(missing)
+        elif cache is not None:
+            await cache.put_many_async((keys[i], response) for i, response in zip(missing, generated))
+        for i, response in zip(missing, generated):
+            responses[i] = response
+        return responses
+    
+    async def _generate_uncached(self, prefix: str, tasks: List[str], max_tokens: List[int],
+                                 prefix_state: Optional[Tuple[Any, Any]] = None) -> Optional[List[str]]:
+        """
+        Generate responses to `prefix + task` for each task with one batched generate() call
+        
+        With a prefilled prefix only the task suffixes are run through the
+        model before decoding; otherwise full prompts are left-padded (see
+        model_registry.get_causal_lm). Each row is cut to its own token
+        budget. Generation runs off the event loop. None if generation fails.
+        """
+        loop = asyncio.get_event_loop()
+        if prefix_state is not None:
+            try:
+                # Tokenize on the loop thread; the fast tokenizer is not safe to share across threads
+                suffix_ids = [
+                    self.tokenizer(task, add_special_tokens=False, return_tensors="pt").input_ids[0]
+                    for task in tasks
+                ]
+                new_tokens = await loop.run_in_executor(
+                    None, self._generate_from_prefix, prefix_state, suffix_ids, max(max_tokens)
+                )
+                return self._decode_rows(new_tokens, max_tokens)
+            except Exception as e:
+                logger.warning(f"⚠️ Prefix-cached generation failed, encoding prompts in full: {e}")
+        
         try:
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=2048, truncation=True)
+            inputs = self.tokenizer(
+                [prefix + task for task in tasks], return_tensors="pt", padding=True, max_length=2048, truncation=True
+            ).to(self.model.device)
             
-            if self.device == "cuda" and torch.cuda.is_available():
-                inputs = inputs.to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=self.temperature,
-                    do_sample=True,
-                    top_k=50,
-                    top_p=0.95,
-                    pad_token_id=self.tokenizer.eos_token_id
-                )
+            outputs = await loop.run_in_executor(
+                None, self._generate, inputs, max(max_tokens)
+            )
             
-            # Decode only the new tokens
-            response = self.tokenizer.decode(outputs[0][inputs.shape[1]:], skip_special_tokens=True)
-            return response.strip()
+            # Keep only the new tokens (encoder-decoder outputs contain no prompt)
+            prompt_length = 0 if getattr(self.model.config, "is_encoder_decoder", False) else inputs["input_ids"].shape[1]
+            return self._decode_rows(outputs[:, prompt_length:], max_tokens)
             
         except Exception as e:
             logger.error(f"❌ LLM generation failed: {e}")
-            return "Analysis unavailable due to processing error."
+            return None
+    
+    def _decode_rows(self, new_tokens, max_tokens: List[int]) -> List[str]:
+        return [
+            self.tokenizer.decode(row[:limit], skip_special_tokens=True).strip()
+            for row, limit in zip(new_tokens, max_tokens)
+        ]
+    
+    def _sampling_kwargs(self) -> Dict[str, Any]:
+        if not self.do_sample:
+            return {"do_sample": False}
+        return {"do_sample": True, "temperature": self.temperature, "top_k": 50, "top_p": 0.95}
+    
+    def _generate(self, inputs, max_new_tokens: int):
+        with torch.no_grad():
+            return self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **self._sampling_kwargs()
+            )
+    
+    def _generate_from_prefix(self, prefix_state: Tuple[Any, Any], suffix_ids: List[Any], max_new_tokens: int):
+        """
+        Decode every task on top of a copy of the prefix cache
+        
+        Rows are laid out as [prefix | padding | suffix]: the prefix is shared
+        and already cached, and the masked padding in the middle aligns the
+        suffixes so they all end at the same position.
+        """
+        prefix_ids, prefix_cache = prefix_state
+        prefix_row = prefix_ids[0].cpu()
+        width = max(len(ids) for ids in suffix_ids)
+        rows, masks = [], []
+        for ids in suffix_ids:
+            gap = width - len(ids)
+            rows.append(torch.cat([
+                prefix_row, torch.full((gap,), self.tokenizer.pad_token_id, dtype=torch.long), ids
+            ]))
+            masks.append(torch.cat([
+                torch.ones(len(prefix_row), dtype=torch.long),
+                torch.zeros(gap, dtype=torch.long),
+                torch.ones(len(ids), dtype=torch.long)
+            ]))
+        input_ids = torch.stack(rows).to(self.model.device)
+        
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.stack(masks).to(self.model.device),
+                past_key_values=_repeat_cache(prefix_cache, len(suffix_ids)),
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **self._sampling_kwargs()
+            )
+        return outputs[:, input_ids.shape[1]:]
     
     def _calculate_sophisticated_scores(self, analysis: ContentAnalysis, llm_response: str) -> Dict[str, Any]:
         """Calculate sophisticated truth, confidence, and accuracy scores"""
@@ -450,6 +560,19 @@ Comprehensive Analysis:"""
         
         return "\n".join(formatted)
 
+_processor: Optional[AdvancedLLMProcessor] = None
+_processor_lock = threading.Lock()
+
+
+def get_llm_processor() -> AdvancedLLMProcessor:
+    """Process-wide LLM processor; the model is loaded on first use (or at warm-up) and kept"""
+    global _processor
+    if _processor is None:
+        with _processor_lock:
+            if _processor is None:
+                _processor = AdvancedLLMProcessor()
+    return _processor
+
 # Convenience function
 async def process_with_advanced_llm(content_analysis: ContentAnalysis) -> LLMAnalysisResult:
     """
@@ -461,5 +584,4 @@ async def process_with_advanced_llm(content_analysis: ContentAnalysis) -> LLMAna
     Returns:
         LLMAnalysisResult with sophisticated analysis
     """
-    processor = AdvancedLLMProcessor()
-    return await processor.process_analysis(content_analysis)
+    return await get_llm_processor().process_analysis(content_analysis)
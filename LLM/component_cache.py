@@ -0,0 +1,66 @@
+"""
+Component Cache
+Content-addressed caches for the expensive pipeline stages, stored under CACHE_DIR
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from config import config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Same SQLite backend as the verdict cache, so every worker process shares the entries.
+# It needs the repository root importable (as in the API process); otherwise
+# the component caches are disabled.
+try:
+    from app.core.cache import SQLiteCache
+except Exception as e:
+    logger.warning(f"⚠️ Component caches unavailable: {e}")
+    SQLiteCache = None
+
+COMPONENT_CACHE_PATH = config.CACHE_DIR / "components.sqlite3"
+
+_caches: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def content_key(*parts: Any) -> str:
+    """Hash of the inputs a cached value was computed from"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def get_component_cache(component: str) -> Optional["SQLiteCache"]:
+    """
+    Cache for one pipeline component, or None when caching is disabled
+
+    Entries expire after CACHE_EXPIRY_HOURS; each component is capped at
+    COMPONENT_CACHE_MAX_ENTRIES entries and COMPONENT_CACHE_MAX_MB, evicting
+    the least recently used entries first.
+    """
+    if not config.ENABLE_CACHING or SQLiteCache is None:
+        return None
+    cache = _caches.get(component)
+    if cache is None:
+        with _caches_lock:
+            if component not in _caches:
+                try:
+                    _caches[component] = SQLiteCache(
+                        str(COMPONENT_CACHE_PATH),
+                        namespace=component,
+                        max_entries=config.COMPONENT_CACHE_MAX_ENTRIES,
+                        ttl=config.CACHE_EXPIRY_HOURS * 3600,
+                        max_bytes=config.COMPONENT_CACHE_MAX_MB * 1024 * 1024
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ {component} cache unavailable: {e}")
+                    _caches[component] = None
+            cache = _caches[component]
+    return cache
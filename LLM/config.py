@@ -35,6 +35,8 @@ class Config:
     DEVICE = os.getenv("DEVICE", "cuda" if torch and torch.cuda.is_available() else "cpu")
     MAX_LENGTH = int(os.getenv("MAX_LENGTH", "2048"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.1"))
+    # Sampled outputs vary between calls, so only greedy (LLM_DO_SAMPLE=false) outputs are cached
+    LLM_DO_SAMPLE = os.getenv("LLM_DO_SAMPLE", "true").lower() == "true"
 
     # === Text Paraphrasing Settings ===
     NUM_PARAPHRASES = int(os.getenv("NUM_PARAPHRASES", "10"))
@@ -49,6 +51,12 @@ class Config:
     SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.75"))
     CONTENT_MIN_LENGTH = int(os.getenv("CONTENT_MIN_LENGTH", "100"))
 
+    # === Latency Budget ===
+    PIPELINE_BUDGET_SECONDS = float(os.getenv("PIPELINE_BUDGET_SECONDS", "60"))
+    FULL_TEXT_MIN_SECONDS = float(os.getenv("FULL_TEXT_MIN_SECONDS", "3"))  # Below this, keep search snippets
+    LLM_MIN_SECONDS = float(os.getenv("LLM_MIN_SECONDS", "15"))  # Below this, use the weighted verdict
+    ANALYSIS_RESERVE_SECONDS = float(os.getenv("ANALYSIS_RESERVE_SECONDS", "5"))  # Kept for content analysis and scoring
+
     # === Truth Scoring Configuration ===
     NO_SOURCES_SCORE = 0.0  # 0% when no sources found
     PERFECT_MATCH_SCORE = 1.0  # 100% when 5+ sources confirm
@@ -71,6 +79,10 @@ class Config:
     # === Caching Settings ===
     ENABLE_CACHING = os.getenv("ENABLE_CACHING", "true").lower() == "true"
     CACHE_EXPIRY_HOURS = int(os.getenv("CACHE_EXPIRY_HOURS", "24"))
+    COMPONENT_CACHE_MAX_ENTRIES = int(os.getenv("COMPONENT_CACHE_MAX_ENTRIES", "5000"))  # Per component
+    COMPONENT_CACHE_MAX_MB = int(os.getenv("COMPONENT_CACHE_MAX_MB", "256"))  # Per component
+    VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+    VERDICT_CACHE_MAX_MB = int(os.getenv("VERDICT_CACHE_MAX_MB", "512"))
 
     # === Headers for Web Requests ===
     HEADERS = {
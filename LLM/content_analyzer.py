@@ -6,6 +6,7 @@ Analyzes scraped content for context, region, time, and creates structured JSON
 import json
 import re
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
@@ -17,7 +18,9 @@ from collections import Counter
 import asyncio
 
 from config import config
+from component_cache import content_key, get_component_cache
 from enhanced_web_scraper import EnhancedArticle
+from model_registry import get_spacy
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -48,11 +51,11 @@ class ContentAnalyzer:
         self.load_nlp_model()
         
     def load_nlp_model(self):
-        """Load spaCy NLP model"""
+        """Load spaCy NLP model (shared with the rest of the process)"""
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = get_spacy("en_core_web_sm")
             logger.info("✅ spaCy model loaded for content analysis")
-        except OSError:
+        except Exception:
             logger.warning("⚠️ spaCy model not found. Some features will be limited.")
             self.nlp = None
     
@@ -70,6 +73,15 @@ class ContentAnalyzer:
         import time
         start_time = time.time()
         
+        # Same claim over the same article set (e.g. a repeat claim served the
+        # same search results) gives the same analysis
+        cache = get_component_cache("content_analysis")
+        cache_key = content_key(claim, *(self._article_fingerprint(article) for article in articles))
+        cached = await cache.get_async(cache_key) if cache is not None else None
+        if cached is not None:
+            logger.info(f"♻️ Content analysis cache hit for {len(articles)} articles")
+            return cached
+        
         logger.info(f"🔍 Analyzing content for {len(articles)} articles...")
         
         # Step 1: Categorize articles by stance
@@ -120,8 +132,18 @@ class ContentAnalyzer:
         logger.info(f"✅ Content analysis complete in {processing_time:.2f}s")
         logger.info(f"📊 Supporting: {len(supporting)}, Contradicting: {len(contradicting)}, Neutral: {len(neutral)}")
         
+        if cache is not None:
+            await cache.put_async(cache_key, result)
         return result
     
+    @staticmethod
+    def _article_fingerprint(article: EnhancedArticle) -> str:
+        """Hash of the article fields the analysis reads"""
+        return content_key(
+            article.url, article.source, article.title, article.content,
+            article.published_date, article.author, article.credibility_score
+        )
+    
     async def _categorize_articles_by_stance(self, claim: str, articles: List[EnhancedArticle]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
         """Categorize articles as supporting, contradicting, or neutral"""
         supporting = []
@@ -499,6 +521,19 @@ class ContentAnalyzer:
             'author': article.author
         }
 
+_analyzer: Optional[ContentAnalyzer] = None
+_analyzer_lock = threading.Lock()
+
+
+def get_content_analyzer() -> ContentAnalyzer:
+    """Process-wide content analyzer sharing one spaCy pipeline across requests"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = ContentAnalyzer()
+    return _analyzer
+
 # Convenience function
 async def analyze_content(claim: str, articles: List[EnhancedArticle]) -> ContentAnalysis:
     """
@@ -511,5 +546,4 @@ async def analyze_content(claim: str, articles: List[EnhancedArticle]) -> Conten
     Returns:
         ContentAnalysis with comprehensive analysis
     """
-    analyzer = ContentAnalyzer()
-    return await analyzer.analyze_content(claim, articles)
+    return await get_content_analyzer().analyze_content(claim, articles)
@@ -4,13 +4,14 @@ Sophisticated web scraping from multiple sources with full content extraction
 """
 
 import asyncio
+import dataclasses
 import aiohttp
 import requests
 from bs4 import BeautifulSoup
 import newspaper
 from newspaper import Article as NewsArticle
 import logging
-from typing import List, Dict, Optional, Set
+from typing import Awaitable, List, Dict, Optional, Set
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import re
@@ -21,11 +22,17 @@ from concurrent.futures import ThreadPoolExecutor
 import hashlib
 
 from config import config
+from component_cache import content_key, get_component_cache
+from latency_budget import LatencyBudget
+from search_gateway import get_search_gateway
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Distinct search queries scraped per claim, to stay within API rate limits
+MAX_SCRAPE_QUERIES = 10
+
 @dataclass
 class EnhancedArticle:
     """Enhanced article with full content and metadata"""
@@ -69,9 +76,39 @@ class EnhancedWebScraper:
         Returns:
             List of enhanced articles with full content
         """
-        logger.info(f"🌐 Starting enhanced scraping with {len(search_queries)} queries")
+        queries: asyncio.Queue = asyncio.Queue()
+        queries.put_nowait(search_queries)
+        queries.put_nowait(None)
+        return await self.scrape_query_stream(queries)
+    
+    async def scrape_query_stream(self, queries: "asyncio.Queue[Optional[List[str]]]",
+                                  budget: Optional[LatencyBudget] = None) -> List[EnhancedArticle]:
+        """
+        Scrape queries as they become known
+        
+        Each list put on the queue starts scraping right away (new queries only,
+        at most MAX_SCRAPE_QUERIES in total); None ends the stream. Lets the
+        orchestrator search for the claim while paraphrases are still being
+        generated.
+        
+        With a budget, searching stops when its share runs out and keeps the
+        articles found so far, and full-text extraction is shortened or skipped.
+        
+        Args:
+            queries: Queue of query batches, terminated by None
+            budget: Latency budget of the verification, if any
+            
+        Returns:
+            List of enhanced articles with full content
+        """
+        logger.info("🌐 Starting enhanced scraping")
         
         all_articles = []
+        loop = asyncio.get_running_loop()
+        search_deadline = loop.time() + budget.search_seconds() if budget else None
+        
+        def time_left() -> Optional[float]:
+            return None if search_deadline is None else max(0.0, search_deadline - loop.time())
         
         # Create aiohttp session
         async with aiohttp.ClientSession(
@@ -82,29 +119,43 @@ class EnhancedWebScraper:
             
             # Scrape from multiple sources concurrently
             tasks = []
+            started: Set[str] = set()
             
-            for query in search_queries[:10]:  # Limit to 10 queries to avoid rate limits
-                # Google Custom Search
-                if config.GOOGLE_API_KEY and config.GOOGLE_CSE_ID:
-                    tasks.append(self._scrape_google_cse(query))
-                
-                # NewsAPI
-                if config.NEWSAPI_KEY:
-                    tasks.append(self._scrape_newsapi(query))
-                
-                # Reddit (for social verification)
-                if config.REDDIT_CLIENT_ID:
-                    tasks.append(self._scrape_reddit(query))
+            while True:
+                try:
+                    batch = await asyncio.wait_for(queries.get(), timeout=time_left())
+                except asyncio.TimeoutError:
+                    budget.degrade("search_queries", "stopped waiting for paraphrase queries")
+                    break
+                if batch is None:
+                    break
+                for query in batch:
+                    # Limit queries to avoid rate limits
+                    if query in started or len(started) >= MAX_SCRAPE_QUERIES:
+                        continue
+                    started.add(query)
+                    tasks.extend(asyncio.ensure_future(task) for task in self._query_tasks(query))
             
-            # Execute all scraping tasks
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"🌐 Scraping {len(started)} queries")
+            
+            # Execute all scraping tasks, keeping what finished within the budget
+            done = set()
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=time_left())
+                if pending:
+                    budget.degrade("web_scraping", f"{len(pending)} of {len(tasks)} source searches unfinished")
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
             
             # Collect all articles
-            for result in results:
-                if isinstance(result, list):
-                    all_articles.extend(result)
-                elif isinstance(result, Exception):
-                    logger.warning(f"⚠️ Scraping task failed: {result}")
+            for task in tasks:
+                if task not in done:
+                    continue
+                if task.exception() is not None:
+                    logger.warning(f"⚠️ Scraping task failed: {task.exception()}")
+                else:
+                    all_articles.extend(task.result())
         
         # Early filter: remove low-content and very low-credibility items before heavy extraction
         filtered_initial: List[EnhancedArticle] = []
@@ -120,7 +171,7 @@ class EnhancedWebScraper:
             filtered_initial.append(a)
         
         # Post-process articles
-        enhanced_articles = await self._enhance_articles(filtered_initial)
+        enhanced_articles = await self._enhance_articles(filtered_initial, budget)
         
         # Remove duplicates and filter
         unique_articles = self._deduplicate_articles(enhanced_articles)
@@ -133,49 +184,65 @@ class EnhancedWebScraper:
         
         return final_articles
     
-    async def _scrape_google_cse(self, query: str) -> List[EnhancedArticle]:
-        """Scrape using Google Custom Search Engine"""
+    def _query_tasks(self, query: str) -> List[Awaitable[List[EnhancedArticle]]]:
+        """One scraping coroutine per configured source"""
+        tasks = []
+        
+        # Google Custom Search
+        if config.GOOGLE_API_KEY and config.GOOGLE_CSE_ID:
+            tasks.append(self._scrape_google_cse(query))
+        
+        # NewsAPI
+        if config.NEWSAPI_KEY:
+            tasks.append(self._scrape_newsapi(query))
+        
+        # Reddit (for social verification)
+        if config.REDDIT_CLIENT_ID:
+            tasks.append(self._scrape_reddit(query))
+        
+        return tasks
+    
+    async def _scrape_google_cse(self, query: str, interactive: bool = True) -> List[EnhancedArticle]:
+        """Scrape using Google Custom Search Engine via the shared search gateway"""
         try:
             logger.info(f"🔍 [Google CSE] Searching: {query}")
             
-            params = {
-                'key': config.GOOGLE_API_KEY,
-                'cx': config.GOOGLE_CSE_ID,
-                'q': query,
-                'num': min(10, config.MAX_ARTICLES_PER_SOURCE),
-                'dateRestrict': f'd{config.MAX_ARTICLE_AGE_DAYS}'
-            }
+            data = await get_search_gateway().search(
+                query,
+                interactive=interactive,
+                num=min(10, config.MAX_ARTICLES_PER_SOURCE),
+                dateRestrict=f'd{config.MAX_ARTICLE_AGE_DAYS}'
+            )
             
-            async with self.session.get(
-                'https://www.googleapis.com/customsearch/v1',
-                params=params
-            ) as response:
-                
-                if response.status == 200:
-                    data = await response.json()
-                    articles = []
-                    
-                    for item in data.get('items', []):
-                        article = EnhancedArticle(
-                            title=item.get('title', ''),
-                            content=item.get('snippet', ''),
-                            url=item.get('link', ''),
-                            source=self._extract_source(item.get('link', '')),
-                            snippet=item.get('snippet', ''),
-                            credibility_score=self._calculate_source_credibility(item.get('link', ''))
-                        )
-                        articles.append(article)
-                    
-                    logger.info(f"✅ [Google CSE] Found {len(articles)} articles")
-                    return articles
-                else:
-                    logger.error(f"❌ [Google CSE] HTTP {response.status}")
-                    return []
+            articles = []
+            for item in data.get('items', []):
+                article = EnhancedArticle(
+                    title=item.get('title', ''),
+                    content=item.get('snippet', ''),
+                    url=item.get('link', ''),
+                    source=self._extract_source(item.get('link', '')),
+                    snippet=item.get('snippet', ''),
+                    credibility_score=self._calculate_source_credibility(item.get('link', ''))
+                )
+                articles.append(article)
+            
+            logger.info(f"✅ [Google CSE] Found {len(articles)} articles")
+            return articles
                     
         except Exception as e:
             logger.error(f"❌ [Google CSE] Error: {e}")
             return []
     
+    async def search_claim(self, claim: str) -> List[EnhancedArticle]:
+        """
+        Lightweight claim search for background callers such as the X bot.
+
+        Uses only the (cached, quota-aware) Google CSE results, without full
+        content extraction, and counts against the background quota share.
+        """
+        articles = await self._scrape_google_cse(claim, interactive=False)
+        return self._sort_articles(self._deduplicate_articles(articles))
+    
     async def _scrape_newsapi(self, query: str) -> List[EnhancedArticle]:
         """Scrape using NewsAPI"""
         try:
@@ -186,7 +253,8 @@ class EnhancedWebScraper:
                 'language': 'en',
                 'sortBy': 'relevancy',
                 'pageSize': min(20, config.MAX_ARTICLES_PER_SOURCE),
-                'from': (datetime.now() - timedelta(days=config.MAX_ARTICLE_AGE_DAYS)).isoformat()
+                # Day granularity keeps the params, and so the cache key, stable within a day
+                'from': (datetime.now() - timedelta(days=config.MAX_ARTICLE_AGE_DAYS)).date().isoformat()
             }
             
             headers = {
@@ -194,44 +262,38 @@ class EnhancedWebScraper:
                 **config.HEADERS
             }
             
-            async with self.session.get(
-                'https://newsapi.org/v2/everything',
-                params=params,
-                headers=headers
-            ) as response:
-                
-                if response.status == 200:
-                    data = await response.json()
-                    articles = []
-                    
-                    for item in data.get('articles', []):
-                        # Parse published date
-                        published_date = None
-                        if item.get('publishedAt'):
-                            try:
-                                published_date = datetime.fromisoformat(
-                                    item['publishedAt'].replace('Z', '+00:00')
-                                )
-                            except:
-                                pass
-                        
-                        article = EnhancedArticle(
-                            title=item.get('title', ''),
-                            content=item.get('description', ''),
-                            url=item.get('url', ''),
-                            source=self._extract_source(item.get('url', '')),
-                            published_date=published_date,
-                            author=item.get('author'),
-                            snippet=item.get('description', ''),
-                            credibility_score=self._calculate_source_credibility(item.get('url', ''))
+            data = await self._fetch_search_json(
+                'NewsAPI', query, 'https://newsapi.org/v2/everything', params=params, headers=headers
+            )
+            if data is None:
+                return []
+            
+            articles = []
+            for item in data.get('articles', []):
+                # Parse published date
+                published_date = None
+                if item.get('publishedAt'):
+                    try:
+                        published_date = datetime.fromisoformat(
+                            item['publishedAt'].replace('Z', '+00:00')
                         )
-                        articles.append(article)
-                    
-                    logger.info(f"✅ [NewsAPI] Found {len(articles)} articles")
-                    return articles
-                else:
-                    logger.error(f"❌ [NewsAPI] HTTP {response.status}")
-                    return []
+                    except:
+                        pass
+                
+                article = EnhancedArticle(
+                    title=item.get('title', ''),
+                    content=item.get('description', ''),
+                    url=item.get('url', ''),
+                    source=self._extract_source(item.get('url', '')),
+                    published_date=published_date,
+                    author=item.get('author'),
+                    snippet=item.get('description', ''),
+                    credibility_score=self._calculate_source_credibility(item.get('url', ''))
+                )
+                articles.append(article)
+            
+            logger.info(f"✅ [NewsAPI] Found {len(articles)} articles")
+            return articles
                     
         except Exception as e:
             logger.error(f"❌ [NewsAPI] Error: {e}")
@@ -251,90 +313,146 @@ class EnhancedWebScraper:
                 't': 'month'  # Last month
             }
             
-            async with self.session.get(search_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    articles = []
-                    
-                    for post in data.get('data', {}).get('children', []):
-                        post_data = post.get('data', {})
-                        
-                        # Only include posts with external URLs
-                        if post_data.get('url') and not post_data.get('url').startswith('https://www.reddit.com'):
-                            article = EnhancedArticle(
-                                title=post_data.get('title', ''),
-                                content=post_data.get('selftext', '')[:500],
-                                url=post_data.get('url', ''),
-                                source='reddit.com',
-                                snippet=post_data.get('selftext', '')[:200],
-                                credibility_score=0.3  # Lower credibility for social media
-                            )
-                            articles.append(article)
-                    
-                    logger.info(f"✅ [Reddit] Found {len(articles)} posts")
-                    return articles
-                else:
-                    logger.error(f"❌ [Reddit] HTTP {response.status}")
-                    return []
+            data = await self._fetch_search_json('Reddit', query, search_url, params=params)
+            if data is None:
+                return []
+            
+            articles = []
+            for post in data.get('data', {}).get('children', []):
+                post_data = post.get('data', {})
+                
+                # Only include posts with external URLs
+                if post_data.get('url') and not post_data.get('url').startswith('https://www.reddit.com'):
+                    article = EnhancedArticle(
+                        title=post_data.get('title', ''),
+                        content=post_data.get('selftext', '')[:500],
+                        url=post_data.get('url', ''),
+                        source='reddit.com',
+                        snippet=post_data.get('selftext', '')[:200],
+                        credibility_score=0.3  # Lower credibility for social media
+                    )
+                    articles.append(article)
+            
+            logger.info(f"✅ [Reddit] Found {len(articles)} posts")
+            return articles
                     
         except Exception as e:
             logger.error(f"❌ [Reddit] Error: {e}")
             return []
     
-    async def _enhance_articles(self, articles: List[EnhancedArticle]) -> List[EnhancedArticle]:
-        """Enhance articles with full content extraction"""
+    async def _fetch_search_json(self, provider: str, query: str, url: str, params: Dict,
+                                 headers: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Provider search response, cached by provider, URL and query parameters
+        
+        Headers are left out of the key since they only carry credentials. Google CSE responses are cached by the search gateway instead. Only
+        successful responses are stored; None on an HTTP error.
+        """
+        cache = get_component_cache("search_responses")
+        cache_key = content_key(provider, url, *sorted(params.items()))
+        data = await cache.get_async(cache_key) if cache is not None else None
+        if data is not None:
+            logger.info(f"♻️ [{provider}] Cached response for: {query}")
+            return data
+        
+        async with self.session.get(url, params=params, headers=headers) as response:
+            if response.status != 200:
+                logger.error(f"❌ [{provider}] HTTP {response.status}")
+                return None
+            data = await response.json()
+        
+        if cache is not None:
+            await cache.put_async(cache_key, data)
+        return data
+    
+    async def _enhance_articles(self, articles: List[EnhancedArticle],
+                                budget: Optional[LatencyBudget] = None) -> List[EnhancedArticle]:
+        """
+        Enhance articles with full content extraction
+        
+        Under a budget, extraction is skipped when less than FULL_TEXT_MIN_SECONDS
+        remains for it, and articles still downloading when its time is up keep
+        their search snippet.
+        """
+        articles = [article for article in articles if article.url and self._is_valid_url(article.url)]
+        timeout = budget.extraction_seconds() if budget else None
+        if timeout is not None and timeout < config.FULL_TEXT_MIN_SECONDS:
+            budget.degrade("full_text_extraction", "skipped, using search snippets")
+            return articles
+        
         logger.info(f"🔧 Enhancing {len(articles)} articles with full content...")
         
         enhanced_articles = []
         
-        # Use ThreadPoolExecutor for CPU-bound newspaper operations
-        with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS) as executor:
-            tasks = []
-            
-            for article in articles:
-                if article.url and self._is_valid_url(article.url):
-                    task = asyncio.get_event_loop().run_in_executor(
-                        executor, self._extract_full_content, article
-                    )
-                    tasks.append(task)
+        # Use ThreadPoolExecutor for CPU-bound newspaper operations. Unfinished
+        # downloads are abandoned rather than waited for on shutdown.
+        executor = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS)
+        try:
+            loop = asyncio.get_running_loop()
+            # Extraction updates the article in place, so abandoned ones work on a copy
+            tasks = [
+                loop.run_in_executor(executor, self._extract_full_content, dataclasses.replace(article))
+                for article in articles
+            ]
             
-            # Wait for all content extraction tasks
+            # Wait for the content extraction tasks
             if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                done, pending = await asyncio.wait(tasks, timeout=timeout)
+                if pending:
+                    budget.degrade("full_text_extraction",
+                                   f"{len(pending)} of {len(tasks)} articles kept their search snippet")
                 
-                for result in results:
-                    if isinstance(result, EnhancedArticle):
-                        enhanced_articles.append(result)
-                    elif isinstance(result, Exception):
-                        logger.warning(f"⚠️ Content extraction failed: {result}")
+                for article, task in zip(articles, tasks):
+                    if task not in done:
+                        task.cancel()
+                        enhanced_articles.append(article)
+                    elif task.exception() is not None:
+                        logger.warning(f"⚠️ Content extraction failed: {task.exception()}")
+                    else:
+                        enhanced_articles.append(task.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         logger.info(f"✅ Enhanced {len(enhanced_articles)} articles")
         return enhanced_articles
     
     def _extract_full_content(self, article: EnhancedArticle) -> EnhancedArticle:
-        """Extract full content using newspaper3k"""
+        """Extract full content using newspaper3k (cached by URL)"""
         try:
-            news_article = NewsArticle(article.url)
-            news_article.download()
-            news_article.parse()
-            news_article.nlp()
+            cache = get_component_cache("full_text")
+            cache_key = content_key(article.url)
+            extracted = cache.get(cache_key) if cache is not None else None
+            if extracted is None:
+                news_article = NewsArticle(article.url)
+                news_article.download()
+                news_article.parse()
+                news_article.nlp()
+                extracted = {
+                    'text': news_article.text,
+                    'title': news_article.title,
+                    'authors': list(news_article.authors),
+                    'publish_date': news_article.publish_date,
+                    'keywords': list(news_article.keywords),
+                }
+                if cache is not None and extracted['text']:
+                    cache.put(cache_key, extracted)
             
             # Update article with extracted content
-            if news_article.text and len(news_article.text) > len(article.content):
-                article.full_text = news_article.text
-                article.content = news_article.text[:1000]  # First 1000 chars for processing
+            if extracted['text'] and len(extracted['text']) > len(article.content):
+                article.full_text = extracted['text']
+                article.content = extracted['text'][:1000]  # First 1000 chars for processing
             
-            if news_article.title and not article.title:
-                article.title = news_article.title
+            if extracted['title'] and not article.title:
+                article.title = extracted['title']
             
-            if news_article.authors:
-                article.author = ', '.join(news_article.authors)
+            if extracted['authors']:
+                article.author = ', '.join(extracted['authors'])
             
-            if news_article.publish_date:
-                article.published_date = news_article.publish_date
+            if extracted['publish_date']:
+                article.published_date = extracted['publish_date']
             
-            if news_article.keywords:
-                article.keywords = list(news_article.keywords)
+            if extracted['keywords']:
+                article.keywords = extracted['keywords']
             
             return article
             
@@ -416,3 +534,18 @@ async def scrape_enhanced_articles(search_queries: List[str]) -> List[EnhancedAr
     """
     scraper = EnhancedWebScraper()
     return await scraper.scrape_multiple_queries(search_queries)
+
+async def scrape_query_stream(queries: "asyncio.Queue[Optional[List[str]]]",
+                              budget: Optional[LatencyBudget] = None) -> List[EnhancedArticle]:
+    """
+    Scrape query batches as they arrive on `queries` (terminated by None)
+    
+    Args:
+        queries: Queue of search query batches
+        budget: Latency budget of the verification, if any
+        
+    Returns:
+        List of enhanced articles with full content
+    """
+    scraper = EnhancedWebScraper()
+    return await scraper.scrape_query_stream(queries, budget)
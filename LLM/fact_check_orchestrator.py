@@ -4,24 +4,64 @@ Main pipeline coordinator that integrates all modular components
 """
 
 import asyncio
+import hashlib
 import logging
+import threading
 import time
 import json
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 
 from config import config
-from text_paraphraser import generate_paraphrases, ParaphraseResult
-from enhanced_web_scraper import scrape_enhanced_articles, EnhancedArticle
-from content_analyzer import analyze_content, ContentAnalysis
-from advanced_llm_processor import process_with_advanced_llm, LLMAnalysisResult
-from truth_calculator import calculate_sophisticated_scores, ComprehensiveScores
+from text_paraphraser import generate_paraphrases, get_paraphraser, ParaphraseResult
+from enhanced_web_scraper import scrape_query_stream, EnhancedArticle
+from content_analyzer import analyze_content, get_content_analyzer, ContentAnalysis
+from advanced_llm_processor import process_with_advanced_llm, get_llm_processor, LLMAnalysisResult
+from truth_calculator import calculate_sophisticated_scores, get_truth_calculator, ComprehensiveScores
+from latency_budget import LatencyBudget
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared on-disk verdict cache (same backend the API uses), so every worker
+# process and restart reuses completed fact-checks. Results carry the scraped
+# articles, so the cache is capped by VERDICT_CACHE_MAX_ENTRIES/_MAX_MB
+try:
+    from app.core.cache import SQLiteCache
+    verdict_cache = SQLiteCache(
+        str(config.CACHE_DIR / "verdicts.sqlite3"),
+        namespace="orchestrator",
+        max_entries=config.VERDICT_CACHE_MAX_ENTRIES,
+        ttl=config.CACHE_EXPIRY_HOURS * 3600,
+        max_bytes=config.VERDICT_CACHE_MAX_MB * 1024 * 1024
+    ) if config.ENABLE_CACHING else None
+except Exception as e:
+    logger.warning(f"⚠️ Shared verdict cache unavailable: {e}")
+    verdict_cache = None
+
+# Stage histograms are exported on the API's /metrics when running inside it
+try:
+    from app.core.metrics import count_cache, observe_stages
+except Exception:
+    count_cache = observe_stages = None
+
+# Inside the API the pipeline budget never outlasts the request deadline
+try:
+    from app.core.admission import remaining_time as request_time_left
+except Exception:
+    request_time_left = None
+
+# component_timings keys -> metric stage names
+METRIC_STAGES = {
+    "paraphrasing": "paraphrase",
+    "web_scraping": "scrape",
+    "content_analysis": "analysis",
+    "llm_processing": "llm",
+    "score_calculation": "llm_score",
+}
+
 @dataclass
 class FactCheckResult:
     """Comprehensive fact-check result"""
@@ -57,6 +97,7 @@ class FactCheckResult:
     # Performance metrics
     total_processing_time: float
     component_timings: Dict[str, float]
+    degraded_stages: List[str] = field(default_factory=list)  # Stages cut short by the latency budget
     
     # Metadata
     version: str = "2.0.0"
@@ -65,10 +106,8 @@ class FactCheckResult:
 class SophisticatedFactCheckOrchestrator:
     """Main orchestrator for the sophisticated fact-checking pipeline"""
     
-    def __init__(self):
-        self.start_time = None
-        self.component_timings = {}
-        
+    # Holds no per-request state, so one instance serves concurrent requests
+    
     async def verify_claim(self, claim: str) -> FactCheckResult:
         """
         Execute the complete sophisticated fact-checking pipeline
@@ -79,28 +118,49 @@ class SophisticatedFactCheckOrchestrator:
         Returns:
             FactCheckResult with comprehensive analysis
         """
-        self.start_time = time.time()
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+        budget = self._create_budget()
         logger.info(f"🚀 Starting sophisticated fact-check pipeline for: {claim[:100]}...")
         
         try:
-            # Step 1: Text Paraphrasing
+            # Steps 1 + 2: Paraphrasing and web scraping, overlapped. The claim and
+            # the fact-check templates are searched right away; paraphrase queries
+            # join the scrape as soon as T5 has produced them.
             logger.info("📝 Step 1: Generating paraphrases and search queries...")
+            logger.info("🌐 Step 2: Enhanced multi-source web scraping...")
             step_start = time.time()
-            paraphrase_result = await generate_paraphrases(claim)
-            self.component_timings['paraphrasing'] = time.time() - step_start
+            queries: asyncio.Queue = asyncio.Queue()
+            
+            async def paraphrase() -> ParaphraseResult:
+                try:
+                    return await generate_paraphrases(claim, on_queries=queries.put_nowait)
+                finally:
+                    timings['paraphrasing'] = time.time() - step_start
+                    queries.put_nowait(None)  # ends the query stream, also on failure
+            
+            paraphrase_task = asyncio.ensure_future(paraphrase())
+            try:
+                articles = await scrape_query_stream(queries, budget)
+            except BaseException:
+                paraphrase_task.cancel()
+                raise
+            timings['web_scraping'] = time.time() - step_start
+            if paraphrase_task.done():
+                paraphrase_result = await paraphrase_task
+            else:
+                # Search gave up waiting for paraphrase queries; so does the result
+                paraphrase_task.cancel()
+                budget.degrade("paraphrasing", "unfinished when search time ran out")
+                paraphrase_result = self._claim_only_paraphrase(claim)
             
             logger.info(f"✅ Generated {len(paraphrase_result.paraphrases)} paraphrases and "
                        f"{len(paraphrase_result.search_queries)} search queries")
             
-            # Step 2: Enhanced Web Scraping
-            logger.info("🌐 Step 2: Enhanced multi-source web scraping...")
-            step_start = time.time()
-            articles = await scrape_enhanced_articles(paraphrase_result.search_queries)
-            self.component_timings['web_scraping'] = time.time() - step_start
-            
             if not articles:
                 logger.warning("⚠️ No articles found - creating minimal result")
-                return self._create_no_evidence_result(claim, paraphrase_result)
+                return self._create_no_evidence_result(claim, paraphrase_result, start_time, timings,
+                                                       budget.degraded_stages)
             
             logger.info(f"✅ Scraped {len(articles)} enhanced articles")
             
@@ -108,24 +168,37 @@ class SophisticatedFactCheckOrchestrator:
             logger.info("🔍 Step 3: Sophisticated content analysis...")
             step_start = time.time()
             content_analysis = await analyze_content(claim, articles)
-            self.component_timings['content_analysis'] = time.time() - step_start
+            timings['content_analysis'] = time.time() - step_start
             
             logger.info(f"✅ Analyzed content: {len(content_analysis.supporting_articles)} supporting, "
                        f"{len(content_analysis.contradicting_articles)} contradicting")
             
-            # Step 4: Advanced LLM Processing
+            # Step 4: Advanced LLM Processing, when the budget still has room for it
             logger.info("🧠 Step 4: Advanced LLM analysis...")
             step_start = time.time()
-            llm_analysis = await process_with_advanced_llm(content_analysis)
-            self.component_timings['llm_processing'] = time.time() - step_start
+            llm_analysis = None
+            llm_time = budget.llm_seconds()
+            if llm_time < config.LLM_MIN_SECONDS:
+                budget.degrade("llm_processing", "skipped, using the weighted verdict")
+            else:
+                try:
+                    llm_analysis = await asyncio.wait_for(process_with_advanced_llm(content_analysis), llm_time)
+                except asyncio.TimeoutError:
+                    # A generate() call already running finishes in its thread; its result is dropped
+                    budget.degrade("llm_processing", "timed out, using the weighted verdict")
+            timings['llm_processing'] = time.time() - step_start
             
-            logger.info(f"✅ LLM analysis complete: {llm_analysis.final_verdict}")
+            if llm_analysis is not None:
+                logger.info(f"✅ LLM analysis complete: {llm_analysis.final_verdict}")
             
             # Step 5: Sophisticated Truth Calculation with Weighted Scoring
             logger.info("🧮 Step 5: Calculating sophisticated scores with weighted system...")
             step_start = time.time()
             comprehensive_scores = calculate_sophisticated_scores(content_analysis, llm_analysis, claim)
-            self.component_timings['score_calculation'] = time.time() - step_start
+            timings['score_calculation'] = time.time() - step_start
+            
+            if llm_analysis is None:
+                llm_analysis = self._create_weighted_analysis(content_analysis, comprehensive_scores)
             
             # Step 6: Compile Final Results
             logger.info("📊 Step 6: Compiling comprehensive results...")
@@ -134,9 +207,10 @@ class SophisticatedFactCheckOrchestrator:
                 llm_analysis, comprehensive_scores
             )
             
-            total_time = time.time() - self.start_time
+            total_time = time.time() - start_time
             result.total_processing_time = total_time
-            result.component_timings = self.component_timings
+            result.component_timings = timings
+            result.degraded_stages = budget.degraded_stages
             
             logger.info(f"🎯 Sophisticated fact-check complete in {total_time:.2f}s")
             logger.info(f"📈 Final Results - Truth: {result.final_truth_score:.1%}, "
@@ -147,7 +221,55 @@ class SophisticatedFactCheckOrchestrator:
             
         except Exception as e:
             logger.error(f"❌ Fact-check pipeline failed: {e}")
-            return self._create_error_result(claim, str(e))
+            return self._create_error_result(claim, str(e), start_time, timings)
+    
+    @staticmethod
+    def _create_budget() -> LatencyBudget:
+        """Budget for one verification: PIPELINE_BUDGET_SECONDS, capped by the request deadline"""
+        seconds = config.PIPELINE_BUDGET_SECONDS
+        left = request_time_left() if request_time_left is not None else None
+        if left is not None:
+            seconds = min(seconds, left)
+        return LatencyBudget(seconds)
+    
+    @staticmethod
+    def _claim_only_paraphrase(claim: str) -> ParaphraseResult:
+        """Paraphrase result standing in for one that did not finish"""
+        return ParaphraseResult(
+            original_text=claim,
+            paraphrases=[],
+            keywords=[],
+            entities=[],
+            search_queries=[claim],
+            processing_time=0.0
+        )
+    
+    @staticmethod
+    def _create_weighted_analysis(content_analysis: ContentAnalysis,
+                                  scores: ComprehensiveScores) -> LLMAnalysisResult:
+        """LLM analysis stand-in built from the deterministic weighted scores"""
+        supporting = len(content_analysis.supporting_articles)
+        contradicting = len(content_analysis.contradicting_articles)
+        return LLMAnalysisResult(
+            truth_score=scores.truth_score_breakdown.final_truth_score,
+            confidence_score=scores.confidence_score_breakdown.final_confidence_score,
+            accuracy_score=scores.accuracy_score,
+            factual_summary=(f"Verdict from weighted source scoring ({supporting} supporting, "
+                             f"{contradicting} contradicting articles); LLM analysis was skipped "
+                             f"to stay within the time budget"),
+            supporting_evidence_summary=f"{supporting} supporting articles",
+            contradicting_evidence_summary=f"{contradicting} contradicting articles",
+            key_facts_verified=[],
+            key_facts_disputed=[],
+            regional_context_analysis="Not analyzed",
+            temporal_context_analysis="Not analyzed",
+            source_reliability_assessment=scores.score_explanation,
+            final_verdict=scores.final_verdict,
+            reasoning_chain=["LLM analysis skipped: latency budget exhausted",
+                             f"Weighted verdict: {scores.final_verdict}"],
+            confidence_factors=dict(scores.reliability_indicators),
+            processing_time=0.0
+        )
     
     def _compile_comprehensive_result(self, claim: str, paraphrase_result: ParaphraseResult,
                                     articles: List[EnhancedArticle], content_analysis: ContentAnalysis,
@@ -197,7 +319,10 @@ class SophisticatedFactCheckOrchestrator:
             model_used=config.LLAMA_MODEL_PATH
         )
     
-    def _create_no_evidence_result(self, claim: str, paraphrase_result: ParaphraseResult) -> FactCheckResult:
+    def _create_no_evidence_result(self, claim: str, paraphrase_result: ParaphraseResult,
+                                   start_time: Optional[float] = None,
+                                   timings: Optional[Dict[str, float]] = None,
+                                   degraded_stages: Optional[List[str]] = None) -> FactCheckResult:
         """Create result when no evidence is found"""
         
         # Create minimal analysis objects
@@ -285,22 +410,18 @@ class SophisticatedFactCheckOrchestrator:
             factual_summary="No credible sources found to verify this claim",
             supporting_sources=[],
             contradicting_sources=[],
-            total_processing_time=time.time() - self.start_time if self.start_time else 0,
-            component_timings=self.component_timings,
+            total_processing_time=time.time() - start_time if start_time else 0,
+            component_timings=timings or {},
+            degraded_stages=degraded_stages or [],
             model_used=config.LLAMA_MODEL_PATH
         )
     
-    def _create_error_result(self, claim: str, error_message: str) -> FactCheckResult:
+    def _create_error_result(self, claim: str, error_message: str,
+                             start_time: Optional[float] = None,
+                             timings: Optional[Dict[str, float]] = None) -> FactCheckResult:
         """Create result when an error occurs"""
         # Similar to no evidence result but with error information
-        return self._create_no_evidence_result(claim, ParaphraseResult(
-            original_text=claim,
-            paraphrases=[],
-            keywords=[],
-            entities=[],
-            search_queries=[claim],
-            processing_time=0.0
-        ))
+        return self._create_no_evidence_result(claim, self._claim_only_paraphrase(claim), start_time, timings)
 
 def format_comprehensive_output(result: FactCheckResult) -> str:
     """Format comprehensive result as human-readable text"""
@@ -347,6 +468,7 @@ def format_comprehensive_output(result: FactCheckResult) -> str:
    Web Scraping: {result.component_timings.get('web_scraping', 0):.2f}s
    Content Analysis: {result.component_timings.get('content_analysis', 0):.2f}s
    LLM Processing: {result.component_timings.get('llm_processing', 0):.2f}s
+   Degraded Stages: {', '.join(result.degraded_stages) or 'none'}
 
 🤖 Model: {result.model_used}
 ⏰ Timestamp: {result.processing_timestamp}
@@ -354,6 +476,44 @@ def format_comprehensive_output(result: FactCheckResult) -> str:
     
     return output
 
+_orchestrator: Optional[SophisticatedFactCheckOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> SophisticatedFactCheckOrchestrator:
+    """Process-wide orchestrator shared by every request"""
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = SophisticatedFactCheckOrchestrator()
+    return _orchestrator
+
+
+def warm_up_components() -> Dict[str, bool]:
+    """
+    Build the shared pipeline components and load their models now, so the
+    first request does not pay for it. Blocking; failures are logged and the
+    component loads lazily on first use instead.
+    """
+    steps = {
+        "paraphraser": lambda: get_paraphraser().load_models(),
+        "content_analyzer": get_content_analyzer,
+        "llm_processor": lambda: get_llm_processor().load_model(),
+        "truth_calculator": get_truth_calculator,
+        "orchestrator": get_orchestrator,
+    }
+    ready = {}
+    for name, step in steps.items():
+        try:
+            step()
+            ready[name] = True
+        except Exception as e:
+            logger.warning(f"⚠️ Warm-up of {name} failed: {e}")
+            ready[name] = False
+    logger.info(f"🔥 LLM pipeline components warmed: {ready}")
+    return ready
+
 # Convenience function
 async def verify_claim_comprehensive(claim: str) -> FactCheckResult:
     """
@@ -365,5 +525,24 @@ async def verify_claim_comprehensive(claim: str) -> FactCheckResult:
     Returns:
         FactCheckResult with comprehensive analysis
     """
-    orchestrator = SophisticatedFactCheckOrchestrator()
-    return await orchestrator.verify_claim(claim)
+    cache_key = hashlib.md5(" ".join(claim.split()).casefold().encode()).hexdigest()
+    if verdict_cache is not None:
+        cached = await verdict_cache.get_async(cache_key)
+        if count_cache is not None:
+            count_cache("orchestrator_verdict", cached is not None)
+        if cached is not None:
+            logger.info(f"♻️ Verdict cache hit for: {claim[:100]}")
+            return cached
+
+    result = await get_orchestrator().verify_claim(claim)
+    if observe_stages is not None:
+        observe_stages(result.component_timings, names=METRIC_STAGES)
+
+    # Only cache complete results backed by evidence; failures, empty searches
+    # and budget-degraded runs are retried
+    if verdict_cache is not None and result.articles_found > 0 and not result.degraded_stages:
+        try:
+            await verdict_cache.put_async(cache_key, result)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to cache verdict: {e}")
+    return result
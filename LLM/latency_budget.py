@@ -0,0 +1,56 @@
+"""
+Latency Budget
+Wall-clock budget shared by the stages of one fact-check
+"""
+
+import logging
+import time
+from typing import List
+
+from config import config
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Left over after the LLM stage for score calculation and compiling the result
+SCORING_RESERVE_SECONDS = 1.0
+
+class LatencyBudget:
+    """
+    Time left for one verification and the stages it had to cut short
+
+    Each stage asks how long it may run before starting optional work. The
+    search and full-text stages leave ANALYSIS_RESERVE_SECONDS plus
+    LLM_MIN_SECONDS for the stages after them; the LLM stage gets whatever
+    is left. Stages that stop early or are skipped are recorded with
+    `degrade` and end up in FactCheckResult.degraded_stages.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.degraded_stages: List[str] = []
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Seconds left after holding back `reserve`, never negative"""
+        return max(0.0, self.deadline - time.monotonic() - reserve)
+
+    def search_seconds(self) -> float:
+        """Time for collecting queries and searching"""
+        # A budget too small to fit the LLM still gives search half of it
+        downstream = config.ANALYSIS_RESERVE_SECONDS + config.LLM_MIN_SECONDS
+        return max(self.remaining(downstream), self.remaining() / 2)
+
+    def extraction_seconds(self) -> float:
+        """Time for downloading full article text"""
+        return self.remaining(config.ANALYSIS_RESERVE_SECONDS + config.LLM_MIN_SECONDS)
+
+    def llm_seconds(self) -> float:
+        """Time for LLM generation"""
+        return self.remaining(SCORING_RESERVE_SECONDS)
+
+    def degrade(self, stage: str, reason: str) -> None:
+        """Record that `stage` was skipped or cut short"""
+        if stage not in self.degraded_stages:
+            self.degraded_stages.append(stage)
+        logger.warning(f"⏱️ Degrading {stage}: {reason} ({self.remaining():.1f}s of {self.seconds:.1f}s left)")
@@ -0,0 +1,231 @@
+"""
+Shared Model Registry
+Loads each model once per process, lazily on first use or eagerly at startup,
+and shares the instance between the API services and the LLM pipeline
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process, 0 when it cannot be read"""
+    try:
+        import psutil  # type: ignore
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _parameter_bytes(obj: Any) -> int:
+    """Size of torch parameters/buffers held by a model (or a tuple of them)"""
+    items = obj if isinstance(obj, (tuple, list)) else (obj,)
+    total = 0
+    for item in items:
+        for attr in ("parameters", "buffers"):
+            fn = getattr(item, attr, None)
+            if callable(fn):
+                try:
+                    total += sum(t.numel() * t.element_size() for t in fn())
+                except Exception:
+                    pass
+    return total
+
+
+@dataclass
+class ModelInfo:
+    """Load statistics for one registered model"""
+    name: str
+    loaded: bool = False
+    load_time: float = 0.0
+    rss_delta_bytes: int = 0
+    parameter_bytes: int = 0
+    error: Optional[str] = None
+
+
+class ModelRegistry:
+    """Process-wide, thread-safe registry of lazily loaded models"""
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._info: Dict[str, ModelInfo] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register a loader; nothing is loaded until the model is requested"""
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            self._locks.setdefault(name, threading.Lock())
+            self._info.setdefault(name, ModelInfo(name=name))
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """Return the shared instance, loading it on first use; raises if loading failed"""
+        if name in self._models:
+            return self._models[name]
+        if loader is not None:
+            self.register(name, loader)
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            info = self._info[name]
+            if info.error is not None:
+                raise RuntimeError(f"Model {name} failed to load: {info.error}")
+
+            logger.info(f"🤖 Loading model '{name}'...")
+            rss_before = _rss_bytes()
+            start = time.time()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                info.error = str(e)
+                logger.error(f"❌ Failed to load model '{name}': {e}")
+                raise
+            info.load_time = time.time() - start
+            info.rss_delta_bytes = max(0, _rss_bytes() - rss_before)
+            info.parameter_bytes = _parameter_bytes(model)
+            info.loaded = True
+            self._models[name] = model
+            logger.info(f"✅ Model '{name}' loaded in {info.load_time:.2f}s "
+                        f"(+{info.rss_delta_bytes / 1e6:.0f} MB RSS)")
+            return model
+
+    def try_get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Optional[Any]:
+        """Like get(), but returns None when the model cannot be loaded"""
+        try:
+            return self.get(name, loader)
+        except Exception:
+            return None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": info.loaded,
+                "load_time": round(info.load_time, 3),
+                "rss_delta_mb": round(info.rss_delta_bytes / 1e6, 1),
+                "parameter_mb": round(info.parameter_bytes / 1e6, 1),
+                "error": info.error,
+            }
+            for name, info in self._info.items()
+        }
+
+
+registry = ModelRegistry()
+
+
+# === Standard models ===
+
+def _device() -> str:
+    try:
+        import torch
+        return os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
+    except ImportError:
+        return "cpu"
+
+
+def get_sentence_transformer(model_name: str = "all-MiniLM-L6-v2"):
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return registry.get(f"sentence_transformer:{model_name}", load)
+
+
+def get_cross_encoder(model_name: str = "cross-encoder/nli-deberta-v3-base"):
+    def load():
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(model_name)
+    return registry.get(f"cross_encoder:{model_name}", load)
+
+
+def get_spacy(model_name: str = "en_core_web_sm"):
+    def load():
+        import spacy
+        return spacy.load(model_name)
+    return registry.get(f"spacy:{model_name}", load)
+
+
+def get_seq2seq(model_name: str = "t5-base"):
+    """Return (tokenizer, model) for a seq2seq model such as T5"""
+    def load():
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        if _device() == "cuda":
+            model = model.to("cuda")
+        model.eval()
+        return tokenizer, model
+    return registry.get(f"seq2seq:{model_name}", load)
+
+
+def get_causal_lm(model_path: str):
+    """Return (tokenizer, model) for a causal LM, 4-bit quantized on CUDA"""
+    def load():
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+        if _device() == "cuda" and torch.cuda.is_available():
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_quant_type="nf4"
+            )
+            model = AutoModelForCausalLM.from_pretrained(
+                model_path,
+                quantization_config=quantization_config,
+                device_map="auto",
+                torch_dtype=torch.float16
+            )
+        else:
+            model = AutoModelForCausalLM.from_pretrained(model_path, torch_dtype=torch.float32)
+        model.eval()
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # Batched generation needs prompts padded on the left so continuations line up
+        tokenizer.padding_side = "left"
+        return tokenizer, model
+    return registry.get(f"causal_lm:{model_path}", load)
+
+
+_GETTERS = {
+    "sentence_transformer": get_sentence_transformer,
+    "cross_encoder": get_cross_encoder,
+    "spacy": get_spacy,
+    "seq2seq": get_seq2seq,
+    "causal_lm": get_causal_lm,
+}
+
+
+def preload_models(keys: Iterable[str]) -> None:
+    """
+    Eagerly load models at startup; failures are logged, not raised.
+
+    Keys look like "spacy:en_core_web_sm" or "seq2seq:t5-base"; a bare kind
+    such as "spacy" loads that kind's default model.
+    """
+    for key in keys:
+        kind, _, model_name = key.strip().partition(":")
+        getter = _GETTERS.get(kind)
+        if getter is None:
+            if kind:
+                logger.warning(f"⚠️ Unknown model kind in preload list: {key}")
+            continue
+        try:
+            getter(model_name) if model_name else getter()
+        except Exception:
+            pass  # already logged by the registry
@@ -17,6 +17,8 @@ import re
 
 # Import the enhanced source weighting system
 from .news_source_weights import source_weights
+# Absolute, like the API and the other LLM modules, so there is one gateway module and singleton
+from search_gateway import get_search_gateway
 
 @dataclass
 class NewsArticle:
@@ -298,24 +300,16 @@ class MultiSourceNewsFetcher:
             return []
         
     async def _fetch_from_google_cse(self, category: str, max_articles: int) -> List[NewsArticle]:
-        """Fetch news from Google Custom Search Engine"""
+        """Fetch news from Google Custom Search Engine via the shared search gateway"""
         try:
-            url = "https://www.googleapis.com/customsearch/v1"
-                    params = {
-                'key': self.api_keys['google_cse'],
-                'cx': self.api_keys['google_cse_id'],
-                'q': f"news {category}",
-                'num': min(max_articles, 10),  # Google CSE limit
-                'dateRestrict': 'd1'  # Last 24 hours
-            }
-            
-            async with self.session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                    return self._parse_google_cse_response(data, max_articles)
-                else:
-                    print(f"Google CSE error: {response.status}")
-                    return []
+            # Feed refreshes are background traffic and yield quota to claim verification
+            data = await get_search_gateway().search(
+                f"news {category}",
+                interactive=False,
+                num=min(max_articles, 10),  # Google CSE limit
+                dateRestrict='d1'  # Last 24 hours
+            )
+            return self._parse_google_cse_response(data, max_articles)
         except Exception as e:
             print(f"Google CSE fetch error: {e}")
             return []
@@ -331,12 +325,12 @@ class MultiSourceNewsFetcher:
                 published_at = None
                 if item.get('publishedAt'):
                     published_at = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
-                                
-                                article = NewsArticle(
+                
+                article = NewsArticle(
                     title=item.get('title', ''),
-                                    description=item.get('description', ''),
-                                    url=item.get('url', ''),
-                                    source=item.get('source', {}).get('name', 'Unknown'),
+                    description=item.get('description', ''),
+                    url=item.get('url', ''),
+                    source=item.get('source', {}).get('name', 'Unknown'),
                     api_source='NewsAPI',
                     published_at=published_at,
                     image_url=item.get('urlToImage'),
@@ -392,9 +386,9 @@ class MultiSourceNewsFetcher:
                     detected_regions=[]  # Will be calculated later
                 )
                 articles.append(article)
-                except Exception as e:
+            except Exception as e:
                 print(f"Error parsing GNews article: {e}")
-                    continue
+                continue
         
         return articles
     
@@ -446,7 +440,7 @@ class MultiSourceNewsFetcher:
         for item in data['items'][:max_articles]:
             try:
                 # Google CSE doesn't provide publication date
-            article = NewsArticle(
+                article = NewsArticle(
                     title=item.get('title', ''),
                     description=item.get('snippet', ''),
                     url=item.get('link', ''),
@@ -465,8 +459,8 @@ class MultiSourceNewsFetcher:
                     weighted_score=0.0,  # Will be calculated later
                     regional_boost=1.0,  # Will be calculated later
                     detected_regions=[]  # Will be calculated later
-            )
-            articles.append(article)
+                )
+                articles.append(article)
             except Exception as e:
                 print(f"Error parsing Google CSE article: {e}")
                 continue
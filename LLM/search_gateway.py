@@ -0,0 +1,524 @@
+"""
+Unified Google Custom Search Gateway
+One process-wide entry point for every CSE caller (API scraper, enhanced web
+scraper, news fetcher, X bot) with a shared query-result cache and per-key
+daily quota accounting
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; VeritasBot/1.0; +https://yourdomain.com/bot)"
+}
+
+_QUOTA_REASONS = {"dailyLimitExceeded", "rateLimitExceeded", "quotaExceeded", "userRateLimitExceeded"}
+_DAILY_REASONS = {"dailyLimitExceeded", "quotaExceeded"}
+
+
+class SearchQuotaExceeded(Exception):
+    """Every configured key is at its daily budget and no cached result exists"""
+
+
+class _QuotaExhausted(Exception):
+    """The current key/CSE pair is rate limited or out of daily quota"""
+
+    def __init__(self, daily: bool = False):
+        super().__init__("daily quota exhausted" if daily else "rate limited")
+        self.daily = daily
+
+
+class _RetryableError(Exception):
+    """Transient failure (timeout, connection reset, 5xx) worth retrying"""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share a cache entry"""
+    return " ".join(query.split()).casefold()
+
+
+def _is_quota_error(status: int, data: Any) -> bool:
+    """Google reports quota exhaustion as 429, or as 403 with a quota reason"""
+    if status == 429:
+        return True
+    if status != 403 or not isinstance(data, dict):
+        return False
+    errors = (data.get("error") or {}).get("errors") or []
+    return any(err.get("reason") in _QUOTA_REASONS for err in errors)
+
+
+def _is_daily_limit(data: Any) -> bool:
+    if not isinstance(data, dict):
+        return False
+    errors = (data.get("error") or {}).get("errors") or []
+    return any(err.get("reason") in _DAILY_REASONS for err in errors)
+
+
+def _quota_day() -> str:
+    """CSE quotas reset at midnight Pacific time"""
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+    except Exception:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+class SearchStore:
+    """
+    On-disk tier for search results and quota counters.
+
+    A single SQLite file in WAL mode is shared by every process on the host, so
+    a query answered by one worker is free for the others and the daily usage
+    count per key covers all of them. Keys are stored as short hashes, never in
+    clear text.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_quota ("
+            " key_id TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL,"
+            " PRIMARY KEY (key_id, day)) WITHOUT ROWID"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def put(self, key: str, value: dict, stored_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":")), stored_at)
+            )
+
+    def purge(self, older_than: float) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_results WHERE stored_at < ?", (older_than,))
+            self._conn.execute("DELETE FROM search_quota WHERE day < ?", (_quota_day(),))
+
+    def used(self, key_id: str, day: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM search_quota WHERE key_id = ? AND day = ?", (key_id, day)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def add_used(self, key_id: str, day: str, amount: int = 1) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO search_quota (key_id, day, used) VALUES (?, ?, ?)"
+                " ON CONFLICT (key_id, day) DO UPDATE SET used = used + excluded.used",
+                (key_id, day, amount)
+            )
+            row = self._conn.execute(
+                "SELECT used FROM search_quota WHERE key_id = ? AND day = ?", (key_id, day)
+            ).fetchone()
+        return row[0]
+
+    def set_used(self, key_id: str, day: str, used: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_quota (key_id, day, used) VALUES (?, ?, ?)",
+                (key_id, day, used)
+            )
+
+
+class SearchGateway:
+    """
+    Quota-aware, caching front door to Google Custom Search.
+
+    Lookups go memory cache -> shared cache (Redis, when configured) -> disk
+    cache -> network. Each key/CSE pair has a
+    daily budget; interactive searches may use it up to `daily_quota - reserve`,
+    background searches (news feeds, the X bot) stop at `background_ratio` of
+    that, so a busy feed cannot starve claim verification. When no key has
+    budget left the gateway degrades to a stale cached result, and only refuses
+    with SearchQuotaExceeded when there is nothing cached at all. A 429 or quota
+    error from Google parks the key for `cooldown` seconds and the next one is
+    tried.
+    """
+
+    def __init__(self, key_pairs: List[Tuple[str, str]], cache_path: str,
+                 ttl: float = 6 * 3600, stale_ttl: float = 7 * 24 * 3600,
+                 memory_entries: int = 2048, daily_quota: int = 100, reserve: int = 5,
+                 background_ratio: float = 0.8, cooldown: float = 3600,
+                 connect_timeout: float = 3.0, read_timeout: float = 8.0, total_timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 0.25, pool_size: int = 20,
+                 shared_cache=None):
+        self.pairs = list(dict.fromkeys((k, c) for k, c in key_pairs if k and c))
+        self.key_ids = [hashlib.sha256(k.encode()).hexdigest()[:16] for k, _ in self.pairs]
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory_entries = memory_entries
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        self.background_ratio = background_ratio
+        self.cooldown = cooldown
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.pool_size = pool_size
+
+        self.store = SearchStore(cache_path)
+        # Any get/put cache (app.core.cache.RedisCache) shared beyond this host
+        self.shared_cache = shared_cache
+        self.store.purge(time.time() - stale_ttl)
+        self._memory: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._parked_until = [0.0] * len(self.pairs)
+        self._current = 0
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_loop = None
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "shared_hits": 0, "disk_hits": 0, "stale_hits": 0,
+                      "network_calls": 0, "refused": 0, "rotations": 0}
+
+    # === Cache ===
+
+    @staticmethod
+    def cache_key(query: str, params: Dict[str, Any]) -> str:
+        extra = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha256(f"{normalize_query(query)}|{extra}".encode()).hexdigest()
+
+    def _remember(self, key: str, value: dict, stored_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (value, stored_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, max_age: float) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] <= max_age:
+                self._memory.move_to_end(key)
+                self.stats["stale_hits" if max_age > self.ttl else "memory_hits"] += 1
+                return entry[0]
+        if self.shared_cache is not None:
+            entry = self.shared_cache.get(key)
+            if entry is not None and now - entry[1] <= max_age:
+                self._remember(key, entry[0], entry[1])
+                self.stats["stale_hits" if max_age > self.ttl else "shared_hits"] += 1
+                return entry[0]
+        entry = self.store.get(key)
+        if entry is not None and now - entry[1] <= max_age:
+            self._remember(key, entry[0], entry[1])
+            self.stats["stale_hits" if max_age > self.ttl else "disk_hits"] += 1
+            return entry[0]
+        return None
+
+    def _store(self, key: str, value: dict) -> None:
+        now = time.time()
+        self._remember(key, value, now)
+        if self.shared_cache is not None:
+            self.shared_cache.put(key, (value, now), ttl=self.stale_ttl)
+        self.store.put(key, value, now)
+
+    # === Quota and key rotation ===
+
+    def _limit(self, interactive: bool) -> int:
+        limit = max(0, self.daily_quota - self.reserve)
+        return limit if interactive else int(limit * self.background_ratio)
+
+    def _acquire_key(self, interactive: bool) -> Optional[Tuple[int, str, str]]:
+        """Pick the next unparked key with budget left and count the call against it"""
+        day = _quota_day()
+        limit = self._limit(interactive)
+        now = time.monotonic()
+        with self._lock:
+            order = [(self._current + i) % len(self.pairs) for i in range(len(self.pairs))]
+        for idx in order:
+            if self._parked_until[idx] > now:
+                continue
+            if self.store.used(self.key_ids[idx], day) >= limit:
+                continue
+            used = self.store.add_used(self.key_ids[idx], day)
+            if used > limit:  # another worker took the last slot first
+                continue
+            with self._lock:
+                self._current = idx
+            return (idx,) + self.pairs[idx]
+        return None
+
+    def _park(self, idx: int, daily: bool) -> None:
+        """Take a rejected key out of rotation; the call it was charged for moves to the next key"""
+        with self._lock:
+            self._parked_until[idx] = time.monotonic() + self.cooldown
+            if self._current == idx:
+                self._current = (idx + 1) % len(self.pairs)
+            self.stats["rotations"] += 1
+        if daily:
+            # Google says the key is done for today; make every worker agree
+            self.store.set_used(self.key_ids[idx], _quota_day(), self.daily_quota)
+        else:
+            self.store.add_used(self.key_ids[idx], _quota_day(), -1)
+        logger.warning(f"⚠️ Google API key #{idx + 1} hit its quota, rotating to the next key")
+
+    def quota_status(self) -> List[Dict[str, Any]]:
+        day = _quota_day()
+        now = time.monotonic()
+        return [
+            {
+                "key": f"#{idx + 1}",
+                "used": self.store.used(key_id, day),
+                "daily_quota": self.daily_quota,
+                "parked": self._parked_until[idx] > now,
+            }
+            for idx, key_id in enumerate(self.key_ids)
+        ]
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def _degrade(self, key: str, query: str) -> dict:
+        stale = self._lookup(key, self.stale_ttl)
+        if stale is not None:
+            logger.warning(f"⚠️ Search quota low, serving stale results for: {query[:60]}")
+            return stale
+        self.stats["refused"] += 1
+        raise SearchQuotaExceeded("Google CSE daily quota exhausted for every configured key")
+
+    # === Async transport ===
+
+    @staticmethod
+    async def _in_thread(func, *args):
+        """Run a blocking cache or quota-store call without holding up the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _get_session(self):
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop it was created in (the X bot uses asyncio.run per claim)
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(
+                total=self.total_timeout,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS)
+            self._session_loop = loop
+        return self._session
+
+    async def _request_async(self, params: dict) -> dict:
+        import aiohttp
+        try:
+            async with self._get_session().get(GOOGLE_CSE_URL, params=params) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError:
+                    data = {}
+                if _is_quota_error(response.status, data):
+                    raise _QuotaExhausted(_is_daily_limit(data))
+                if response.status >= 500:
+                    raise _RetryableError(f"HTTP {response.status}")
+                response.raise_for_status()
+                return data
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+            raise _RetryableError(str(e) or type(e).__name__) from e
+
+    async def search(self, query: str, interactive: bool = True, **params) -> dict:
+        """
+        Return the raw CSE JSON for a query, served from cache when possible.
+
+        Extra keyword arguments (num, dateRestrict, ...) are passed to the API
+        and are part of the cache key. A search is charged against one key's
+        quota once; transient failures are retried on the same key.
+        """
+        key = self.cache_key(query, params)
+        # The cache tiers and quota counters block, so they are used from a worker thread
+        cached = await self._in_thread(self._lookup, key, self.ttl)
+        if cached is not None:
+            return cached
+        if not self.pairs:
+            raise RuntimeError("Google API credentials not configured properly")
+
+        acquired = await self._in_thread(self._acquire_key, interactive)
+        attempt = 0
+        while True:
+            if acquired is None:
+                return await self._in_thread(self._degrade, key, query)
+            idx, api_key, cse_id = acquired
+            self.stats["network_calls"] += 1
+            try:
+                data = await self._request_async({"key": api_key, "cx": cse_id, "q": query, **params})
+                await self._in_thread(self._store, key, data)
+                return data
+            except _QuotaExhausted as e:
+                await self._in_thread(self._park, idx, e.daily)
+                acquired = await self._in_thread(self._acquire_key, interactive)
+            except _RetryableError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                logger.warning(f"⚠️ Google CSE request failed ({e}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    # === Blocking transport ===
+
+    def _get_sync_session(self):
+        import requests
+        import requests.adapters
+        # requests.Session is not thread-safe, so each worker thread gets its own pool
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=self.pool_size))
+            self._local.session = session
+        return session
+
+    def _request_sync(self, params: dict) -> dict:
+        import requests
+        try:
+            response = self._get_sync_session().get(
+                GOOGLE_CSE_URL, params=params, timeout=(self.connect_timeout, self.read_timeout)
+            )
+        except (requests.Timeout, requests.ConnectionError) as e:
+            raise _RetryableError(str(e)) from e
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if _is_quota_error(response.status_code, data):
+            raise _QuotaExhausted(_is_daily_limit(data))
+        if response.status_code >= 500:
+            raise _RetryableError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return data
+
+    def search_sync(self, query: str, interactive: bool = True, **params) -> dict:
+        """Blocking counterpart of search() for callers outside an event loop"""
+        key = self.cache_key(query, params)
+        cached = self._lookup(key, self.ttl)
+        if cached is not None:
+            return cached
+        if not self.pairs:
+            raise RuntimeError("Google API credentials not configured properly")
+
+        acquired = self._acquire_key(interactive)
+        attempt = 0
+        while True:
+            if acquired is None:
+                return self._degrade(key, query)
+            idx, api_key, cse_id = acquired
+            self.stats["network_calls"] += 1
+            try:
+                data = self._request_sync({"key": api_key, "cx": cse_id, "q": query, **params})
+                self._store(key, data)
+                return data
+            except _QuotaExhausted as e:
+                self._park(idx, e.daily)
+                acquired = self._acquire_key(interactive)
+            except _RetryableError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                logger.warning(f"⚠️ Google CSE request failed ({e}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+
+_gateway: Optional[SearchGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def _settings_from_env() -> Dict[str, Any]:
+    primary_cse = os.getenv("GOOGLE_CSE_ID", "")
+    return {
+        "key_pairs": [
+            (os.getenv("GOOGLE_API_KEY", ""), primary_cse),
+            (os.getenv("GOOGLE_API_KEY_2", ""), os.getenv("GOOGLE_CSE_ID_2") or primary_cse),
+            (os.getenv("GOOGLE_API_KEY_NEW", ""), primary_cse),
+        ],
+        "cache_path": os.getenv(
+            "SEARCH_CACHE_PATH", str(Path(__file__).parent / "cache" / "search_gateway.sqlite3")
+        ),
+        "ttl": _env_float("SEARCH_CACHE_TTL", 6 * 3600),
+        "daily_quota": int(_env_float("GOOGLE_CSE_DAILY_QUOTA", 100)),
+        "reserve": int(_env_float("GOOGLE_CSE_QUOTA_RESERVE", 5)),
+        "cooldown": _env_float("GOOGLE_KEY_COOLDOWN", 3600),
+    }
+
+
+def configure_search_gateway(**overrides) -> SearchGateway:
+    """
+    Create the process-wide gateway with explicit settings.
+
+    The API calls this with its pydantic settings on startup, before any
+    search; a gateway created earlier from environment variables by an
+    LLM-side caller is kept, with a warning that the overrides are ignored.
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = SearchGateway(**{**_settings_from_env(), **overrides})
+        elif overrides:
+            logger.warning("⚠️ Search gateway already created, ignoring the new settings")
+    return _gateway
+
+
+def get_search_gateway() -> SearchGateway:
+    if _gateway is None:
+        return configure_search_gateway()
+    return _gateway
+
+
+def existing_search_gateway() -> Optional[SearchGateway]:
+    """The process-wide gateway if one was created, without creating it"""
+    return _gateway
+
+
+async def close_search_gateway() -> None:
+    if _gateway is not None:
+        await _gateway.close()
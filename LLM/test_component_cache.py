@@ -0,0 +1,19 @@
+"""
+Tests for the content-addressed component caches
+"""
+
+from component_cache import content_key
+
+
+def test_content_key_depends_on_every_part():
+    assert content_key("NewsAPI", "url", ("q", "moon")) == content_key("NewsAPI", "url", ("q", "moon"))
+    assert content_key("NewsAPI", "url", ("q", "moon")) != content_key("NewsAPI", "url", ("q", "mars"))
+    # Parts are delimited, so shifting text between them changes the key
+    assert content_key("ab", "c") != content_key("a", "bc")
+
+
+def test_search_params_are_keyed_independently_of_order():
+    first = {"q": "moon", "from": "2026-10-01", "pageSize": 20}
+    second = {"pageSize": 20, "q": "moon", "from": "2026-10-01"}
+    assert content_key("NewsAPI", "url", *sorted(first.items())) == \
+        content_key("NewsAPI", "url", *sorted(second.items()))
@@ -0,0 +1,151 @@
+"""
+Tests for the Google Custom Search gateway: caching, quota accounting and key rotation
+"""
+
+import asyncio
+import importlib
+import os
+
+import pytest
+
+import search_gateway
+from search_gateway import (
+    SearchGateway, SearchQuotaExceeded, _QuotaExhausted, _RetryableError, _quota_day
+)
+
+
+def _gateway(tmp_path, pairs=(("key-a", "cse"), ("key-b", "cse")), **kwargs):
+    kwargs.setdefault("backoff_base", 0.0)
+    return SearchGateway(list(pairs), str(tmp_path / "search.sqlite3"), **kwargs)
+
+
+def _script(gateway, outcomes):
+    """Make the async transport replay `outcomes` (exceptions are raised); returns the keys used"""
+    used = []
+
+    async def request(params):
+        used.append(params["key"])
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    gateway._request_async = request
+    return used
+
+
+def _used(gateway, idx):
+    return gateway.store.used(gateway.key_ids[idx], _quota_day())
+
+
+def test_repeated_queries_are_served_from_cache(tmp_path):
+    gateway = _gateway(tmp_path)
+    used = _script(gateway, [{"items": [1]}])
+    assert asyncio.run(gateway.search("Moon  landing", num=10)) == {"items": [1]}
+    assert asyncio.run(gateway.search("moon landing", num=10)) == {"items": [1]}
+    assert len(used) == 1
+    assert gateway.stats["memory_hits"] == 1
+
+    # Another worker on the same host reads the disk tier
+    other = _gateway(tmp_path)
+    _script(other, [])
+    assert asyncio.run(other.search("moon landing", num=10)) == {"items": [1]}
+    assert other.stats["disk_hits"] == 1
+
+
+def test_params_are_part_of_the_cache_key(tmp_path):
+    gateway = _gateway(tmp_path)
+    used = _script(gateway, [{"page": 1}, {"page": 2}])
+    asyncio.run(gateway.search("q", start=1))
+    assert asyncio.run(gateway.search("q", start=11)) == {"page": 2}
+    assert len(used) == 2
+
+
+def test_retries_charge_the_quota_once(tmp_path):
+    gateway = _gateway(tmp_path, max_retries=2)
+    used = _script(gateway, [_RetryableError("timeout"), _RetryableError("HTTP 503"), {"items": []}])
+    assert asyncio.run(gateway.search("q")) == {"items": []}
+    assert used == ["key-a"] * 3
+    assert _used(gateway, 0) == 1
+    assert gateway.stats["network_calls"] == 3
+
+
+def test_exhausted_retries_raise(tmp_path):
+    gateway = _gateway(tmp_path, max_retries=1)
+    _script(gateway, [_RetryableError("timeout"), _RetryableError("timeout")])
+    with pytest.raises(_RetryableError):
+        asyncio.run(gateway.search("q"))
+    assert _used(gateway, 0) == 1
+
+
+def test_rate_limited_key_is_parked_and_the_next_key_pays(tmp_path):
+    gateway = _gateway(tmp_path)
+    used = _script(gateway, [_QuotaExhausted(daily=False), {"items": []}])
+    asyncio.run(gateway.search("q"))
+    assert used == ["key-a", "key-b"]
+    assert (_used(gateway, 0), _used(gateway, 1)) == (0, 1)
+    assert gateway.quota_status()[0]["parked"]
+    assert gateway.stats["rotations"] == 1
+
+
+def test_daily_limit_marks_the_key_spent_for_every_worker(tmp_path):
+    gateway = _gateway(tmp_path, daily_quota=100)
+    _script(gateway, [_QuotaExhausted(daily=True), {"items": []}])
+    asyncio.run(gateway.search("q"))
+    assert _used(gateway, 0) == 100
+
+
+def test_background_searches_stop_before_interactive_ones(tmp_path):
+    gateway = _gateway(tmp_path, pairs=(("key-a", "cse"),), daily_quota=12, reserve=2, background_ratio=0.5)
+    _script(gateway, [{"n": i} for i in range(20)])
+    for i in range(5):
+        asyncio.run(gateway.search(f"feed {i}", interactive=False))
+    with pytest.raises(SearchQuotaExceeded):
+        asyncio.run(gateway.search("feed 5", interactive=False))
+    assert asyncio.run(gateway.search("claim", interactive=True)) is not None
+    assert _used(gateway, 0) == 6
+
+
+def test_out_of_quota_serves_stale_results(tmp_path):
+    gateway = _gateway(tmp_path, pairs=(("key-a", "cse"),), daily_quota=1, reserve=0, ttl=0)
+    _script(gateway, [{"items": ["old"]}])
+    asyncio.run(gateway.search("q"))
+    # Past its TTL but within stale_ttl, and no budget left for a fresh call
+    assert asyncio.run(gateway.search("q")) == {"items": ["old"]}
+    assert gateway.stats["stale_hits"] == 1
+    with pytest.raises(SearchQuotaExceeded):
+        asyncio.run(gateway.search("never seen"))
+
+
+def test_search_sync_charges_once_across_retries(tmp_path):
+    gateway = _gateway(tmp_path, max_retries=1)
+    outcomes = [_RetryableError("reset"), {"items": []}]
+
+    def request(params):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    gateway._request_sync = request
+    assert gateway.search_sync("q") == {"items": []}
+    assert _used(gateway, 0) == 1
+
+
+def test_news_fetcher_shares_the_process_gateway(tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp")
+    # The API imports the fetcher as a package module, with LLM/ also on sys.path
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    news_fetcher = importlib.import_module("LLM.news_fetcher")
+    monkeypatch.setattr(search_gateway, "_gateway", None)
+
+    configured = search_gateway.configure_search_gateway(
+        key_pairs=[("key-a", "cse")], cache_path=str(tmp_path / "search.sqlite3")
+    )
+    assert news_fetcher.get_search_gateway() is configured
+    assert search_gateway.get_search_gateway() is configured
+
+
+def test_existing_gateway_does_not_create_one(monkeypatch):
+    monkeypatch.setattr(search_gateway, "_gateway", None)
+    assert search_gateway.existing_search_gateway() is None
@@ -4,16 +4,18 @@ Generates multiple paraphrased versions of input text for enhanced web scraping
 """
 
 import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer, pipeline
 import spacy
 import re
 import logging
-from typing import List, Dict, Set, Tuple
+import threading
+from typing import Callable, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 from config import config
+from component_cache import content_key, get_component_cache
+from model_registry import get_seq2seq, get_spacy
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -40,27 +42,28 @@ class TextParaphraser:
         self.model_path = config.PARAPHRASE_MODEL
         self.num_paraphrases = config.NUM_PARAPHRASES
         self.diversity = config.PARAPHRASE_DIVERSITY
+        self._load_lock = threading.Lock()
         
     def load_models(self):
-        """Load T5 paraphrasing model and spaCy NLP pipeline"""
+        """Load the models once; concurrent first requests wait for the same load"""
+        with self._load_lock:
+            if self.model is None:
+                self._load_models()
+
+    def _load_models(self):
+        """Load T5 paraphrasing model and spaCy NLP pipeline from the shared registry"""
         logger.info(f"🤖 Loading paraphrasing model: {self.model_path}")
         
         try:
-            # Load T5 model for paraphrasing
-            self.tokenizer = T5Tokenizer.from_pretrained(self.model_path)
-            self.model = T5ForConditionalGeneration.from_pretrained(self.model_path)
-            
-            if self.device == "cuda" and torch.cuda.is_available():
-                self.model = self.model.to(self.device)
-                logger.info("✅ Model loaded on CUDA")
-            else:
-                logger.info("✅ Model loaded on CPU")
+            # T5 is shared with the LLM processor's fallback model
+            self.tokenizer, self.model = get_seq2seq(self.model_path)
+            logger.info(f"✅ Model ready on {self.model.device}")
             
             # Load spaCy for NLP processing
             try:
-                self.nlp = spacy.load("en_core_web_sm")
+                self.nlp = get_spacy("en_core_web_sm")
                 logger.info("✅ spaCy model loaded")
-            except OSError:
+            except Exception:
                 logger.warning("⚠️ spaCy model not found. Install with: python -m spacy download en_core_web_sm")
                 self.nlp = None
                 
@@ -68,12 +71,16 @@ class TextParaphraser:
             logger.error(f"❌ Failed to load models: {e}")
             raise
     
-    async def generate_paraphrases(self, text: str) -> ParaphraseResult:
+    async def generate_paraphrases(self, text: str,
+                                   on_queries: Optional[Callable[[List[str]], None]] = None) -> ParaphraseResult:
         """
         Generate multiple paraphrased versions of the input text
         
         Args:
             text: Original text to paraphrase
+            on_queries: Called with the search queries known before any model
+                runs (the claim and the fact-check templates), then again with
+                the final query list, so scraping can start immediately
             
         Returns:
             ParaphraseResult with paraphrases, keywords, and search queries
@@ -81,8 +88,21 @@ class TextParaphraser:
         import time
         start_time = time.time()
         
+        cache = get_component_cache("paraphrases")
+        cache_key = content_key(" ".join(text.split()), config.PARAPHRASE_MODEL, self.num_paraphrases)
+        cached = await cache.get_async(cache_key) if cache is not None else None
+        if cached is not None:
+            logger.info(f"♻️ Paraphrase cache hit for: {text[:100]}")
+            if on_queries is not None:
+                on_queries(cached.search_queries)
+            return cached
+        
+        if on_queries is not None:
+            on_queries(self._early_search_queries(text))
+        
         if not self.model:
-            self.load_models()
+            # Off the event loop: a load (or a warm-up holding the lock) must not stall other requests
+            await asyncio.get_event_loop().run_in_executor(None, self.load_models)
         
         logger.info(f"🔄 Generating {self.num_paraphrases} paraphrases for: {text[:100]}...")
         
@@ -94,6 +114,8 @@ class TextParaphraser:
         
         # Step 3: Create search queries
         search_queries = self._create_search_queries(text, paraphrases, keywords)
+        if on_queries is not None:
+            on_queries(search_queries)
         
         processing_time = time.time() - start_time
         
@@ -107,6 +129,8 @@ class TextParaphraser:
         )
         
         logger.info(f"✅ Generated {len(paraphrases)} paraphrases in {processing_time:.2f}s")
+        if cache is not None:
+            await cache.put_async(cache_key, result)
         return result
     
     def _extract_keywords_and_entities(self, text: str) -> Tuple[List[str], List[Dict[str, str]]]:
@@ -171,21 +195,12 @@ class TextParaphraser:
             input_text = f"paraphrase: {text}"
             inputs = self.tokenizer.encode(input_text, return_tensors="pt", max_length=512, truncation=True)
             
-            if self.device == "cuda":
-                inputs = inputs.to(self.device)
+            inputs = inputs.to(self.model.device)
             
-            # Generate paraphrases
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_length=150,
-                    num_return_sequences=num_return_sequences,
-                    temperature=self.diversity,
-                    do_sample=True,
-                    top_k=50,
-                    top_p=0.95,
-                    no_repeat_ngram_size=2
-                )
+            # Generate paraphrases off the event loop so concurrent scraping keeps running
+            outputs = await asyncio.get_event_loop().run_in_executor(
+                None, self._t5_generate, inputs, num_return_sequences
+            )
             
             # Decode outputs
             paraphrases = []
@@ -200,6 +215,19 @@ class TextParaphraser:
             logger.error(f"❌ T5 paraphrasing failed: {e}")
             return []
     
+    def _t5_generate(self, inputs, num_return_sequences: int):
+        with torch.no_grad():
+            return self.model.generate(
+                inputs,
+                max_length=150,
+                num_return_sequences=num_return_sequences,
+                temperature=self.diversity,
+                do_sample=True,
+                top_k=50,
+                top_p=0.95,
+                no_repeat_ngram_size=2
+            )
+    
     async def _question_based_paraphrase(self, text: str) -> List[str]:
         """Generate paraphrases by converting to questions and back"""
         question_templates = [
@@ -281,28 +309,49 @@ class TextParaphraser:
                     search_queries.append(f"{keywords[i]} {keywords[i+1]}")
         
         # Add fact-checking specific queries
-        fact_check_queries = [
+        search_queries.extend(self._fact_check_queries(original))
+        
+        # Remove duplicates and limit
+        unique_queries = list(dict.fromkeys(search_queries))  # Preserve order
+        return unique_queries[:20]  # Limit to 20 queries
+
+    def _fact_check_queries(self, original: str) -> List[str]:
+        """Template queries aimed at fact-checking sites"""
+        return [
             f"{original} fact check",
             f"{original} verification",
             f"{original} true or false",
             f"is {original.lower()} real"
         ]
-        search_queries.extend(fact_check_queries)
-        
-        # Remove duplicates and limit
-        unique_queries = list(dict.fromkeys(search_queries))  # Preserve order
-        return unique_queries[:20]  # Limit to 20 queries
+    
+    def _early_search_queries(self, original: str) -> List[str]:
+        """Queries that need no model: the claim itself and the fact-check templates"""
+        return [original] + self._fact_check_queries(original)
+
+_paraphraser: Optional[TextParaphraser] = None
+_paraphraser_lock = threading.Lock()
+
+
+def get_paraphraser() -> TextParaphraser:
+    """Process-wide paraphraser; T5 and spaCy are loaded once and shared by every request"""
+    global _paraphraser
+    if _paraphraser is None:
+        with _paraphraser_lock:
+            if _paraphraser is None:
+                _paraphraser = TextParaphraser()
+    return _paraphraser
 
 # Convenience function
-async def generate_paraphrases(text: str) -> ParaphraseResult:
+async def generate_paraphrases(text: str,
+                               on_queries: Optional[Callable[[List[str]], None]] = None) -> ParaphraseResult:
     """
     Generate paraphrases for the given text
     
     Args:
         text: Text to paraphrase
+        on_queries: Optional callback receiving search queries as they become known
         
     Returns:
         ParaphraseResult with paraphrases and search queries
     """
-    paraphraser = TextParaphraser()
-    return await paraphraser.generate_paraphrases(text)
+    return await get_paraphraser().generate_paraphrases(text, on_queries)
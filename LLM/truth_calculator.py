@@ -5,7 +5,8 @@ Advanced algorithms for calculating truth scores, confidence, and accuracy
 
 import numpy as np
 import logging
-from typing import Dict, List, Any, Tuple
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import math
@@ -61,13 +62,14 @@ class SophisticatedTruthCalculator:
         self.variation_penalty_factor = config.VARIATION_PENALTY_FACTOR
         
     def calculate_comprehensive_scores(self, content_analysis: ContentAnalysis,
-                                     llm_analysis: LLMAnalysisResult, claim: str = "") -> ComprehensiveScores:
+                                     llm_analysis: Optional[LLMAnalysisResult], claim: str = "") -> ComprehensiveScores:
         """
         Calculate comprehensive truth, confidence, and accuracy scores using weighted system
 
         Args:
             content_analysis: Content analysis results
-            llm_analysis: LLM analysis results
+            llm_analysis: LLM analysis results (None when the LLM stage was skipped;
+                the weighted scores do not depend on it)
             claim: Original claim text for category/region detection
 
         Returns:
@@ -424,20 +426,33 @@ class SophisticatedTruthCalculator:
         
         return indicators
 
+_calculator: Optional[SophisticatedTruthCalculator] = None
+_calculator_lock = threading.Lock()
+
+
+def get_truth_calculator() -> SophisticatedTruthCalculator:
+    """Process-wide truth calculator (stateless, shared by every request)"""
+    global _calculator
+    if _calculator is None:
+        with _calculator_lock:
+            if _calculator is None:
+                _calculator = SophisticatedTruthCalculator()
+    return _calculator
+
 # Convenience function
 def calculate_sophisticated_scores(content_analysis: ContentAnalysis,
-                                 llm_analysis: LLMAnalysisResult,
+                                 llm_analysis: Optional[LLMAnalysisResult],
                                  claim: str = "") -> ComprehensiveScores:
     """
     Calculate sophisticated truth scores with weighted system
 
     Args:
         content_analysis: Content analysis results
-        llm_analysis: LLM analysis results
+        llm_analysis: LLM analysis results, or None when the LLM stage was skipped
         claim: Original claim text for weighted scoring
 
     Returns:
         ComprehensiveScores with detailed breakdowns
     """
-    calculator = SophisticatedTruthCalculator()
+    calculator = get_truth_calculator()
     return calculator.calculate_comprehensive_scores(content_analysis, llm_analysis, claim)
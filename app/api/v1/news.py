@@ -21,7 +21,8 @@ except ImportError:
     # Fallback if import fails
     NewsDashboardFetcher = None
 
-from app.core.config import settings
+from app.core.cache import build_redis_cache
+from app.core.config import settings, get_cache_config
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -36,6 +37,13 @@ news_cache = {
     'cache_duration': timedelta(minutes=30)  # Cache for 30 minutes
 }
 
+# With Redis configured every worker shares one dashboard snapshot instead of fetching its own
+shared_news_cache = build_redis_cache(
+    get_cache_config(),
+    namespace="news_dashboard",
+    ttl=news_cache['cache_duration'].total_seconds()
+)
+
 class NewsService:
     """Service class for handling news operations"""
     
@@ -59,7 +67,7 @@ class NewsService:
         """Get news for all categories with caching"""
         
         # Check cache first
-        if not force_refresh and self._is_cache_valid():
+        if not force_refresh and (self._is_cache_valid() or await self._load_shared_cache()):
             logger.info("Returning cached news data")
             return news_cache['data']
         
@@ -74,6 +82,8 @@ class NewsService:
             # Update cache
             news_cache['data'] = news_data
             news_cache['last_updated'] = datetime.now()
+            if shared_news_cache is not None:
+                await shared_news_cache.put_async("all", (news_data, news_cache['last_updated']))
             
             return news_data
             
@@ -120,6 +130,16 @@ class NewsService:
         time_since_update = datetime.now() - news_cache['last_updated']
         return time_since_update < news_cache['cache_duration']
     
+    async def _load_shared_cache(self) -> bool:
+        """Adopt a snapshot another worker stored in Redis; True when one was found"""
+        if shared_news_cache is None:
+            return False
+        entry = await shared_news_cache.get_async("all")
+        if not entry or not entry[0]:
+            return False
+        news_cache['data'], news_cache['last_updated'] = entry
+        return self._is_cache_valid()
+
     def _get_fallback_news(self) -> Dict[str, List[Dict]]:
         """Get fallback news data when APIs are unavailable"""
         return {
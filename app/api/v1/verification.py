@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 from app.models.schemas import ClaimRequest, VerificationResult, TextInputRequest, SimpleVerificationResult
 from app.core.dependencies import get_verifier
+from app.core.metrics import PIPELINE_IN_FLIGHT, count_provider_error
 
 # Add LLM folder to path to import the sophisticated fact-checking system
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'LLM'))
@@ -30,7 +31,7 @@ async def verify_claim(request: ClaimRequest):
     logger.info(f"📄 Language: {request.language}")
     try:
         logger.info("🚀 Starting verification process...")
-        result = verifier.verify_claim(request)
+        result = await verifier.verify_claim_async(request)
         logger.info("✅ Verification completed successfully")
         return result  # ✅ result is already a dict matching VerificationResult
     except Exception as e:
@@ -71,11 +72,13 @@ async def verify_text_input(request: TextInputRequest):
         # Try to use the sophisticated LLM system first
         if verify_claim_comprehensive:
             try:
-                result = await verify_claim_comprehensive(request.text)
+                with PIPELINE_IN_FLIGHT.track_inprogress(pipeline="llm"):
+                    result = await verify_claim_comprehensive(request.text)
                 simple_result = _transform_to_simple_result(result)
                 logger.info("✅ LLM verification completed successfully")
                 return simple_result
             except Exception as llm_error:
+                count_provider_error("llm_pipeline")
                 logger.warning(f"⚠️ LLM verification failed, falling back to basic verifier: {llm_error}")
 
         # Fallback to existing verifier
@@ -86,7 +89,7 @@ async def verify_text_input(request: TextInputRequest):
             language="en"
         )
 
-        basic_result = verifier.verify_claim(claim_request)
+        basic_result = await verifier.verify_claim_async(claim_request)
 
         # Transform basic result to simple format
         simple_result = _transform_basic_to_simple_result(basic_result, request.text)
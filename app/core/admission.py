@@ -0,0 +1,218 @@
+"""
+Admission control: bounded concurrency, bounded queueing and per-request deadlines
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute monotonic deadline of the request being served in this context
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of its time budget"""
+
+
+class Overloaded(Exception):
+    """The admission queue is full, or the wait for a slot timed out"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def set_deadline(seconds: float) -> contextvars.Token:
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left for the current request, or None when no deadline is set"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+async def with_deadline(awaitable: Awaitable[T]) -> T:
+    """Await under the current request's remaining budget"""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Request deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded") from None
+
+
+class AdmissionController:
+    """
+    Lets at most `max_concurrent` requests run and `max_queue` wait.
+
+    Requests beyond that are rejected straight away instead of joining a
+    queue they would time out in; waiters give up after `queue_timeout`.
+    Retry-After is estimated from the recent average service time.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._avg_service_time = 1.0
+
+    def _retry_after(self) -> int:
+        backlog = (self.waiting + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(backlog * self._avg_service_time))
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded("Server is at capacity", self._retry_after())
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Overloaded("Timed out waiting for capacity", self._retry_after()) from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+
+    def release(self, service_time: float) -> None:
+        self.active -= 1
+        self._semaphore.release()
+        # Exponentially weighted so Retry-After follows the current load
+        self._avg_service_time = 0.9 * self._avg_service_time + 0.1 * service_time
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_service_time": round(self._avg_service_time, 3),
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that admits expensive requests through an AdmissionController.
+
+    Only POSTs under `paths` are controlled. When the coroutine
+    `cache_probe(path, body)` says the answer is already cached the request
+    skips admission. Admitted
+    requests carry a deadline of `timeout` seconds that run_cpu_bound and the
+    search client honour.
+    """
+
+    def __init__(self, app, controller: AdmissionController, paths: Iterable[str], timeout: float,
+                 cache_probe: Optional[Callable[[str, bytes], Awaitable[bool]]] = None):
+        self.app = app
+        self.controller = controller
+        self.paths = tuple(paths)
+        self.timeout = timeout
+        self.cache_probe = cache_probe
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or not scope["path"].startswith(self.paths)):
+            await self.app(scope, receive, send)
+            return
+
+        if self.cache_probe is not None:
+            body, receive = await _buffer_body(receive)
+            try:
+                if await self.cache_probe(scope["path"], body):
+                    await self.app(scope, receive, send)
+                    return
+            except Exception as e:
+                logger.debug(f"[ADMISSION] Cache probe failed: {e}")
+
+        try:
+            await self.controller.acquire()
+        except Overloaded as e:
+            logger.warning(f"[ADMISSION] Shedding {scope['path']}: {e.reason} (retry after {e.retry_after}s)")
+            await _send_json(send, 503, {"detail": e.reason}, {"Retry-After": str(e.retry_after)})
+            return
+
+        started = False
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        start = time.monotonic()
+        token = set_deadline(self.timeout)
+        try:
+            await self.app(scope, receive, tracking_send)
+        except DeadlineExceeded:
+            if started:
+                raise
+            await _send_json(send, 504, {"detail": "Request deadline exceeded"})
+        finally:
+            reset_deadline(token)
+            self.controller.release(time.monotonic() - start)
+
+
+async def _buffer_body(receive):
+    """Read the whole request body and return a receive callable that replays it"""
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+async def _send_json(send, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+    body = json.dumps(payload).encode()
+    raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,893 @@
+"""
+Response caching: in-process TTL + LRU tier in front of a shared SQLite or Redis tier
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory cost of a cached value by its JSON-encoded length"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class CacheBackend:
+    """
+    Interface shared by the verdict cache implementations.
+
+    The *_async variants are for code running on an event loop: backends that
+    touch disk or the network (`blocking`) run the call in a worker thread,
+    in-memory backends answer inline.
+    """
+
+    ttl: float = 0
+    blocking: bool = True
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Values for several keys in order (None for misses)"""
+        return [self.get(key) for key in keys]
+
+    def put_many(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        for key, value in items:
+            self.put(key, value, ttl)
+
+    def get_many_with_ttl(self, keys: List[str]) -> List[Optional[Tuple[Any, float]]]:
+        """Like get_many, with each value paired with its remaining lifetime in seconds"""
+        return [None if value is None else (value, self.ttl) for value in self.get_many(keys)]
+
+    def contains(self, key: str) -> bool:
+        """Whether a live entry exists, without counting a lookup or refreshing its recency"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def _run(self, func, *args):
+        if not self.blocking:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        return await self._run(self.get, key)
+
+    async def put_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._run(self.put, key, value, ttl)
+
+    async def get_many_async(self, keys: List[str]) -> List[Optional[Any]]:
+        return await self._run(self.get_many, keys)
+
+    async def contains_async(self, key: str) -> bool:
+        return await self._run(self.contains, key)
+
+    async def put_many_async(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        await self._run(self.put_many, list(items), ttl)
+
+
+class TTLCache(CacheBackend):
+    """
+    Bounded LRU cache with per-entry TTL.
+
+    Entries live in an OrderedDict ordered by recency, so get/put/evict are O(1).
+    The cache is bounded both by entry count and by the estimated size in bytes.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 300, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes  # 0 disables the byte limit
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on a miss/expired entry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= time.time():
+                self._remove(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting least recently used entries as needed"""
+        size = estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            logger.warning(f"[CACHE] Entry of {size} bytes exceeds cache byte limit, not caching")
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, old_size, _) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._remove(key, entry[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._data[key]
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for the status endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache shared by every worker process on a host.
+
+    SQLite in WAL mode gives concurrent readers with a single writer, and
+    mmap_size maps the database file into memory so hot reads avoid syscalls.
+    Values are pickled, so the file must only be writable by this service.
+    Expired rows are purged and the entry/byte caps enforced on every
+    `compact_every` writes, evicting the least recently accessed rows first.
+    A hit refreshes the row's access time only when it is older than
+    `touch_interval` seconds, so hot reads stay read-only transactions.
+    """
+
+    def __init__(self, path: str, namespace: str = "default", max_entries: int = 10000,
+                 ttl: float = 300, max_bytes: int = 0, mmap_size: int = 256 * 1024 * 1024,
+                 compact_every: int = 100, touch_interval: float = 60.0):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+            " size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (namespace, accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_many_with_ttl(self, keys: List[str]) -> List[Optional[Tuple[Any, float]]]:
+        return [self._get_entry(key) for key in keys]
+
+    def _get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[1] <= now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self.misses += 1
+                return None
+            if now - row[2] >= self.touch_interval:
+                self._conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+        try:
+            value = pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"[CACHE] Dropping unreadable entry {key[:12]}: {e}")
+            self.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, row[1] - now
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes and len(blob) > self.max_bytes:
+            logger.warning(f"[CACHE] Entry of {len(blob)} bytes exceeds cache byte limit, not caching")
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, sqlite3.Binary(blob), len(blob), expires_at, now)
+            )
+            self._writes += 1
+            due = self._writes % self.compact_every == 0
+        if due:
+            self.compact(vacuum=False)
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, key, time.time())
+            ).fetchone() is not None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def compact(self, vacuum: bool = True) -> None:
+        """Purge expired rows, enforce the size caps and optionally reclaim disk space"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()
+            excess = max(0, count - self.max_entries)
+            if self.max_bytes and total > self.max_bytes:
+                # Walk the oldest rows until enough bytes are freed
+                freed = 0
+                rows = self._conn.execute(
+                    "SELECT size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at",
+                    (self.namespace,)
+                )
+                needed = 0
+                for (size,) in rows:
+                    if total - freed <= self.max_bytes:
+                        break
+                    freed += size
+                    needed += 1
+                excess = max(excess, needed)
+            if excess:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    " SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                    (self.namespace, self.namespace, excess)
+                )
+                self.evictions += excess
+            if vacuum:
+                self._conn.execute("PRAGMA incremental_vacuum")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time())
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Values at least this large are zlib-compressed before going over the wire
+_COMPRESS_THRESHOLD = 512
+_RAW, _ZLIB = b"\x00", b"\x01"
+
+
+def encode_value(value: Any) -> bytes:
+    """Pickle with a one-byte header; larger payloads (verdict JSON, article lists) are compressed"""
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(blob) >= _COMPRESS_THRESHOLD:
+        packed = zlib.compress(blob, 1)
+        if len(packed) < len(blob):
+            return _ZLIB + packed
+    return _RAW + blob
+
+
+def decode_value(data: bytes) -> Any:
+    header, body = data[:1], data[1:]
+    if header == _ZLIB:
+        body = zlib.decompress(body)
+    elif header != _RAW:
+        raise ValueError(f"unknown cache encoding {header!r}")
+    return pickle.loads(body)
+
+
+_redis_clients: Dict[str, Any] = {}
+_redis_lock = threading.Lock()
+
+
+def get_redis_client(url: str, socket_timeout: float = 0.5):
+    """One pooled client per Redis URL, shared by every cache in the process"""
+    with _redis_lock:
+        client = _redis_clients.get(url)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(
+                url,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=socket_timeout,
+                health_check_interval=30
+            )
+            _redis_clients[url] = client
+        return client
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by every worker and host through Redis.
+
+    Keys are prefixed with the namespace and expire server-side, so size is
+    bounded by Redis' own maxmemory policy. get_many/put_many cost one round
+    trip (MGET and a non-transactional pipeline). After a connection error
+    the cache reports misses and drops writes for `retry_interval` seconds
+    instead of waiting on a dead server every call; a TieredCache in front
+    keeps serving from its local tier meanwhile.
+
+    `client` may be any redis-py compatible client (fakeredis in tests).
+    Values are pickled, so the server must only be writable by this service.
+    """
+
+    def __init__(self, client=None, url: Optional[str] = None, namespace: str = "default",
+                 ttl: float = 300, max_bytes: int = 0, retry_interval: float = 30.0,
+                 socket_timeout: float = 0.5):
+        if client is None:
+            if not url:
+                raise ValueError("RedisCache needs a client or a url")
+            client = get_redis_client(url, socket_timeout)
+        self._client = client
+        self.namespace = namespace
+        self.prefix = f"veritas:{namespace}:"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.retry_interval = retry_interval
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._down_until = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, e: Exception) -> None:
+        self.errors += 1
+        if self._available():
+            logger.warning(f"[CACHE] Redis unavailable, retrying in {self.retry_interval:.0f}s: {e}")
+        self._down_until = time.monotonic() + self.retry_interval
+
+    def _decode(self, key: str, data: Optional[bytes]) -> Optional[Any]:
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            value = decode_value(data)
+        except Exception as e:
+            logger.warning(f"[CACHE] Dropping unreadable entry {key[:12]}: {e}")
+            self.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def _encode(self, value: Any) -> Optional[bytes]:
+        data = encode_value(value)
+        if self.max_bytes and len(data) > self.max_bytes:
+            logger.warning(f"[CACHE] Entry of {len(data)} bytes exceeds cache byte limit, not caching")
+            return None
+        return data
+
+    def _ttl_ms(self, ttl: Optional[float]) -> int:
+        return max(1, int((self.ttl if ttl is None else ttl) * 1000))
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        if not self._available():
+            self.misses += len(keys)
+            return [None] * len(keys)
+        try:
+            rows = self._client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            self._failed(e)
+            self.misses += len(keys)
+            return [None] * len(keys)
+        return [self._decode(key, data) for key, data in zip(keys, rows)]
+
+    def get_many_with_ttl(self, keys: List[str]) -> List[Optional[Tuple[Any, float]]]:
+        if not keys:
+            return []
+        if not self._available():
+            self.misses += len(keys)
+            return [None] * len(keys)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(self.prefix + key)
+                pipe.pttl(self.prefix + key)
+            rows = pipe.execute()
+        except Exception as e:
+            self._failed(e)
+            self.misses += len(keys)
+            return [None] * len(keys)
+        entries = []
+        for key, data, ttl_ms in zip(keys, rows[0::2], rows[1::2]):
+            value = self._decode(key, data)
+            # PTTL is -1 for keys without an expiry
+            remaining = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else self.ttl
+            entries.append(None if value is None else (value, remaining))
+        return entries
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.put_many([(key, value)], ttl)
+
+    def put_many(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        if not self._available():
+            return
+        encoded = [(key, self._encode(value)) for key, value in items]
+        encoded = [(key, data) for key, data in encoded if data is not None]
+        if not encoded:
+            return
+        ttl_ms = self._ttl_ms(ttl)
+        try:
+            if len(encoded) == 1:
+                self._client.set(self.prefix + encoded[0][0], encoded[0][1], px=ttl_ms)
+                return
+            pipe = self._client.pipeline(transaction=False)
+            for key, data in encoded:
+                pipe.set(self.prefix + key, data, px=ttl_ms)
+            pipe.execute()
+        except Exception as e:
+            self._failed(e)
+
+    def contains(self, key: str) -> bool:
+        if not self._available():
+            return False
+        try:
+            return bool(self._client.exists(self.prefix + key))
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    def delete(self, key: str) -> None:
+        if not self._available():
+            return
+        try:
+            self._client.delete(self.prefix + key)
+        except Exception as e:
+            self._failed(e)
+
+    def _scan(self):
+        return self._client.scan_iter(match=self.prefix + "*", count=1000)
+
+    def clear(self) -> None:
+        if not self._available():
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for n, key in enumerate(self._scan(), 1):
+                pipe.unlink(key)
+                if n % 1000 == 0:
+                    pipe.execute()
+            pipe.execute()
+        except Exception as e:
+            self._failed(e)
+
+    def __len__(self) -> int:
+        """Entries in this namespace; a full SCAN, so kept off request paths and stats()"""
+        if not self._available():
+            return 0
+        try:
+            return sum(1 for _ in self._scan())
+        except Exception as e:
+            self._failed(e)
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "namespace": self.namespace,
+            "available": self._available(),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+
+class TieredCache(CacheBackend):
+    """
+    Process-local cache in front of a shared backend; shared hits are promoted locally.
+
+    A promoted entry expires locally no later than it does in the shared
+    tier. The async variants answer local hits inline and only hand the shared tier
+    to a worker thread.
+    """
+
+    def __init__(self, local: CacheBackend, shared: CacheBackend):
+        self.local = local
+        self.shared = shared
+        self.ttl = shared.ttl
+        self.blocking = shared.blocking
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return self._get_shared(key)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return await self.shared._run(self._get_shared, key)
+
+    def _get_shared(self, key: str) -> Optional[Any]:
+        return self._get_many_shared([key], [None])[0]
+
+    def _promote(self, key: str, value: Any, remaining: float) -> None:
+        self.local.put(key, value, min(self.local.ttl, remaining))
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return self._get_many_shared(keys, self.local.get_many(keys))
+
+    async def get_many_async(self, keys: List[str]) -> List[Optional[Any]]:
+        values = self.local.get_many(keys)
+        if all(value is not None for value in values):
+            return values
+        return await self.shared._run(self._get_many_shared, keys, values)
+
+    def _get_many_shared(self, keys: List[str], values: List[Optional[Any]]) -> List[Optional[Any]]:
+        """Fill the local misses in `values` from the shared tier"""
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        try:
+            shared = self.shared.get_many_with_ttl([keys[i] for i in missing])
+        except Exception as e:
+            logger.warning(f"[CACHE] Shared cache read failed: {e}")
+            return values
+        for i, entry in zip(missing, shared):
+            if entry is not None:
+                self._promote(keys[i], *entry)
+                values[i] = entry[0]
+        return values
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.put(key, value, ttl)
+        self._put_shared([(key, value)], ttl)
+
+    async def put_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.put(key, value, ttl)
+        await self.shared._run(self._put_shared, [(key, value)], ttl)
+
+    def put_many(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        items = list(items)
+        self.local.put_many(items, ttl)
+        self._put_shared(items, ttl)
+
+    async def put_many_async(self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        items = list(items)
+        self.local.put_many(items, ttl)
+        await self.shared._run(self._put_shared, items, ttl)
+
+    def _put_shared(self, items: List[Tuple[str, Any]], ttl: Optional[float]) -> None:
+        try:
+            if len(items) == 1:
+                self.shared.put(items[0][0], items[0][1], ttl)
+            else:
+                self.shared.put_many(items, ttl)
+        except Exception as e:
+            logger.warning(f"[CACHE] Shared cache write failed: {e}")
+
+    def contains(self, key: str) -> bool:
+        return self.local.contains(key) or self._shared_contains(key)
+
+    async def contains_async(self, key: str) -> bool:
+        return self.local.contains(key) or await self.shared._run(self._shared_contains, key)
+
+    def _shared_contains(self, key: str) -> bool:
+        try:
+            return self.shared.contains(key)
+        except Exception as e:
+            logger.warning(f"[CACHE] Shared cache read failed: {e}")
+            return False
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+    def __len__(self) -> int:
+        return len(self.shared)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local": self.local.stats(), "shared": self.shared.stats()}
+
+
+def build_redis_cache(cache_config: Dict[str, Any], namespace: str = "default",
+                      ttl: Optional[float] = None, client=None) -> Optional[RedisCache]:
+    """RedisCache when ENABLE_REDIS_CACHE and REDIS_URL are set (or a client is given), else None"""
+    if client is None and not (cache_config.get("enable_redis") and cache_config.get("redis_url")):
+        return None
+    try:
+        return RedisCache(
+            client=client,
+            url=cache_config.get("redis_url"),
+            namespace=namespace,
+            ttl=cache_config["ttl"] if ttl is None else ttl,
+            max_bytes=cache_config.get("shared_max_bytes", 0),
+            retry_interval=cache_config.get("redis_retry_interval", 30.0),
+            socket_timeout=cache_config.get("redis_socket_timeout", 0.5)
+        )
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis cache unavailable for {namespace}: {e}")
+        return None
+
+
+def build_cache(cache_config: Dict[str, Any], namespace: str = "default",
+                redis_client=None) -> CacheBackend:
+    """Create the configured verdict cache from get_cache_config()"""
+    local = TTLCache(
+        max_entries=cache_config["max_size"],
+        ttl=cache_config["ttl"],
+        max_bytes=cache_config.get("max_bytes", 0)
+    )
+    redis_cache = build_redis_cache(cache_config, namespace, client=redis_client)
+    if redis_cache is not None:
+        return TieredCache(local, redis_cache)
+    backend = cache_config.get("backend", "memory")
+    if backend == "sqlite":
+        try:
+            shared = SQLiteCache(
+                cache_config["sqlite_path"],
+                namespace=namespace,
+                max_entries=cache_config.get("shared_max_size", cache_config["max_size"]),
+                ttl=cache_config["ttl"],
+                max_bytes=cache_config.get("shared_max_bytes", 0)
+            )
+            return TieredCache(local, shared)
+        except Exception as e:
+            logger.warning(f"[CACHE] SQLite cache unavailable, using in-memory cache only: {e}")
+    return local
+
+
+# Words that flip a claim's meaning without moving its embedding much
+_NEGATION_WORDS = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot",
+    "false", "myth", "deny", "denies", "denied", "refute", "refutes", "debunk", "debunked",
+})
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'.,%]*")
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def claim_signature(text: str) -> Tuple[bool, Tuple[str, ...]]:
+    """
+    Negation polarity and the numbers of a claim.
+
+    "X causes Y" and "X does not cause Y", or "5% of ..." and "50% of ...",
+    embed almost identically; claims whose signatures differ are never
+    served each other's verdict.
+    """
+    lowered = text.lower().replace("’", "'")
+    negated = any(
+        word.strip(".,'%") in _NEGATION_WORDS or word.rstrip(".,'%").endswith("n't")
+        for word in _WORD_PATTERN.findall(lowered)
+    )
+    numbers = tuple(sorted({n.replace(",", "") for n in _NUMBER_PATTERN.findall(lowered)}))
+    return negated, numbers
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup over claim embeddings.
+
+    Embeddings are L2-normalized and stored in a float32 matrix used as a ring
+    buffer, so a lookup is one BLAS matrix-vector product. The matrix starts at
+    `initial_capacity` rows and doubles as it fills, up to `max_entries`, so
+    memory follows the number of cached claims rather than the cap. Each row
+    points at a key in the exact-match cache, which owns the values, their TTL
+    and eviction; a row whose key has been evicted is simply a miss. Rows above
+    the threshold are only hits when the claim's negation and numbers match
+    (see claim_signature).
+    """
+
+    def __init__(self, max_entries: int = 100000, threshold: float = 0.95, initial_capacity: int = 1024):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.initial_capacity = max(1, min(initial_capacity, max_entries))
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[Optional[str]] = []
+        self._signatures: List[Optional[Tuple[bool, Tuple[str, ...]]]] = []
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.guarded = 0
+
+    def add(self, key: str, embedding: np.ndarray, text: str) -> None:
+        vector = self._normalize(embedding)
+        signature = claim_signature(text)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.initial_capacity, vector.shape[0]), dtype=np.float32)
+            elif self._next == len(self._matrix):
+                # Only reached before the first wrap-around, while below max_entries
+                grown = np.zeros((min(2 * len(self._matrix), self.max_entries), vector.shape[0]), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            row = self._next
+            self._matrix[row] = vector
+            if row == len(self._keys):
+                self._keys.append(key)
+                self._signatures.append(signature)
+            else:
+                self._keys[row] = key
+                self._signatures[row] = signature
+            self._next = (row + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def lookup(self, embedding: np.ndarray, text: str) -> Optional[Tuple[str, float]]:
+        """Return (key, cosine) of the closest stored claim above the threshold with the same signature"""
+        if self._matrix is None or self._size == 0:
+            self.misses += 1
+            return None
+        vector = self._normalize(embedding)
+        signature = claim_signature(text)
+        with self._lock:
+            scores = self._matrix[:self._size] @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            ranked = [(float(scores[i]), self._keys[i], self._signatures[i]) for i in candidates]
+        for score, key, row_signature in sorted(ranked, key=lambda r: r[0], reverse=True):
+            if key is None:
+                continue
+            if row_signature != signature:
+                self.guarded += 1
+                continue
+            self.hits += 1
+            return key, score
+        self.misses += 1
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = None
+            self._keys = []
+            self._signatures = []
+            self._size = 0
+            self._next = 0
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        return vector
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "capacity": 0 if self._matrix is None else len(self._matrix),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "guarded": self.guarded,
+        }
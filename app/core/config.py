@@ -18,13 +18,27 @@ class Settings(BaseSettings):
     # Performance Settings
     MAX_WORKERS: int = Field(default=4, description="Maximum worker processes")
     MAX_CONCURRENT_REQUESTS: int = Field(default=20, description="Max concurrent API requests")
+    ADMISSION_QUEUE_SIZE: int = Field(default=50, description="Requests allowed to wait for a pipeline slot")
+    ADMISSION_QUEUE_TIMEOUT: float = Field(default=10.0, description="Seconds a request may wait for a slot")
     REQUEST_TIMEOUT: int = Field(default=30, description="Request timeout in seconds")
+    MAX_BATCH_CLAIMS: int = Field(default=50, description="Maximum claims per batch fact-check request")
+    CPU_POOL_SIZE: int = Field(default=4, description="Threads for CPU-bound pipeline stages per worker")
     
     # Caching Configuration
     CACHE_TTL: int = Field(default=300, description="Cache TTL in seconds")
     CACHE_MAX_SIZE: int = Field(default=1000, description="Maximum cache entries")
+    CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, description="Maximum cache size in bytes (0 = unbounded)")
+    CACHE_BACKEND: str = Field(default="sqlite", description="Verdict cache backend: memory or sqlite")
+    CACHE_SQLITE_PATH: str = Field(default="cache/verdicts.sqlite3", description="Shared on-disk cache file")
+    CACHE_SHARED_MAX_SIZE: int = Field(default=50000, description="Maximum entries in the shared cache")
+    CACHE_SHARED_MAX_BYTES: int = Field(default=512 * 1024 * 1024, description="Maximum shared cache size in bytes")
+    ENABLE_SEMANTIC_CACHE: bool = Field(default=True, description="Serve verdicts for near-duplicate claims")
+    SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.95, description="Minimum cosine similarity for a semantic cache hit")
+    SEMANTIC_CACHE_MAX_ENTRIES: int = Field(default=100000, description="Maximum claim embeddings kept for semantic lookup")
     ENABLE_REDIS_CACHE: bool = Field(default=False, description="Enable Redis caching")
     REDIS_URL: Optional[str] = Field(default=None, description="Redis connection URL")
+    REDIS_SOCKET_TIMEOUT: float = Field(default=0.5, description="Redis connect/read timeout in seconds")
+    REDIS_RETRY_INTERVAL: float = Field(default=30.0, description="Seconds Redis is bypassed after a connection error")
     
     # Database Configuration (if needed later)
     DATABASE_URL: Optional[str] = Field(default=None, description="Database connection string")
@@ -35,6 +49,16 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY_2: str = Field(default="", description="Secondary Google API Key")
     GOOGLE_CSE_ID_2: str = Field(default="", description="Secondary Google CSE ID")
     GOOGLE_API_KEY_NEW: str = Field(default="", description="New Google API Key")
+    GOOGLE_CSE_CONNECT_TIMEOUT: float = Field(default=3.0, description="Google CSE connect timeout in seconds")
+    GOOGLE_CSE_READ_TIMEOUT: float = Field(default=8.0, description="Google CSE read timeout in seconds")
+    GOOGLE_CSE_MAX_RETRIES: int = Field(default=2, description="Retries for transient Google CSE failures")
+    GOOGLE_CSE_BACKOFF_BASE: float = Field(default=0.25, description="Base delay in seconds for jittered retry backoff")
+    GOOGLE_CSE_POOL_SIZE: int = Field(default=20, description="Pooled connections to the Google CSE endpoint")
+    GOOGLE_KEY_COOLDOWN: int = Field(default=3600, description="Seconds a rate-limited API key is skipped")
+    GOOGLE_CSE_DAILY_QUOTA: int = Field(default=100, description="Daily query budget per Google API key")
+    GOOGLE_CSE_QUOTA_RESERVE: int = Field(default=5, description="Queries per key held back from being spent")
+    SEARCH_CACHE_TTL: int = Field(default=6 * 3600, description="Seconds a search result is served from cache")
+    SEARCH_CACHE_PATH: str = Field(default="cache/search_gateway.sqlite3", description="Shared on-disk search cache")
     
     NEWSAPI_KEY: str = Field(default="", description="NewsAPI.org API Key")
     GNEWS_API_KEY: str = Field(default="", description="GNews API Key")
@@ -50,8 +74,21 @@ class Settings(BaseSettings):
     # LLM Configuration
     ENABLE_LLM_PROCESSING: bool = Field(default=True, description="Enable LLM-based processing")
     LLM_MODEL_NAME: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", description="Default LLM model")
+    PRELOAD_MODELS: str = Field(
+        default="",
+        description="Comma-separated registry keys to load at startup, e.g. 'sentence_transformer,cross_encoder,spacy'"
+    )
+    WARM_LLM_PIPELINE: bool = Field(default=True, description="Load the LLM pipeline components in the background at startup")
     LLM_BATCH_SIZE: int = Field(default=32, description="LLM batch processing size")
     LLM_MAX_LENGTH: int = Field(default=512, description="Maximum text length for LLM processing")
+    NLI_PREFILTER_THRESHOLD: float = Field(default=0.25, description="Minimum bi-encoder similarity for NLI scoring")
+    NLI_BATCH_SIZE: int = Field(default=16, description="Cross-encoder batch size")
+    STREAM_MATCH_CHUNK_SIZE: int = Field(default=4, description="Articles matched per step of a streamed verification")
+    DEDUP_SIMILARITY_THRESHOLD: float = Field(default=0.92, description="Title similarity ratio treated as duplicate")
+    DEDUP_NUM_PERM: int = Field(default=128, description="MinHash permutations for title dedup")
+    DEDUP_BANDS: int = Field(default=32, description="LSH bands for title dedup")
+    NLI_MAX_TOKENS: int = Field(default=256, description="Token budget per claim/article NLI pair")
+    PREPROCESS_CACHE_SIZE: int = Field(default=4096, description="Memoized claim preprocessing results")
     
     # News Processing
     MAX_ARTICLES_PER_SOURCE: int = Field(default=15, description="Maximum articles per news source")
@@ -61,7 +98,14 @@ class Settings(BaseSettings):
     # Security Settings
     CORS_ORIGINS: list = Field(default=["*"], description="Allowed CORS origins")
     API_KEY_HEADER: str = Field(default="X-API-Key", description="API key header name")
+    API_KEYS: list = Field(default=[], description="API keys rate limited per key; other clients are limited per IP")
     RATE_LIMIT_PER_MINUTE: int = Field(default=100, description="Rate limit per minute per IP")
+    RATE_LIMIT_BURST: int = Field(default=0, description="Requests a client may burst (0 = RATE_LIMIT_PER_MINUTE)")
+    RATE_LIMIT_BACKEND: str = Field(default="memory", description="Rate limit buckets: memory (per worker) or sqlite (shared)")
+    RATE_LIMIT_SQLITE_PATH: str = Field(default="cache/rate_limits.sqlite3", description="Shared rate limit bucket file")
+    RATE_LIMIT_MAX_CLIENTS: int = Field(default=100000, description="Maximum client buckets kept in memory")
+    RATE_LIMIT_IDLE_TTL: int = Field(default=600, description="Seconds before an idle client bucket is dropped")
+    RATE_LIMIT_TRUST_PROXY: bool = Field(default=False, description="Identify clients by X-Forwarded-For")
     
     # Logging Configuration
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
@@ -92,8 +136,15 @@ def get_cache_config() -> dict:
     return {
         "ttl": settings.CACHE_TTL,
         "max_size": settings.CACHE_MAX_SIZE,
+        "max_bytes": settings.CACHE_MAX_BYTES,
+        "backend": settings.CACHE_BACKEND,
+        "sqlite_path": settings.CACHE_SQLITE_PATH,
+        "shared_max_size": settings.CACHE_SHARED_MAX_SIZE,
+        "shared_max_bytes": settings.CACHE_SHARED_MAX_BYTES,
         "enable_redis": settings.ENABLE_REDIS_CACHE,
-        "redis_url": settings.REDIS_URL
+        "redis_url": settings.REDIS_URL,
+        "redis_socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "redis_retry_interval": settings.REDIS_RETRY_INTERVAL
     }
 
 def get_api_limits() -> dict:
@@ -101,5 +152,10 @@ def get_api_limits() -> dict:
     return {
         "max_concurrent": settings.MAX_CONCURRENT_REQUESTS,
         "timeout": settings.REQUEST_TIMEOUT,
-        "rate_limit": settings.RATE_LIMIT_PER_MINUTE
+        "rate_limit": settings.RATE_LIMIT_PER_MINUTE,
+        "rate_limit_burst": settings.RATE_LIMIT_BURST,
+        "rate_limit_backend": settings.RATE_LIMIT_BACKEND,
+        "rate_limit_sqlite_path": settings.RATE_LIMIT_SQLITE_PATH,
+        "rate_limit_max_clients": settings.RATE_LIMIT_MAX_CLIENTS,
+        "rate_limit_idle_ttl": settings.RATE_LIMIT_IDLE_TTL
     }
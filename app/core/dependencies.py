@@ -34,14 +34,20 @@ class MockVerifier:
             "explanations": []
         }
 
+    async def verify_claim_async(self, request):
+        return self.verify_claim(request)
+
 @lru_cache()
 def get_verifier():
     """Return real verifier with new computation logic"""
     logger.info("Using real verifier with new computation logic")
-    from app.services.verifier import verify_claim
+    from app.services.verifier import verify_claim, verify_claim_async
 
     class RealVerifier:
         def verify_claim(self, request):
             return verify_claim(request)
 
+        async def verify_claim_async(self, request):
+            return await verify_claim_async(request)
+
     return RealVerifier()
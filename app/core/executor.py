@@ -0,0 +1,58 @@
+"""
+Execution layer for running blocking pipeline stages off the asyncio event loop
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.admission import with_deadline
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Model inference (torch, spaCy) releases the GIL for the heavy lifting and the
+# models live in this process, so a bounded thread pool is used rather than a
+# process pool that would have to load every model again.
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Return the shared, bounded executor for CPU-bound stages"""
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _lock:
+            if _cpu_executor is None:
+                _cpu_executor = ThreadPoolExecutor(
+                    max_workers=settings.CPU_POOL_SIZE,
+                    thread_name_prefix="veritas-cpu"
+                )
+                logger.info(f"⚙️ CPU executor started with {settings.CPU_POOL_SIZE} threads")
+    return _cpu_executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in the CPU pool and await its result.
+
+    Waiting is bounded by the current request's deadline; a stage that overruns
+    raises DeadlineExceeded (its thread finishes in the background and the
+    result is dropped).
+    """
+    loop = asyncio.get_running_loop()
+    return await with_deadline(
+        loop.run_in_executor(get_cpu_executor(), functools.partial(func, *args, **kwargs))
+    )
+
+
+def shutdown_executors() -> None:
+    """Stop the pools on application shutdown"""
+    global _cpu_executor
+    with _lock:
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=False, cancel_futures=True)
+            _cpu_executor = None
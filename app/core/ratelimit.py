@@ -0,0 +1,279 @@
+"""
+Per-client token-bucket rate limiting
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# (allowed, tokens left, seconds until the next token)
+Decision = Tuple[bool, float, float]
+
+
+class BucketStore:
+    """Holds token buckets; `take` refills and spends one token in a single step"""
+
+    # Stores that wait on disk are called from a worker thread, never the event loop
+    blocking = False
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Decision:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, object]:
+        return {}
+
+
+def _refill(tokens: float, updated: float, rate: float, capacity: float, now: float) -> Decision:
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / rate
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Buckets of this worker, in least-recently-seen order.
+
+    Every request moves its bucket to the end, so idle buckets collect at the
+    front and are evicted from there: a couple of them per request, and
+    oldest-first once `max_entries` is reached.
+    """
+
+    def __init__(self, max_entries: int = 100000, idle_ttl: float = 600):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Decision:
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            decision = _refill(tokens, updated, rate, capacity, now)
+            self._buckets[key] = (decision[1], now)
+            self._evict(now)
+        return decision
+
+    def _evict(self, now: float) -> None:
+        # Bounded work per call; a full bucket that has sat idle is the same as a new one
+        for _ in range(2):
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.idle_ttl:
+                break
+            del self._buckets[key]
+            self.evictions += 1
+        while len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "memory", "clients": len(self), "max_clients": self.max_entries,
+                "evictions": self.evictions}
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Buckets shared by every worker through one SQLite file (WAL mode).
+
+    Each request is one read and one upsert in an IMMEDIATE transaction, so
+    workers never both spend the last token. Idle rows are purged every
+    `purge_every` requests. A write lock not granted within `busy_timeout`
+    raises, and RateLimiter lets the request through.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, idle_ttl: float = 600, purge_every: int = 1000,
+                 busy_timeout: float = 0.25):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.purge_every = purge_every
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_buckets_updated ON rate_buckets (updated_at)")
+        # Setup above may wait for other workers; per-request transactions may not
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self._requests = 0
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Decision:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                decision = _refill(tokens, updated, rate, capacity, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, decision[1], now)
+                )
+                self._requests += 1
+                if self._requests % self.purge_every == 0:
+                    self._conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (now - self.idle_ttl,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return decision
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "sqlite", "path": self.path, "clients": len(self)}
+
+
+class RateLimiter:
+    """
+    Token bucket per client: `per_minute` tokens a minute, bursts up to `burst`.
+
+    Refill is computed lazily from the time of the last request, so a check
+    is O(1) and nothing runs in the background.
+    """
+
+    def __init__(self, store: BucketStore, per_minute: int, burst: Optional[int] = None):
+        self.store = store
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.allowed = 0
+        self.limited = 0
+
+    def check(self, key: str) -> Decision:
+        try:
+            decision = self.store.take(key, self.rate, self.capacity, time.time())
+        except Exception as e:
+            # A broken shared store must not take the API down with it
+            logger.warning(f"[RATE LIMIT] Bucket store failed, allowing request: {e}")
+            return True, self.capacity, 0.0
+        if decision[0]:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return decision
+
+    async def check_async(self, key: str) -> Decision:
+        """check() for the event loop; blocking stores run in a worker thread"""
+        if not self.store.blocking:
+            return self.check(key)
+        return await asyncio.get_running_loop().run_in_executor(None, self.check, key)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "per_minute": self.per_minute,
+            "burst": int(self.capacity),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            **self.store.stats(),
+        }
+
+
+def build_rate_limiter(config: Dict[str, object]) -> Optional[RateLimiter]:
+    """RateLimiter from get_api_limits(); None when rate limiting is disabled"""
+    per_minute = int(config.get("rate_limit") or 0)
+    if per_minute <= 0:
+        return None
+    idle_ttl = float(config.get("rate_limit_idle_ttl") or 600)
+    if config.get("rate_limit_backend") == "sqlite":
+        try:
+            store: BucketStore = SQLiteBucketStore(str(config["rate_limit_sqlite_path"]), idle_ttl=idle_ttl)
+        except Exception as e:
+            logger.warning(f"[RATE LIMIT] Shared bucket store unavailable, using per-worker buckets: {e}")
+            store = MemoryBucketStore(int(config.get("rate_limit_max_clients") or 100000), idle_ttl)
+    else:
+        store = MemoryBucketStore(int(config.get("rate_limit_max_clients") or 100000), idle_ttl)
+    return RateLimiter(store, per_minute, int(config.get("rate_limit_burst") or 0) or None)
+
+
+def _hash_key(key: bytes) -> str:
+    return hashlib.sha256(key).hexdigest()[:16]
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that charges one token per request under `paths`.
+
+    Clients presenting one of the configured `api_keys` in the API key header
+    get a bucket per key (hashed, so raw keys never sit in the bucket table);
+    everyone else, including clients sending unknown keys, is identified by
+    client IP. The first X-Forwarded-For hop is only trusted when
+    `trust_proxy` is set.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, paths: Iterable[str], api_key_header: str,
+                 trust_proxy: bool = False, api_keys: Iterable[str] = ()):
+        self.app = app
+        self.limiter = limiter
+        self.paths = tuple(paths)
+        self.api_key_header = api_key_header.lower().encode()
+        self.trust_proxy = trust_proxy
+        self.known_keys = {_hash_key(key.encode()) for key in api_keys if key}
+
+    def _client_key(self, scope) -> str:
+        forwarded = None
+        for name, value in scope.get("headers", ()):
+            if name == self.api_key_header and value:
+                hashed = _hash_key(value)
+                if hashed in self.known_keys:
+                    return "key:" + hashed
+            elif name == b"x-forwarded-for":
+                forwarded = value
+        if self.trust_proxy and forwarded:
+            return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        allowed, remaining, wait = await self.limiter.check_async(self._client_key(scope))
+        limit_headers: List[Tuple[bytes, bytes]] = [
+            (b"x-ratelimit-limit", str(self.limiter.per_minute).encode()),
+            (b"x-ratelimit-remaining", str(int(remaining)).encode()),
+        ]
+
+        if not allowed:
+            retry_after = max(1, math.ceil(wait))
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(retry_after)}
+            )
+            response.raw_headers.extend(limit_headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + limit_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
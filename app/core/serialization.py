@@ -0,0 +1,50 @@
+"""
+JSON encoding for cached responses: encode once, patch per-request fields as bytes
+"""
+
+import json
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # Plain json produces the same output, only slower
+    orjson = None
+
+# Fields that differ on every hit; they are never stored, only appended when serving
+VOLATILE_FIELDS = ("cached", "processing_time", "semantic_similarity")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, default=str, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_cached(payload: Dict[str, Any]) -> bytes:
+    """JSON object bytes of a response, without the per-request fields"""
+    return dumps({k: v for k, v in payload.items() if k not in VOLATILE_FIELDS})
+
+
+def cached_body(value: Union[bytes, Dict[str, Any]]) -> bytes:
+    """Stored cache value as JSON bytes (entries written before bytes were stored are dicts)"""
+    return value if isinstance(value, (bytes, bytearray)) else encode_cached(value)
+
+
+def patch_json(body: bytes, **fields) -> bytes:
+    """
+    Append top-level fields to an encoded JSON object without decoding it.
+
+    `body` must come from encode_cached, so none of `fields` is present yet.
+    """
+    if not fields:
+        return body
+    extra = b",".join(b'"' + name.encode() + b'":' + dumps(value) for name, value in fields.items())
+    if body == b"{}":
+        return b"{" + extra + b"}"
+    return body[:-1] + b"," + extra + b"}"
@@ -0,0 +1,160 @@
+"""
+Tests for admission control and request deadlines
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.admission import (
+    AdmissionController, AdmissionMiddleware, DeadlineExceeded, Overloaded,
+    check_deadline, remaining_time, reset_deadline, set_deadline, with_deadline
+)
+
+
+def _scope(path="/api/fact-check", method="POST"):
+    return {"type": "http", "method": method, "path": path, "headers": []}
+
+
+async def _call(middleware, scope, body=b"{}"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"]), b"".join(
+        m.get("body", b"") for m in messages[1:]
+    )
+
+
+def _app(handler=None):
+    async def app(scope, receive, send):
+        message = await receive()
+        if handler is not None:
+            await handler()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": message["body"]})
+    return app
+
+
+def test_deadline_context():
+    assert remaining_time() is None
+    token = set_deadline(5)
+    try:
+        assert 4 < remaining_time() <= 5
+        check_deadline()
+    finally:
+        reset_deadline(token)
+    assert remaining_time() is None
+
+    token = set_deadline(-1)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            check_deadline()
+    finally:
+        reset_deadline(token)
+
+
+def test_with_deadline_cancels_slow_work():
+    async def scenario():
+        token = set_deadline(0.05)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await with_deadline(asyncio.sleep(1))
+        finally:
+            reset_deadline(token)
+        assert await with_deadline(asyncio.sleep(0, result="done")) == "done"
+
+    asyncio.run(scenario())
+
+
+def test_controller_sheds_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as excinfo:
+            await controller.acquire()
+        assert excinfo.value.retry_after >= 1
+        controller.release(0.1)
+        await waiter
+        controller.release(0.1)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["admitted"], stats["rejected"], stats["active"]) == (2, 1, 0)
+
+
+def test_controller_times_out_waiters():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        return controller.timed_out
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_middleware_returns_503_with_retry_after_when_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+        middleware = AdmissionMiddleware(_app(), controller, paths=("/api/fact-check",), timeout=5)
+        await controller.acquire()
+        return await _call(middleware, _scope())
+
+    status, headers, body = asyncio.run(scenario())
+    assert status == 503
+    assert b"retry-after" in headers
+    assert json.loads(body)["detail"] == "Server is at capacity"
+
+
+def test_cached_requests_skip_admission_and_keep_their_body():
+    probed = []
+
+    async def probe(path, body):
+        probed.append((path, body))
+        return True
+
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+        middleware = AdmissionMiddleware(_app(), controller, paths=("/api/fact-check",), timeout=5,
+                                         cache_probe=probe)
+        await controller.acquire()  # saturated, yet the cached request goes through
+        return await _call(middleware, _scope(), body=b'{"text": "claim"}')
+
+    status, _, body = asyncio.run(scenario())
+    assert status == 200
+    assert body == b'{"text": "claim"}'
+    assert probed == [("/api/fact-check", b'{"text": "claim"}')]
+
+
+def test_requests_past_their_deadline_get_504():
+    async def slow():
+        await with_deadline(asyncio.sleep(1))
+
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+        middleware = AdmissionMiddleware(_app(slow), controller, paths=("/api/fact-check",), timeout=0.05)
+        result = await _call(middleware, _scope())
+        return result, controller.active
+
+    (status, _, _), active = asyncio.run(scenario())
+    assert status == 504
+    assert active == 0
+
+
+def test_uncontrolled_requests_pass_through():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+        middleware = AdmissionMiddleware(_app(), controller, paths=("/api/fact-check",), timeout=5)
+        await controller.acquire()
+        return await _call(middleware, _scope(method="GET"))
+
+    assert asyncio.run(scenario())[0] == 200
@@ -0,0 +1,378 @@
+"""
+Tests for the response cache backends
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.core.cache import (
+    RedisCache, SQLiteCache, SemanticCache, TieredCache, TTLCache, claim_signature, decode_value
+)
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+# === TTLCache ===
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl=60)
+    cache.put("k", "v", ttl=-1)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert cache.expirations == 1
+
+    cache.put("brief", "v", ttl=0.01)
+    time.sleep(0.05)
+    assert cache.get("brief") is None
+
+
+def test_ttl_cache_enforces_the_byte_limit():
+    cache = TTLCache(max_entries=100, ttl=60, max_bytes=2000)
+    cache.put("huge", "x" * 5000)
+    assert cache.get("huge") is None  # larger than the whole cache, not stored
+
+    for i in range(10):
+        cache.put(f"k{i}", "x" * 500)
+    stats = cache.stats()
+    assert 0 < stats["bytes"] <= 2000
+    assert cache.get("k9") is not None and cache.get("k0") is None
+
+
+def test_ttl_cache_replacing_an_entry_keeps_the_byte_count():
+    cache = TTLCache(max_entries=10, ttl=60)
+    cache.put("k", "x" * 100)
+    before = cache.stats()["bytes"]
+    cache.put("k", "y" * 100)
+    assert cache.stats()["bytes"] == before
+    cache.delete("k")
+    assert cache.stats()["bytes"] == 0 and len(cache) == 0
+
+
+def test_ttl_cache_stats():
+    cache = TTLCache(max_entries=10, ttl=60)
+    cache.put("k", "v")
+    cache.get("k")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+# === SemanticCache ===
+
+def test_semantic_cache_hits_near_duplicates():
+    cache = SemanticCache(max_entries=4, threshold=0.95)
+    cache.add("k1", _unit(1.0, 0.0, 0.0), "Vaccines cause autism")
+    key, score = cache.lookup(_unit(1.0, 0.05, 0.0), "vaccines cause autism!")
+    assert key == "k1" and score >= 0.95
+    assert cache.lookup(_unit(0.0, 1.0, 0.0), "Vaccines cause autism") is None
+
+
+def test_semantic_cache_rejects_negated_claims():
+    cache = SemanticCache(max_entries=4, threshold=0.9)
+    cache.add("causes", _unit(1.0, 0.0), "Smoking causes cancer")
+    assert cache.lookup(_unit(1.0, 0.01), "Smoking does not cause cancer") is None
+    assert cache.lookup(_unit(1.0, 0.01), "Smoking doesn't cause cancer") is None
+    assert cache.stats()["guarded"] == 2
+
+
+def test_semantic_cache_rejects_different_numbers():
+    cache = SemanticCache(max_entries=4, threshold=0.9)
+    cache.add("five", _unit(1.0, 0.0), "5% of people are left-handed")
+    assert cache.lookup(_unit(1.0, 0.01), "50% of people are left-handed") is None
+    assert cache.lookup(_unit(1.0, 0.01), "5% of people are left handed") is not None
+
+
+def test_semantic_cache_prefers_the_closest_compatible_row():
+    cache = SemanticCache(max_entries=4, threshold=0.9)
+    cache.add("negated", _unit(1.0, 0.0), "The vote was not rigged")
+    cache.add("plain", _unit(1.0, 0.2), "The vote was rigged")
+    key, score = cache.lookup(_unit(1.0, 0.0), "the vote was rigged")
+    assert key == "plain"
+    assert 0.9 <= score < 1.0
+
+
+def test_semantic_cache_ring_buffer_overwrites_oldest():
+    cache = SemanticCache(max_entries=2, threshold=0.99)
+    cache.add("a", _unit(1.0, 0.0, 0.0), "a")
+    cache.add("b", _unit(0.0, 1.0, 0.0), "b")
+    cache.add("c", _unit(0.0, 0.0, 1.0), "c")
+    assert len(cache) == 2
+    assert cache.lookup(_unit(1.0, 0.0, 0.0), "a") is None
+    assert cache.lookup(_unit(0.0, 0.0, 1.0), "c")[0] == "c"
+
+
+def test_semantic_cache_grows_by_doubling_up_to_the_cap():
+    cache = SemanticCache(max_entries=5, threshold=0.99, initial_capacity=2)
+    cache.add("k0", _unit(1.0, 0.0), "k0")
+    assert cache._matrix.shape == (2, 2)
+    for i in range(1, 4):
+        cache.add(f"k{i}", _unit(1.0, float(i)), f"k{i}")
+    assert cache._matrix.shape == (4, 2)
+    # Rows copied by the growth are still found
+    assert cache.lookup(_unit(1.0, 0.0), "k0")[0] == "k0"
+
+    for i in range(4, 7):
+        cache.add(f"k{i}", _unit(1.0, float(i)), f"k{i}")
+    assert cache.stats()["capacity"] == 5 and len(cache) == 5
+    # Full: the two oldest rows were overwritten in place
+    assert cache.lookup(_unit(1.0, 0.0), "k0") is None
+    assert cache.lookup(_unit(1.0, 6.0), "k6")[0] == "k6"
+    assert cache.lookup(_unit(1.0, 2.0), "k2")[0] == "k2"
+
+
+def test_semantic_cache_scores_in_float32():
+    cache = SemanticCache(max_entries=8, threshold=0.5)
+    cache.add("k", np.array([3.0, 4.0]), "k")
+    assert cache._matrix.dtype == np.float32
+    assert cache.lookup(np.array([3.0, 4.0]), "k")[1] == pytest.approx(1.0, abs=1e-6)
+
+
+def test_claim_signature():
+    assert claim_signature("X causes Y") == (False, ())
+    assert claim_signature("X never causes Y")[0]
+    assert claim_signature("It isn’t true")[0]
+    assert claim_signature("1,000 people, 3.5 million dollars")[1] == ("1000", "3.5")
+
+
+# === contains() ===
+
+def test_contains_does_not_count_or_reorder():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.contains("a") and not cache.contains("missing")
+    assert (cache.hits, cache.misses) == (0, 0)
+    # "a" was probed, not used, so it is still the first to be evicted
+    cache.put("c", 3)
+    assert not cache.contains("a")
+    cache.put("expired", 4, ttl=-1)
+    assert not cache.contains("expired")
+
+
+def test_contains_on_shared_tiers(tmp_path):
+    sqlite = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    sqlite.put("k", "v")
+    sqlite.put("old", "v", ttl=-1)
+    assert sqlite.contains("k") and not sqlite.contains("old")
+    assert (sqlite.hits, sqlite.misses) == (0, 0)
+
+    cache = TieredCache(TTLCache(max_entries=10, ttl=60), sqlite)
+    assert asyncio.run(cache.contains_async("k"))
+    assert len(cache.local) == 0  # a probe does not promote
+
+
+# === SQLiteCache ===
+
+def _accessed_at(cache, key):
+    return cache._conn.execute(
+        "SELECT accessed_at FROM cache_entries WHERE namespace = ? AND key = ?", (cache.namespace, key)
+    ).fetchone()[0]
+
+
+def test_sqlite_cache_round_trip_and_namespaces(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    a = SQLiteCache(path, namespace="a", ttl=60)
+    b = SQLiteCache(path, namespace="b", ttl=60)
+    a.put("k", {"verdict": "TRUE"})
+    assert a.get("k") == {"verdict": "TRUE"}
+    assert b.get("k") is None
+    assert len(a) == 1 and len(b) == 0
+    a.clear()
+    assert a.get("k") is None
+
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.put("k", "v", ttl=-1)
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_cache_only_touches_stale_access_times(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60, touch_interval=60)
+    cache.put("k", "v")
+    written = _accessed_at(cache, "k")
+    assert cache.get("k") == "v"
+    assert _accessed_at(cache, "k") == written
+
+    cache._conn.execute("UPDATE cache_entries SET accessed_at = accessed_at - 120")
+    assert cache.get("k") == "v"
+    assert _accessed_at(cache, "k") >= written
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2, ttl=60, compact_every=1)
+    cache.put("old", 1)
+    cache._conn.execute("UPDATE cache_entries SET accessed_at = accessed_at - 10 WHERE key = 'old'")
+    cache.put("new", 2)
+    cache.put("newest", 3)
+    assert cache.get("old") is None
+    assert cache.get_many(["new", "newest"]) == [2, 3]
+
+
+def test_async_accessors_reach_the_shared_tier(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache = TieredCache(TTLCache(max_entries=10, ttl=60), shared)
+
+    async def scenario():
+        await cache.put_async("a", 1)
+        await cache.put_many_async([("b", 2), ("c", 3)])
+        cache.local.clear()
+        assert await cache.get_async("a") == 1
+        assert await cache.get_many_async(["a", "b", "c", "d"]) == [1, 2, 3, None]
+
+    asyncio.run(scenario())
+    assert len(cache.local) == 3
+
+
+# === TieredCache ===
+
+def test_tiered_cache_promotes_with_the_remaining_shared_ttl(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=300)
+    cache = TieredCache(TTLCache(max_entries=10, ttl=300), shared)
+    shared.put("k", "v", ttl=5)
+
+    assert cache.get("k") == "v"
+    expires_at = cache.local._data["k"][0]
+    assert expires_at <= time.time() + 5
+
+    shared.put("m", "w", ttl=5)
+    assert cache.get_many(["m"]) == ["w"]
+    assert cache.local._data["m"][0] <= time.time() + 5
+
+
+def test_tiered_cache_clear_reaches_the_shared_tier(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache = TieredCache(TTLCache(max_entries=10, ttl=60), shared)
+    cache.put("k", "v")
+    cache.clear()
+    assert cache.local.get("k") is None
+    assert shared.get("k") is None
+
+
+# === RedisCache ===
+
+def _fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis()
+
+
+class _DownRedis:
+    """Client whose every command fails like an unreachable server"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __getattr__(self, name):
+        import redis
+
+        def command(*args, **kwargs):
+            self.calls += 1
+            raise redis.ConnectionError("connection refused")
+        return command
+
+
+def test_redis_cache_round_trip():
+    cache = RedisCache(client=_fake_redis(), namespace="test", ttl=60)
+    cache.put("k", {"verdict": "TRUE"})
+    assert cache.get("k") == {"verdict": "TRUE"}
+    assert cache.get("missing") is None
+    cache.put_many([("a", 1), ("b", 2)])
+    assert cache.get_many(["a", "b", "c"]) == [1, 2, None]
+    assert cache.get_many([]) == []
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_redis_cache_expires_server_side():
+    client = _fake_redis()
+    cache = RedisCache(client=client, namespace="test", ttl=60)
+    cache.put("k", "v")
+    assert 0 < client.pttl("veritas:test:k") <= 60000
+    cache.put_many([("a", 1), ("b", 2)], ttl=5)
+    assert 0 < client.pttl("veritas:test:b") <= 5000
+    value, remaining = cache.get_many_with_ttl(["a"])[0]
+    assert value == 1 and 0 < remaining <= 5
+
+    cache.put("brief", "v", ttl=0.01)
+    time.sleep(0.05)
+    assert cache.get("brief") is None
+
+
+def test_redis_cache_compresses_large_values():
+    client = _fake_redis()
+    cache = RedisCache(client=client, namespace="test", ttl=60)
+    large = {"summary": "evidence " * 200}
+    cache.put("small", "v")
+    cache.put("large", large)
+    assert client.get("veritas:test:small")[:1] == b"\x00"
+    raw = client.get("veritas:test:large")
+    assert raw[:1] == b"\x01"
+    assert len(raw) < len("evidence " * 200)
+    assert decode_value(raw) == large
+    assert cache.get("large") == large
+
+
+def test_redis_cache_drops_unreadable_entries():
+    client = _fake_redis()
+    cache = RedisCache(client=client, namespace="test", ttl=60)
+    client.set("veritas:test:k", b"\x07garbage")
+    assert cache.get("k") is None
+    assert client.get("veritas:test:k") is None
+
+
+def test_redis_cache_backs_off_after_connection_errors():
+    client = _DownRedis()
+    cache = RedisCache(client=client, namespace="test", ttl=60, retry_interval=0.05)
+    assert cache.get("k") is None
+    cache.put("k", "v")
+    assert cache.get_many(["a", "b"]) == [None, None]
+    # Only the first call reached the dead server
+    assert client.calls == 1 and cache.errors == 1
+    assert not cache.stats()["available"]
+
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert client.calls == 2
+
+
+def test_redis_contains_is_not_a_lookup():
+    cache = RedisCache(client=_fake_redis(), namespace="test", ttl=60)
+    cache.put("k", "v")
+    assert cache.contains("k") and not cache.contains("missing")
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert not RedisCache(client=_DownRedis(), namespace="test").contains("k")
+
+
+def test_redis_stats_do_not_scan_the_keyspace():
+    client = _fake_redis()
+    cache = RedisCache(client=client, namespace="test", ttl=60)
+    cache.put_many([("a", 1), ("b", 2)])
+    client.scan_iter = None  # any scan would now raise
+    stats = cache.stats()
+    assert "entries" not in stats and stats["available"]
+
+
+def test_tiered_cache_over_redis_keeps_the_shared_expiry():
+    shared = RedisCache(client=_fake_redis(), namespace="test", ttl=300)
+    cache = TieredCache(TTLCache(max_entries=10, ttl=300), shared)
+    shared.put("k", "v", ttl=5)
+    assert asyncio.run(cache.get_async("k")) == "v"
+    assert cache.local._data["k"][0] <= time.time() + 5
@@ -0,0 +1,80 @@
+"""
+Tests for the Prometheus text exposition of the metrics registry
+"""
+
+import pytest
+
+from app.core.metrics import CallbackMetric, MetricsRegistry, _format_value
+
+
+def test_format_value():
+    assert _format_value(3) == "3"
+    assert _format_value(2.0) == "2"
+    assert _format_value(0.25) == "0.25"
+    assert _format_value(float("inf")) == "+Inf"
+
+
+def test_counter_render_escapes_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests served", ("route",))
+    requests.inc(route="/api")
+    requests.inc(2, route="/api")
+    requests.inc(route='say "hi"\\\n')
+    assert registry.render() == (
+        "# HELP test_requests_total Requests served\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{route="/api"} 3\n'
+        'test_requests_total{route="say \\"hi\\"\\\\\\n"} 1\n'
+    )
+
+
+def test_gauge_render_without_labels():
+    registry = MetricsRegistry()
+    in_flight = registry.gauge("test_in_flight", "Requests in flight")
+    with in_flight.track_inprogress():
+        assert "test_in_flight 1\n" in registry.render()
+    in_flight.set(0.5)
+    assert registry.render().endswith("# TYPE test_in_flight gauge\ntest_in_flight 0.5\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage="llm")
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="llm",le="0.1"} 2',
+        'test_seconds_bucket{stage="llm",le="1"} 3',
+        'test_seconds_bucket{stage="llm",le="+Inf"} 4',
+        'test_seconds_sum{stage="llm"} 3.65',
+        'test_seconds_count{stage="llm"} 4',
+    ]
+
+
+def test_labels_must_match_the_declared_names():
+    counter = MetricsRegistry().counter("test_total", "Test", ("cache",))
+    with pytest.raises(ValueError):
+        counter.inc(route="/api")
+
+
+def test_failing_callback_renders_no_samples():
+    def broken():
+        raise RuntimeError("gateway not ready")
+
+    registry = MetricsRegistry()
+    registry.register(CallbackMetric("test_events_total", "Events", ("event",), broken, kind="counter"))
+    registry.register(CallbackMetric("test_size", "Size", (), lambda: [((), 7)]))
+    assert registry.render() == (
+        "# HELP test_events_total Events\n"
+        "# TYPE test_events_total counter\n"
+        "# HELP test_size Size\n"
+        "# TYPE test_size gauge\n"
+        "test_size 7\n"
+    )
+
+
+def test_registering_a_name_twice_returns_the_first_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("test_total", "Test")
+    assert registry.counter("test_total", "Test") is first
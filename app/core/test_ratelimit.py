@@ -0,0 +1,111 @@
+"""
+Tests for per-client token-bucket rate limiting
+"""
+
+import asyncio
+import sqlite3
+import time
+
+from app.core.ratelimit import MemoryBucketStore, RateLimiter, RateLimitMiddleware, SQLiteBucketStore
+
+
+def _scope(headers=(), client=("10.0.0.1", 1234), path="/api/fact-check"):
+    return {"type": "http", "method": "POST", "path": path, "headers": list(headers), "client": client}
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(middleware, scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+def test_bucket_allows_burst_then_refills():
+    store = MemoryBucketStore()
+    now = 1000.0
+    assert [store.take("c", 1.0, 3, now)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, _, wait = store.take("c", 1.0, 3, now)
+    assert not allowed and 0 < wait <= 1.0
+    assert store.take("c", 1.0, 3, now + 1.0)[0]
+
+
+def test_memory_store_drops_idle_buckets():
+    store = MemoryBucketStore(max_entries=10, idle_ttl=60)
+    store.take("idle", 1.0, 3, 0.0)
+    store.take("active", 1.0, 3, 100.0)
+    assert len(store) == 1
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    now = time.time()
+    assert first.take("c", 0.001, 2, now)[0]
+    assert second.take("c", 0.001, 2, now)[0]
+    assert not first.take("c", 0.001, 2, now)[0]
+
+
+def test_locked_sqlite_store_fails_open_quickly(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    limiter = RateLimiter(SQLiteBucketStore(path, busy_timeout=0.05), per_minute=1)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        allowed, _, _ = asyncio.run(limiter.check_async("c"))
+        assert allowed
+        assert time.monotonic() - start < 1.0
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+
+def test_limiter_counts_decisions():
+    limiter = RateLimiter(MemoryBucketStore(), per_minute=60, burst=1)
+    assert limiter.check("c")[0]
+    assert not limiter.check("c")[0]
+    assert (limiter.allowed, limiter.limited) == (1, 1)
+
+
+def test_unknown_api_keys_are_limited_by_ip():
+    limiter = RateLimiter(MemoryBucketStore(), per_minute=60, burst=1)
+    middleware = RateLimitMiddleware(_ok_app, limiter, paths=("/api/",), api_key_header="X-API-Key",
+                                     api_keys=["known"])
+    assert middleware._client_key(_scope([(b"x-api-key", b"random-1")])) == "ip:10.0.0.1"
+    assert middleware._client_key(_scope([(b"x-api-key", b"known")])).startswith("key:")
+
+    assert _call(middleware, _scope([(b"x-api-key", b"random-1")]))[0] == 200
+    # Rotating the key does not buy a fresh bucket
+    status, headers = _call(middleware, _scope([(b"x-api-key", b"random-2")]))
+    assert status == 429
+    assert b"retry-after" in headers
+    # A configured key has its own bucket
+    assert _call(middleware, _scope([(b"x-api-key", b"known")]))[0] == 200
+
+
+def test_forwarded_for_is_only_trusted_behind_a_proxy():
+    limiter = RateLimiter(MemoryBucketStore(), per_minute=60)
+    headers = [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.2")]
+    direct = RateLimitMiddleware(_ok_app, limiter, paths=("/api/",), api_key_header="X-API-Key")
+    proxied = RateLimitMiddleware(_ok_app, limiter, paths=("/api/",), api_key_header="X-API-Key",
+                                  trust_proxy=True)
+    assert direct._client_key(_scope(headers)) == "ip:10.0.0.1"
+    assert proxied._client_key(_scope(headers)) == "ip:203.0.113.7"
+
+
+def test_paths_outside_the_prefix_are_not_limited():
+    limiter = RateLimiter(MemoryBucketStore(), per_minute=60, burst=1)
+    middleware = RateLimitMiddleware(_ok_app, limiter, paths=("/api/",), api_key_header="X-API-Key")
+    for _ in range(3):
+        assert _call(middleware, _scope(path="/health"))[0] == 200
@@ -0,0 +1,42 @@
+"""
+Tests for encoding cached responses and patching per-request fields
+"""
+
+import json
+
+from app.core import serialization
+from app.core.serialization import cached_body, encode_cached, patch_json
+
+
+def test_patch_json_appends_fields():
+    body = encode_cached({"verdict": "TRUE", "sources": [{"title": "ünïcode"}]})
+    patched = patch_json(body, cached=True, processing_time=0.25)
+    assert json.loads(patched) == {
+        "verdict": "TRUE", "sources": [{"title": "ünïcode"}], "cached": True, "processing_time": 0.25
+    }
+    assert patch_json(body) is body
+
+
+def test_patch_json_on_an_empty_object():
+    assert json.loads(patch_json(encode_cached({}), cached=True)) == {"cached": True}
+
+
+def test_volatile_fields_are_never_stored():
+    body = encode_cached({"verdict": "FALSE", "cached": False, "processing_time": 3.1,
+                          "semantic_similarity": 0.97})
+    assert json.loads(body) == {"verdict": "FALSE"}
+    assert json.loads(patch_json(body, cached=True)) == {"verdict": "FALSE", "cached": True}
+
+
+def test_cached_body_accepts_legacy_dict_entries():
+    body = encode_cached({"verdict": "TRUE"})
+    assert cached_body(body) is body
+    assert cached_body({"verdict": "TRUE", "cached": False}) == body
+
+
+def test_plain_json_fallback_matches_orjson(monkeypatch):
+    payload = {"verdict": "TRUE", "title": "ünïcode", "scores": [0.5, 1], "nested": {"ok": None}}
+    expected = encode_cached(payload)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert encode_cached(payload) == expected
+    assert json.loads(patch_json(expected, cached=True))["cached"] is True
@@ -0,0 +1,72 @@
+"""
+Tests for single-flight coalescing of identical in-flight requests
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "verdict"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert results == ["verdict"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+def test_distinct_keys_and_later_calls_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+        first = await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, result=1)),
+                                     flight.do("b", lambda: asyncio.sleep(0, result=2)))
+        again = await flight.do("a", lambda: asyncio.sleep(0, result=3))
+        return flight, first, again
+
+    flight, first, again = asyncio.run(scenario())
+    assert first == [1, 2] and again == 3
+    assert (flight.started, flight.coalesced) == (3, 0)
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("model crashed")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        retried = await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, retried
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retried == "ok"
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight = SingleFlight()
+        leaver = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.02, result="done")))
+        await asyncio.sleep(0)
+        stayer = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0, result="other")))
+        await asyncio.sleep(0)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(scenario()) == "done"
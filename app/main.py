@@ -1,16 +1,23 @@
 import logging
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import Body
-from fastapi.responses import JSONResponse
+from fastapi import Body, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Match
 import asyncio
 import time
-from functools import lru_cache
 import hashlib
 import json
 
 from app.api.v1 import verification, news
-from app.core.config import settings
+from app.core.config import settings, get_cache_config, get_api_limits
+from app.core.cache import build_cache, SemanticCache, TieredCache
+from app.core.executor import shutdown_executors, run_cpu_bound
+from app.core.singleflight import SingleFlight
+from app.core import metrics
+from app.core.admission import AdmissionController, AdmissionMiddleware, DeadlineExceeded
+from app.core.ratelimit import RateLimitMiddleware, build_rate_limiter
+from app.core.serialization import cached_body, dumps, encode_cached, loads, patch_json
 
 # Initialize app
 app = FastAPI(
@@ -28,15 +35,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info("Starting Veritas system...")
 
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Update to specific domains for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Include routes
 app.include_router(
     verification.router,
@@ -50,22 +48,165 @@ app.include_router(
     tags=["News"]
 )
 
-# In-memory cache for fast responses
-response_cache = {}
-CACHE_TTL = 300  # 5 minutes
+# Verdict cache: in-memory TTL + LRU tier, backed by an on-disk tier shared by all workers.
+# Entries are the response's JSON bytes (see encode_cached) so hits are served without re-encoding
+response_cache = build_cache(get_cache_config(), namespace="fact_check")
+
+# Second tier: near-duplicate claims resolve to an existing response_cache key
+semantic_cache = SemanticCache(
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD
+) if settings.ENABLE_SEMANTIC_CACHE else None
+
+# Coalesces concurrent requests for the same claim onto one pipeline run
+inflight_requests = SingleFlight()
+
+# Bounds how many pipeline runs execute at once; the rest queue briefly or are shed
+admission = AdmissionController(
+    max_concurrent=settings.MAX_CONCURRENT_REQUESTS,
+    max_queue=settings.ADMISSION_QUEUE_SIZE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT
+)
+
+async def _is_cached_request(path: str, body: bytes) -> bool:
+    """Single-claim requests whose verdict is cached skip admission control"""
+    if path != "/api/fact-check":
+        return False
+    payload = json.loads(body or b"{}")
+    text = (payload.get("text") or payload.get("claim") or "").strip()
+    # A probe, not a lookup: hit/miss counters and LRU order are left to the endpoint
+    return bool(text) and await response_cache.contains_async(get_cache_key(text))
+
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    paths=("/api/fact-check", "/api/v1/verify"),
+    timeout=settings.REQUEST_TIMEOUT,
+    cache_probe=_is_cached_request
+)
+
+metrics.registry.register(metrics.CallbackMetric(
+    "veritas_admission_requests", "Admission controller slots and queue",
+    ("state",),
+    lambda: [((k,), v) for k, v in admission.stats().items() if k in ("active", "waiting")]
+))
+metrics.registry.register(metrics.CallbackMetric(
+    "veritas_admission_decisions_total", "Admission controller decisions",
+    ("decision",),
+    lambda: [((k,), v) for k, v in admission.stats().items() if k in ("admitted", "rejected", "timed_out")],
+    kind="counter"
+))
+
+# Per-client token buckets; added after admission so over-limit clients never take a queue slot
+rate_limiter = build_rate_limiter(get_api_limits())
+if rate_limiter is not None:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        paths=("/api/",),
+        api_key_header=settings.API_KEY_HEADER,
+        api_keys=settings.API_KEYS,
+        trust_proxy=settings.RATE_LIMIT_TRUST_PROXY
+    )
+    metrics.registry.register(metrics.CallbackMetric(
+        "veritas_rate_limit_decisions_total", "Rate limiter decisions",
+        ("decision",),
+        lambda: [(("allowed",), rate_limiter.allowed), (("limited",), rate_limiter.limited)],
+        kind="counter"
+    ))
+
+def _route_template(scope) -> str:
+    """Route path template ("/api/v1/verify/") so metric labels stay low-cardinality"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not metrics.registry.enabled or request.url.path == "/metrics":
+        return await call_next(request)
+    route = _route_template(request.scope)
+    status = "500"
+    start = time.perf_counter()
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc(route=route)
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec(route=route)
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start, method=request.method, route=route, status=status
+        )
+
+# CORS is added last so it is the outermost layer and shed (503) responses carry CORS headers
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Update to specific domains for production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+# Counters kept by other components, read when /metrics is scraped
+metrics.registry.register(metrics.CallbackMetric(
+    "veritas_singleflight_requests_total", "Fact-check requests that started or joined a pipeline run",
+    ("outcome",),
+    lambda: [(("started",), inflight_requests.started), (("coalesced",), inflight_requests.coalesced)],
+    kind="counter"
+))
+
+def _search_gateway_samples():
+    # Read-only: a scrape must not create the gateway before startup configures it
+    from search_gateway import existing_search_gateway
+    gateway = existing_search_gateway()
+    if gateway is None:
+        return []
+    return [((name,), value) for name, value in gateway.stats.items()]
+
+metrics.registry.register(metrics.CallbackMetric(
+    "veritas_search_gateway_events_total", "Search gateway cache hits, network calls, refusals and key rotations",
+    ("event",), _search_gateway_samples, kind="counter"
+))
+
+def normalize_claim(text: str) -> str:
+    """Normalize claim text so trivially different spellings share a key"""
+    return " ".join(text.split()).casefold()
 
 def get_cache_key(text: str) -> str:
     """Generate cache key for text"""
-    return hashlib.md5(text.encode()).hexdigest()
+    return hashlib.md5(normalize_claim(text).encode()).hexdigest()
 
-def is_cache_valid(timestamp: float) -> bool:
-    """Check if cache entry is still valid"""
-    return time.time() - timestamp < CACHE_TTL
+@app.on_event("startup")
+async def startup():
+    # First, so no LLM-side search or metrics scrape creates the gateway from env defaults
+    from app.services.scraper import configure_search_clients
+    configure_search_clients()
+    # Models load lazily on first use unless listed in PRELOAD_MODELS
+    if settings.PRELOAD_MODELS:
+        from model_registry import preload_models
+        await run_cpu_bound(preload_models, settings.PRELOAD_MODELS.split(","))
+    # The LLM pipeline components load in the background so the API serves
+    # the fast path meanwhile; early LLM requests wait for the same load
+    if settings.ENABLE_LLM_PROCESSING and settings.WARM_LLM_PIPELINE:
+        from fact_check_orchestrator import warm_up_components
+        # Default executor, not the CPU pool: loading must not hold a pipeline thread for minutes
+        app.state.llm_warmup = asyncio.get_running_loop().run_in_executor(None, warm_up_components)
+    if settings.ENABLE_METRICS:
+        metrics.start_metrics_server(settings.METRICS_PORT)
 
-@lru_cache(maxsize=1000)
-def get_cached_verdict(text_hash: str) -> dict:
-    """Get cached verdict using LRU cache"""
-    return response_cache.get(text_hash, {})
+@app.on_event("shutdown")
+async def shutdown():
+    from app.services.scraper import close_search_clients
+    await close_search_clients()
+    metrics.stop_metrics_server()
+    shutdown_executors()
 
 # Root endpoint
 @app.get("/")
@@ -76,13 +217,75 @@ async def root():
         "docs_url": "/docs"
     }
 
+def _build_fact_check_response(basic_result: dict, start_time: float) -> dict:
+    """Shape a verifier result into the compact /api/fact-check response"""
+    support = basic_result.get('matching_articles', [])
+    contradict = basic_result.get('contradicting_articles', [])
+
+    # Optimize source processing
+    def process_sources(sources, limit=5):  # Reduced from 10 to 5 for speed
+        return [
+            {
+                "source": a.get('source', 'Unknown'),
+                "url": a.get('url', ''),
+                "title": a.get('title', 'Untitled')[:100],  # Limit title length
+                "similarity_score": round(a.get('similarity_score', 0.0), 3)
+            }
+            for a in sources[:limit]
+        ]
+
+    simple = {
+        "truth_score": basic_result.get('truth_score', 0.0),
+        "confidence_score": basic_result.get('confidence', 0.0),
+        "verdict": basic_result.get('verdict', 'INSUFFICIENT_DATA'),
+        "summary": f"Found {len(support)} supporting and {len(contradict)} contradicting sources.",
+        "matching_articles": process_sources(support),
+        "contradicting_articles": process_sources(contradict),
+        "supporting_sources": process_sources(support),
+        "contradicting_sources": process_sources(contradict),
+        "processing_time": basic_result.get('processing_time', 0.0),
+        "cached": False,
+        "timestamp": time.time()
+    }
+
+    # Backward compatibility
+    simple["confidence"] = simple["confidence_score"]
+
+    simple["processing_time"] = round(time.time() - start_time, 3)
+    return simple
+
+async def _embed_claim(text: str):
+    """Embed a claim for the semantic cache tier"""
+    from app.services import matcher
+    embeddings = await run_cpu_bound(matcher.encode_claims, [text])
+    return embeddings[0]
+
+async def _run_fact_check(text: str, cache_key: str, embedding=None) -> dict:
+    """Run the verification pipeline for one claim and cache the response"""
+    from types import SimpleNamespace
+    from app.services import verifier
+
+    start_time = time.time()
+    logger.info(f"[FACT-CHECK] Processing new request: {text[:120]}")
+
+    # Process request asynchronously (blocking stages run in the CPU pool)
+    req = SimpleNamespace(text=text)
+    with metrics.PIPELINE_IN_FLIGHT.track_inprogress(pipeline="fact_check"):
+        basic_result = await verifier.verify_claim_async(req)
+    simple = _build_fact_check_response(basic_result, start_time)
+
+    # Cache the result
+    await response_cache.put_async(cache_key, encode_cached(simple))
+    if semantic_cache is not None and embedding is not None:
+        semantic_cache.add(cache_key, embedding, text)
+
+    logger.info(f"[FACT-CHECK] Completed in {simple['processing_time']:.3f}s")
+    return simple
+
 # Optimized fact-check endpoint with caching and async processing
 @app.post("/api/fact-check")
 async def fact_check(payload: dict = Body(...)):
     """Optimized fact-check endpoint with caching and async processing."""
-    from types import SimpleNamespace
-    from app.services import verifier
-    
     start_time = time.time()
     
     text = (payload.get("text") or payload.get("claim") or "").strip()
@@ -100,94 +303,284 @@ async def fact_check(payload: dict = Body(...)):
 
     # Check cache first
     cache_key = get_cache_key(text)
-    cached_result = get_cached_verdict(cache_key)
+    cached_result = await response_cache.get_async(cache_key)
+    metrics.count_cache("verdict", cached_result is not None)
     
-    if cached_result and is_cache_valid(cached_result.get('timestamp', 0)):
+    if cached_result is not None:
         logger.info(f"[FACT-CHECK] Cache hit for: {text[:50]}...")
-        cached_result['cached'] = True
-        cached_result['processing_time'] = (time.time() - start_time) * 1000  # Convert to ms
-        return cached_result
-
-    logger.info(f"[FACT-CHECK] Processing new request: {text[:120]}")
+        return Response(
+            content=patch_json(
+                cached_body(cached_result),
+                cached=True,
+                processing_time=(time.time() - start_time) * 1000  # Convert to ms
+            ),
+            media_type="application/json"
+        )
 
     try:
-        # Process request asynchronously
-        req = SimpleNamespace(text=text)
-        basic_result = verifier.verify_claim(req)
-
-        # Build optimized response
-        support = basic_result.get('matching_articles', [])
-        contradict = basic_result.get('contradicting_articles', [])
-
-        # Optimize source processing
-        def process_sources(sources, limit=5):  # Reduced from 10 to 5 for speed
-            return [
-                {
-                    "source": a.get('source', 'Unknown'),
-                    "url": a.get('url', ''),
-                    "title": a.get('title', 'Untitled')[:100],  # Limit title length
-                    "similarity_score": round(a.get('similarity_score', 0.0), 3)
-                }
-                for a in sources[:limit]
-            ]
-
-        simple = {
-            "truth_score": basic_result.get('truth_score', 0.0),
-            "confidence_score": basic_result.get('confidence', 0.0),
-            "verdict": basic_result.get('verdict', 'INSUFFICIENT_DATA'),
-            "summary": f"Found {len(support)} supporting and {len(contradict)} contradicting sources.",
-            "matching_articles": process_sources(support),
-            "contradicting_articles": process_sources(contradict),
-            "supporting_sources": process_sources(support),
-            "contradicting_sources": process_sources(contradict),
-            "processing_time": basic_result.get('processing_time', 0.0),
-            "cached": False,
-            "timestamp": time.time()
-        }
+        # Near-duplicate claims ("vaccines cause autism!") reuse an existing verdict
+        embedding = None
+        if semantic_cache is not None:
+            embedding = await _embed_claim(text)
+            # A full matrix scan takes milliseconds, so it runs in the CPU pool
+            match = await run_cpu_bound(semantic_cache.lookup, embedding, text)
+            similar_key, similarity = match if match is not None else (None, 0.0)
+            cached_result = await response_cache.get_async(similar_key) if similar_key is not None else None
+            metrics.count_cache("semantic", cached_result is not None)
+            if cached_result is not None:
+                logger.info(f"[FACT-CHECK] Semantic cache hit ({similarity:.3f}) for: {text[:50]}...")
+                return Response(
+                    content=patch_json(
+                        cached_body(cached_result),
+                        cached=True,
+                        semantic_similarity=round(similarity, 4),
+                        processing_time=(time.time() - start_time) * 1000  # Convert to ms
+                    ),
+                    media_type="application/json"
+                )
 
-        # Backward compatibility
-        simple["confidence"] = simple["confidence_score"]
-
-        # Cache the result
-        response_cache[cache_key] = simple
-        
-        # Clean old cache entries (keep only last 1000)
-        if len(response_cache) > 1000:
-            # Remove oldest entries
-            sorted_cache = sorted(response_cache.items(), key=lambda x: x[1].get('timestamp', 0))
-            response_cache.clear()
-            response_cache.update(dict(sorted_cache[-1000:]))
-
-        total_time = time.time() - start_time
-        simple["processing_time"] = round(total_time, 3)
-        
-        logger.info(f"[FACT-CHECK] Completed in {total_time:.3f}s")
-        return simple
+        # Identical claims already being verified share the in-flight computation
+        return await inflight_requests.do(cache_key, lambda: _run_fact_check(text, cache_key, embedding))
 
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"[FACT-CHECK] Error: {e}")
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
 
+# Batch fact-check endpoint: N claims, one amortized pipeline run
+@app.post("/api/fact-check/batch")
+async def fact_check_batch(payload: dict = Body(...)):
+    """Verify several claims at once (e.g. every headline on a page)."""
+    from app.services import verifier
+
+    start_time = time.time()
+
+    claims = payload.get("claims") or payload.get("texts") or []
+    if not isinstance(claims, list):
+        raise HTTPException(status_code=400, detail="'claims' must be a list of strings")
+    if len(claims) > settings.MAX_BATCH_CLAIMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.MAX_BATCH_CLAIMS} claims per batch")
+
+    texts = [str(c or "").strip() for c in claims]
+    results: list = [None] * len(texts)
+    pending = {}  # cache_key -> (text, [indices])
+
+    # One cache round trip for the whole batch
+    cache_keys = {i: get_cache_key(text) for i, text in enumerate(texts) if text}
+    cached_values = dict(zip(cache_keys, await response_cache.get_many_async(list(cache_keys.values()))))
+
+    for i, text in enumerate(texts):
+        if not text:
+            results[i] = {
+                "truth_score": 0.0,
+                "confidence_score": 0.0,
+                "verdict": "INSUFFICIENT_DATA",
+                "summary": "Empty claim text",
+                "supporting_sources": [],
+                "contradicting_sources": [],
+                "processing_time": 0.0,
+                "cached": False
+            }
+            continue
+        cache_key = cache_keys[i]
+        cached_result = cached_values[i]
+        metrics.count_cache("verdict", cached_result is not None)
+        if cached_result is not None:
+            results[i] = patch_json(cached_body(cached_result), cached=True)
+            continue
+        pending.setdefault(cache_key, (text, []))[1].append(i)
+
+    if pending:
+        keys = list(pending)
+        logger.info(f"[FACT-CHECK] Batch: {len(texts)} claims, {len(keys)} to verify")
+        try:
+            with metrics.PIPELINE_IN_FLIGHT.track_inprogress(pipeline="fact_check_batch"):
+                basic_results = await verifier.verify_claims_batch_async([pending[k][0] for k in keys])
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"[FACT-CHECK] Batch error: {e}")
+            raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
+
+        fresh = []
+        for key, basic_result in zip(keys, basic_results):
+            simple = _build_fact_check_response(basic_result, start_time)
+            fresh.append((key, encode_cached(simple)))
+            for i in pending[key][1]:
+                results[i] = simple
+        await response_cache.put_many_async(fresh)
+
+    total_time = time.time() - start_time
+    logger.info(f"[FACT-CHECK] Batch of {len(texts)} completed in {total_time:.3f}s")
+    # Cached verdicts are already JSON bytes; only fresh ones are encoded here
+    body = b"".join([
+        b'{"results":[',
+        b",".join(r if isinstance(r, bytes) else dumps(r) for r in results),
+        b'],"count":', dumps(len(results)),
+        b',"processing_time":', dumps(round(total_time, 3)),
+        b"}"
+    ])
+    return Response(content=body, media_type="application/json")
+
+def _llm_verdict_payload(result) -> dict:
+    """The fields of a FactCheckResult the clients display"""
+    return {
+        "truth_score": result.final_truth_score,
+        "confidence_score": result.final_confidence_score,
+        "accuracy_score": result.final_accuracy_score,
+        "verdict": result.final_verdict,
+        "summary": result.factual_summary,
+        "supporting_sources": result.supporting_sources[:10],
+        "contradicting_sources": result.contradicting_sources[:10],
+        "processing_time": result.total_processing_time,
+        # Verdicts cached before the field existed have no degraded stages
+        "degraded_stages": getattr(result, "degraded_stages", []),
+    }
+
+def _format_event(event: str, data, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps({"event": event, "data": data}, default=str) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Streaming fact-check endpoint: stage results as soon as they exist
+@app.post("/api/fact-check/stream")
+async def fact_check_stream(request: Request, payload: dict = Body(...)):
+    """
+    Stream verification progress as Server-Sent Events, or NDJSON when the
+    client sends Accept: application/x-ndjson (or "format": "ndjson").
+
+    Events: accepted, preprocessing, search, article (one per matched
+    article), score (interim weighted verdict), llm_verdict, error, done.
+    The LLM pipeline starts immediately and runs alongside the fast path.
+    """
+    from app.services import verifier
+
+    text = (payload.get("text") or payload.get("claim") or "").strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="Empty claim text")
+    wants_ndjson = payload.get("format") == "ndjson" or "application/x-ndjson" in request.headers.get("accept", "")
+    fmt = "ndjson" if wants_ndjson else "sse"
+    include_llm = bool(payload.get("include_llm", settings.ENABLE_LLM_PROCESSING))
+    cache_key = get_cache_key(text)
+
+    async def fast_path(queue: asyncio.Queue):
+        start_time = time.time()
+        cached_result = await response_cache.get_async(cache_key)
+        metrics.count_cache("verdict", cached_result is not None)
+        if cached_result is not None:
+            await queue.put(("score", {**loads(cached_body(cached_result)), "cached": True}))
+            return
+        async for event, data in verifier.verify_claim_stream(text):
+            if event == "score":
+                simple = _build_fact_check_response(data, start_time)
+                await response_cache.put_async(cache_key, encode_cached(simple))
+                data = {**data, "summary": simple["summary"]}
+            await queue.put((event, data))
+
+    async def llm_path(queue: asyncio.Queue):
+        from fact_check_orchestrator import verify_claim_comprehensive
+        with metrics.PIPELINE_IN_FLIGHT.track_inprogress(pipeline="llm"):
+            result = await verify_claim_comprehensive(text)
+        await queue.put(("llm_verdict", _llm_verdict_payload(result)))
+
+    async def run(name: str, stage, queue: asyncio.Queue):
+        try:
+            await stage(queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[FACT-CHECK] Streaming {name} stage failed: {e}")
+            metrics.count_provider_error("llm_pipeline" if name == "llm" else "pipeline")
+            await queue.put(("error", {"stage": name, "detail": str(e)}))
+        await queue.put((None, name))  # end-of-stage marker
+
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.ensure_future(run("fast", fast_path, queue))]
+        if include_llm:
+            tasks.append(asyncio.ensure_future(run("llm", llm_path, queue)))
+        yield _format_event("accepted", {"claim": text, "llm": include_llm, "timestamp": time.time()}, fmt)
+        try:
+            remaining = len(tasks)
+            while remaining:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing the connection during the LLM stage
+                    yield ": ping\n\n" if fmt == "sse" else _format_event("ping", {}, fmt)
+                    continue
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield _format_event(event, data, fmt)
+            yield _format_event("done", {"timestamp": time.time()}, fmt)
+        finally:
+            # Client went away (or we finished): stop whatever is still running
+            for t in tasks:
+                t.cancel()
+
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Fast health check endpoint"""
     return {"status": "healthy", "timestamp": time.time()}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Per-worker metrics in the Prometheus text exposition format"""
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Model registry status endpoint
+@app.get("/models/status")
+async def models_status():
+    """Load time and memory of each shared model in this worker"""
+    from model_registry import registry
+    return {"models": registry.stats(), "timestamp": time.time()}
+
 # Cache status endpoint
 @app.get("/cache/status")
 async def cache_status():
     """Get cache statistics"""
+    # cache_size counts this worker's in-process tier; counting a shared Redis
+    # tier would scan every key. SQLite stats still query disk, so run them in a thread
+    local = response_cache.local if isinstance(response_cache, TieredCache) else response_cache
+    cache_stats = await asyncio.get_running_loop().run_in_executor(None, response_cache.stats)
     return {
-        "cache_size": len(response_cache),
-        "cache_ttl": CACHE_TTL,
+        "cache_size": len(local),
+        "cache_ttl": response_cache.ttl,
+        **cache_stats,
+        "single_flight": inflight_requests.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        "admission": admission.stats(),
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
         "timestamp": time.time()
     }
 
 # Clear cache endpoint
 @app.post("/cache/clear")
 async def clear_cache():
-    """Clear all cached responses"""
-    global response_cache
-    response_cache.clear()
-    return {"message": "Cache cleared", "timestamp": time.time()}
+    """
+    Clear cached responses in this worker and in the shared tier.
+
+    Other workers' in-process tiers and semantic indexes are not reachable
+    from here; their entries expire within CACHE_TTL seconds.
+    """
+    await asyncio.get_running_loop().run_in_executor(None, response_cache.clear)
+    if semantic_cache is not None:
+        semantic_cache.clear()
+    return {
+        "message": "Cache cleared",
+        "shared_tier_cleared": isinstance(response_cache, TieredCache),
+        "timestamp": time.time()
+    }
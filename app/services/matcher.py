@@ -1,58 +1,74 @@
 import logging
-from typing import List, Tuple
-from sentence_transformers import SentenceTransformer, util
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import count_inference, observe_stages
+from app.utils.dedup import NearDuplicateIndex
+
+# Models come from the shared registry in the LLM folder and load on first use
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'LLM'))
+from model_registry import get_sentence_transformer, get_cross_encoder  # type: ignore
 
 logger = logging.getLogger(__name__)
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Try to load an NLI cross-encoder for entailment/contradiction
-try:
-    from sentence_transformers import CrossEncoder  # type: ignore
-    nli_model = CrossEncoder('cross-encoder/nli-deberta-v3-base')
-    NLI_AVAILABLE = True
-except Exception as e:
-    logger.warning(f"NLI CrossEncoder unavailable, using heuristic stance detection. Reason: {e}")
-    nli_model = None
-    NLI_AVAILABLE = False
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+NLI_MODEL = "cross-encoder/nli-deberta-v3-base"
+
+
+def _embedder():
+    return get_sentence_transformer(EMBEDDING_MODEL)
+
+
+def _nli_model():
+    """Return the NLI cross-encoder, or None to fall back to heuristic stance detection"""
+    try:
+        return get_cross_encoder(NLI_MODEL)
+    except Exception as e:
+        # The registry logs the load failure once; later calls fail fast
+        logger.debug(f"NLI CrossEncoder unavailable, using heuristic stance detection. Reason: {e}")
+        return None
+
 
 NEGATION_TOKENS = {"not", "no", "never", "without", "false", "deny", "denies", "refute", "refutes", "debunk", "myth"}
 
 
+def encode_claims(claims: List[str]):
+    """Return L2-normalized claim embeddings as a numpy array"""
+    count_inference("embedder", len(claims))
+    return _embedder().encode(
+        [c[:512] for c in claims],
+        batch_size=settings.LLM_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
+
+
 def _has_negation(text: str) -> bool:
     words = {w.strip('.,!?;:"\'').lower() for w in text.split()}
     return any(tok in words for tok in NEGATION_TOKENS)
 
 
-def _classify_stance(claim: str, text: str) -> float:
-    """
-    Return stance score in [-1, 1]: >0 support, <0 contradict, ~0 neutral.
-    Prefer NLI if available; otherwise use negation-aware heuristic with similarity.
-    """
-    if NLI_AVAILABLE and nli_model is not None:
-        try:
-            scores = nli_model.predict([(claim, text)])  # shape: [3] for NLI
-            # Heuristic: map indices by typical order [contradiction, entailment, neutral]
-            if len(scores.shape) == 1 and scores.shape[0] == 3:
-                c, e, n = float(scores[0]), float(scores[1]), float(scores[2])
-            else:
-                # Fallback: treat scalar/regression as support probability
-                c, e, n = 0.0, float(scores[0]) if hasattr(scores, '__len__') else float(scores), 0.0
-            if e >= c and e >= n:
-                return min(1.0, e)
-            if c >= e and c >= n:
-                return max(-1.0, -c)
-            return 0.0
-        except Exception as e:
-            logger.warning(f"NLI prediction failed, using heuristic: {e}")
+def _stance_from_nli(scores) -> float:
+    """Map one row of NLI logits to P(entailment) - P(contradiction), in [-1, 1]"""
+    logits = np.asarray(scores, dtype=np.float64).ravel()
+    if logits.size != 3:
+        # Single-logit models only score support; squash it into [-1, 1]
+        return float(np.tanh(logits[0] / 2))
+    # Label order of NLI_MODEL: [contradiction, entailment, neutral]
+    probs = np.exp(logits - logits.max())
+    probs /= probs.sum()
+    return float(probs[1] - probs[0])
 
-    # Heuristic fallback: combine cosine similarity and negation mismatch
+
+def _stance_from_similarity(claim: str, text: str, sim: float) -> float:
+    """Heuristic fallback: combine cosine similarity and negation mismatch"""
     claim_neg = _has_negation(claim)
     text_neg = _has_negation(text)
-    # Similarity for direction scaling
-    # encode short text to avoid heavy compute
-    claim_emb = model.encode(claim[:512], convert_to_tensor=True)
-    text_emb = model.encode(text[:1024], convert_to_tensor=True)
-    sim = float(util.cos_sim(claim_emb, text_emb)[0])  # [-1, 1] but generally [0,1]
 
     if claim_neg != text_neg:
         # Strong contradiction when negation polarity differs and content is similar
@@ -65,37 +81,51 @@ def _classify_stance(claim: str, text: str) -> float:
     return 0.0
 
 
-def _is_duplicate(title_a: str, title_b: str) -> bool:
-    from difflib import SequenceMatcher
-    return SequenceMatcher(a=title_a.lower(), b=title_b.lower()).ratio() >= 0.92
-
+def match_articles(claim: str, articles: List[dict],
+                   timings: Optional[Dict[str, float]] = None) -> Tuple[List[dict], List[dict]]:
+    """
+    Split articles into supporting and contradicting evidence for a claim.
 
-def match_articles(claim: str, articles: List[dict]) -> Tuple[List[dict], List[dict]]:
+    The claim and all article texts are embedded in one batched encode call and
+    compared in one similarity matrix; the loop only applies thresholds.
+    """
     if not articles:
         logger.warning("No articles provided to match.")
         return [], []
+    return match_articles_batch([claim], [articles], timings)[0]
 
-    seen_titles: List[str] = []
-    support: List[dict] = []
-    contradict: List[dict] = []
 
-    for article in articles:
-        content = article.get('content', article.get('snippet', '')) or ''
-        title = article.get('title', '') or ''
-        text = f"{title} {content}".strip()
-        if not text:
-            continue
+def _article_text(article: dict) -> Tuple[str, str]:
+    content = article.get('content', article.get('snippet', '')) or ''
+    title = article.get('title', '') or ''
+    return title, f"{title} {content}".strip()
 
-        # Deduplicate near-identical titles
-        if any(_is_duplicate(title, t) for t in seen_titles):
-            continue
 
-        stance_score = _classify_stance(claim, text)
+class StanceSplitter:
+    """
+    Sorts scored articles into supporting and contradicting evidence.
+
+    Articles can be fed one at a time as they are scored: the title dedup
+    state carries over between `add` calls, and `finish` applies the top-N
+    fallback once every article has been seen.
+    """
 
-        # Compute similarity for reference and weighting
-        claim_embedding = model.encode(claim[:512], convert_to_tensor=True)
-        embedding = model.encode(text[:1024], convert_to_tensor=True)
-        sim_score = float(util.cos_sim(claim_embedding, embedding)[0])
+    def __init__(self):
+        self.seen_titles = NearDuplicateIndex(
+            threshold=settings.DEDUP_SIMILARITY_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+            bands=settings.DEDUP_BANDS
+        )
+        self.support: List[dict] = []
+        self.contradict: List[dict] = []
+
+    def add(self, article: dict, sim_score: float, stance_score: float) -> Optional[str]:
+        """Record one article; returns "supporting", "contradicting" or None if it was dropped"""
+        title = article.get('title', '') or ''
+
+        # Deduplicate near-identical titles
+        if self.seen_titles.is_duplicate(title):
+            return None
 
         article["similarity_score"] = round(sim_score, 4)
         article["stance_score"] = round(stance_score, 4)
@@ -103,21 +133,194 @@ def match_articles(claim: str, articles: List[dict]) -> Tuple[List[dict], List[d
         logger.info(f"[MATCHER] '{title[:50]}...' → sim: {sim_score:.4f}, stance: {stance_score:.3f}")
 
         if stance_score > 0.2:
-            support.append(article)
-            seen_titles.append(title)
+            stance, bucket = "supporting", self.support
         elif stance_score < -0.2:
-            contradict.append(article)
-            seen_titles.append(title)
-        else:
+            stance, bucket = "contradicting", self.contradict
+        elif sim_score >= 0.7:
             # Keep neutral only if very similar to help later decisions
-            if sim_score >= 0.7:
-                support.append(article)
-                seen_titles.append(title)
+            stance, bucket = "supporting", self.support
+        else:
+            return None
+        bucket.append(article)
+        self.seen_titles.add(title)
+        return stance
+
+    def finish(self, articles: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Supporting and contradicting articles; `articles` is the caller's full list for the fallback"""
+        if not self.support and not self.contradict:
+            logger.warning("[MATCHER] No strong matches — returning top-N closest articles instead")
+            # Sort by similarity and return a few as supporting context
+            articles.sort(key=lambda x: x.get("similarity_score", 0.0), reverse=True)
+            return articles[:5], []
+        return self.support, self.contradict
+
+
+def _split_by_stance(articles: List[dict], kept: List[dict], sims: List[float],
+                     stances: List[float]) -> Tuple[List[dict], List[dict]]:
+    """
+    Apply dedup and stance thresholds to precomputed similarity/stance scores.
+
+    `kept` are the articles with text, aligned with `sims` and `stances`;
+    `articles` is the caller's full list, used for the top-N fallback.
+    """
+    splitter = StanceSplitter()
+    for article, sim_score, stance_score in zip(kept, sims, stances):
+        splitter.add(article, sim_score, stance_score)
+    return splitter.finish(articles)
+
+
+def _fit_token_budget(nli_model, claim: str, texts: List[str]) -> List[Tuple[str, int]]:
+    """
+    Trim article texts so each (claim, text) pair fits NLI_MAX_TOKENS.
+
+    Returns the trimmed text and the pair length in tokens, used for length bucketing.
+    """
+    tokenizer = getattr(nli_model, "tokenizer", None)
+    max_tokens = settings.NLI_MAX_TOKENS
+    if tokenizer is not None:
+        try:
+            claim_len = min(len(tokenizer(claim, add_special_tokens=False)["input_ids"]), max_tokens // 2)
+            budget = max(16, max_tokens - claim_len - 4)  # room for [CLS]/[SEP] markers
+            enc = tokenizer(texts, add_special_tokens=False, truncation=True,
+                            max_length=budget, return_offsets_mapping=True)
+            fitted = []
+            for text, ids, offsets in zip(texts, enc["input_ids"], enc["offset_mapping"]):
+                end = offsets[-1][1] if offsets else 0
+                fitted.append((text[:end], claim_len + len(ids)))
+            return fitted
+        except Exception as e:
+            logger.debug(f"Token-level truncation unavailable, approximating by characters: {e}")
+
+    # Roughly four characters per token for English text
+    claim_len = min(len(claim) // 4, max_tokens // 2)
+    char_budget = max(64, (max_tokens - claim_len - 4) * 4)
+    return [(t[:char_budget], claim_len + min(len(t), char_budget) // 4) for t in texts]
+
+
+def match_articles_batch(claims: List[str], article_lists: List[List[dict]],
+                         timings: Optional[Dict[str, float]] = None) -> List[Tuple[List[dict], List[dict]]]:
+    """
+    Match several claims against their article lists with amortized inference.
+
+    Scoring is done by score_articles_batch; per-stage timings (seconds) are
+    written into `timings` when given.
+    """
+    kept, sims, stances = score_articles_batch(claims, article_lists, timings)
+    results = []
+    for i in range(len(claims)):
+        if not kept[i]:
+            logger.warning("No articles provided to match.")
+            results.append(([], []))
+            continue
+        results.append(_split_by_stance(article_lists[i], kept[i], sims[i], stances[i]))
+    return results
+
+
+def score_articles_batch(claims: List[str], article_lists: List[List[dict]],
+                         timings: Optional[Dict[str, float]] = None
+                         ) -> Tuple[List[List[dict]], List[List[float]], List[List[float]]]:
+    """
+    Similarity and stance of every article with text against its claim.
+
+    Returns, per claim, the articles that have text and their similarity and
+    stance scores, aligned. Stance detection runs as a cascade:
+    1. Every claim and article text is embedded in one model.encode call
+    2. Pairs below NLI_PREFILTER_THRESHOLD bi-encoder similarity keep their heuristic stance
+    3. Remaining article texts are trimmed to a token budget and sorted by length
+    4. All surviving pairs go through one nli_model.predict call, so each
+       NLI_BATCH_SIZE chunk is padded only to similar lengths
+
+    Per-stage timings (seconds) are written into `timings` when given.
+    """
+    timings = {} if timings is None else timings
+
+    # Keep only articles that have text, remembering which claim they belong to
+    kept: List[List[dict]] = []
+    texts: List[List[str]] = []
+    for articles in article_lists:
+        pairs = [(a, _article_text(a)[1]) for a in (articles or [])]
+        pairs = [(a, t) for a, t in pairs if t]
+        kept.append([a for a, _ in pairs])
+        texts.append([t for _, t in pairs])
+
+    flat_texts = [t[:1024] for group in texts for t in group]
+    if not flat_texts:
+        return kept, [[] for _ in claims], [[] for _ in claims]
+
+    # Stage 1: bi-encoder embeddings and one similarity matrix for every claim/article
+    stage_start = time.perf_counter()
+    count_inference("embedder", len(claims) + len(flat_texts))
+    embeddings = _embedder().encode(
+        [c[:512] for c in claims] + flat_texts,
+        batch_size=settings.LLM_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True
+    )
+    # Rows are unit length, so the dot product is the cosine similarity
+    sim_matrix = embeddings[:len(claims)] @ embeddings[len(claims):].T
+    sims: List[List[float]] = []
+    offset = 0
+    for group in texts:
+        sims.append(sim_matrix[len(sims), offset:offset + len(group)].tolist())
+        offset += len(group)
+    timings["embed"] = time.perf_counter() - stage_start
+
+    # Heuristic stance for every pair; the cross-encoder replaces it for pairs past the prefilter
+    stances: List[List[float]] = [
+        [_stance_from_similarity(claim, texts[i][j], sims[i][j]) for j in range(len(texts[i]))]
+        for i, claim in enumerate(claims)
+    ]
+    nli_model = _nli_model()
+
+    if nli_model is not None:
+        # Stage 2: drop clearly irrelevant pairs before the cross-encoder
+        stage_start = time.perf_counter()
+        candidates = [
+            (i, j)
+            for i in range(len(claims))
+            for j in range(len(texts[i]))
+            if sims[i][j] >= settings.NLI_PREFILTER_THRESHOLD
+        ]
+        timings["prefilter"] = time.perf_counter() - stage_start
+
+        # Stage 3: token-budgeted truncation and length bucketing
+        stage_start = time.perf_counter()
+        by_claim: Dict[int, List[int]] = {}
+        for i, j in candidates:
+            by_claim.setdefault(i, []).append(j)
+        nli_pairs: List[Tuple[str, str]] = []
+        lengths: List[int] = []
+        owners: List[Tuple[int, int]] = []
+        for i, idx in by_claim.items():
+            fitted = _fit_token_budget(nli_model, claims[i], [texts[i][j] for j in idx])
+            for j, (text, length) in zip(idx, fitted):
+                nli_pairs.append((claims[i], text))
+                lengths.append(length)
+                owners.append((i, j))
+        order = sorted(range(len(nli_pairs)), key=lambda k: lengths[k])
+        timings["tokenize"] = time.perf_counter() - stage_start
+
+        # Stage 4: one batched cross-encoder call over length-sorted pairs
+        stage_start = time.perf_counter()
+        try:
+            if order:
+                count_inference("nli_cross_encoder", len(order))
+                scores = nli_model.predict([nli_pairs[k] for k in order], batch_size=settings.NLI_BATCH_SIZE)
+                nli_stances = [_stance_from_nli(row) for row in scores]
+                for pos, k in enumerate(order):
+                    i, j = owners[k]
+                    stances[i][j] = nli_stances[pos]
+        except Exception as e:
+            logger.warning(f"Batched NLI prediction failed, using heuristic: {e}")
+        timings["nli"] = time.perf_counter() - stage_start
+
+        logger.info(
+            f"[MATCHER] NLI cascade: {len(candidates)}/{len(flat_texts)} pairs scored "
+            f"(embed {timings['embed']:.3f}s, prefilter {timings['prefilter']:.3f}s, "
+            f"tokenize {timings['tokenize']:.3f}s, nli {timings['nli']:.3f}s)"
+        )
 
-    if not support and not contradict:
-        logger.warning("[MATCHER] No strong matches — returning top-N closest articles instead")
-        # Sort by similarity and return a few as supporting context
-        articles.sort(key=lambda x: x.get("similarity_score", 0.0), reverse=True)
-        return articles[:5], []
+    # Sub-stages of "match": embed, prefilter, tokenize, nli
+    observe_stages(timings, prefix="match_")
 
-    return support, contradict
+    return kept, sims, stances
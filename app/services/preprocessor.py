@@ -1,6 +1,10 @@
 import logging
+import os
 import re
-from typing import Dict, List, Tuple
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 try:
     import nltk
@@ -9,71 +13,112 @@ except Exception:  # Avoid hard crash if nltk is unavailable or data missing
     nltk = None
     pos_tag = None
 
-from langdetect import detect_langs
-
-# Try to load spaCy lazily and tolerate absence
 try:
-    import spacy  # type: ignore
-    _spacy_nlp = None
-    def get_spacy():
-        global _spacy_nlp
-        if _spacy_nlp is None:
-            try:
-                _spacy_nlp = spacy.load("en_core_web_sm")
-            except Exception:
-                _spacy_nlp = None
-        return _spacy_nlp
+    from langdetect import DetectorFactory, detect_langs
+    DetectorFactory.seed = 0  # langdetect is randomized unless seeded
 except Exception:
-    spacy = None  # type: ignore
-    def get_spacy():  # type: ignore
+    detect_langs = None
+
+from app.core.config import settings
+
+# spaCy comes from the shared model registry: loaded lazily, once per process
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'LLM'))
+from model_registry import get_spacy as _registry_get_spacy  # type: ignore
+
+
+def get_spacy():
+    try:
+        return _registry_get_spacy("en_core_web_sm")
+    except Exception:
         return None
 
 # Setup
 logger = logging.getLogger(__name__)
 
+# Keywords need POS tags and entities need NER; the dependency parse and
+# lemmatizer are never used here, so they are skipped per call
+_SPACY_DISABLE = ["parser", "lemmatizer"]
 
-def clean_text(text: str) -> str:
-    """Remove extra spaces and normalize text"""
-    return re.sub(r'\s+', ' ', text.strip())
+_KEYWORD_POS = {"NOUN", "PROPN", "VERB"}
 
+# High-frequency English function words: enough to recognize English from
+# the tokens we already have without running a statistical detector. Words
+# that are also common in other Latin-script languages ("a", "do", "as",
+# "is", "of", "had", "over", "we", "to", ...) are left out, and a text needs
+# several distinct ones before the shortcut trusts them.
+_EN_STOPWORDS = frozenset("""
+about after and any are been before being but can could did does from has his how
+into its more not our out said she some than that the their them then there these
+they this were what when which who with would you your
+""".split())
+_EN_MIN_STOPWORDS = 2
+_EN_MIN_STOP_RATIO = 0.15
 
-def extract_keywords(text: str) -> List[str]:
-    """Extract nouns and verbs using POS tagging when available; fallback to simple heuristic."""
-    try:
-        words = text.split()
-        if pos_tag is not None:
-            try:
-                tags = pos_tag(words)
-                return [word.lower() for word, tag in tags if tag.startswith("NN") or tag.startswith("VB")]
-            except Exception as e:
-                logger.warning(f"POS tagging failed, falling back: {e}")
-        # Fallback: keep alpha tokens longer than 3 chars
-        return [w.lower() for w in words if len(w) > 3 and w.isalpha()]
-    except Exception as e:
-        logger.error(f"Keyword extraction failed: {e}")
-        return []
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
 
 
-def extract_entities(text: str) -> List[Dict]:
-    """Extract named entities with spaCy when available; otherwise empty."""
-    nlp = get_spacy()
-    if not nlp:
-        return []
-    try:
-        doc = nlp(text)
-        return [
-            {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char, "confidence": 1.0}
-            for ent in doc.ents
-        ]
-    except Exception:
-        return []
+def clean_text(text: str) -> str:
+    """Remove extra spaces and normalize text"""
+    return re.sub(r'\s+', ' ', text.strip())
 
 
-def detect_language(text: str) -> Tuple[str, float]:
-    """Detect language using langdetect"""
+def _entities_from_doc(doc) -> List[Dict]:
+    if doc is None:
+        return []
+    return [
+        {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char, "confidence": 1.0}
+        for ent in doc.ents
+    ]
+
+
+def _tokens_from_doc(doc) -> List[Tuple[str, str]]:
+    """(text, coarse POS) pairs from a spaCy doc"""
+    return [(tok.text, tok.pos_) for tok in doc if not tok.is_space]
+
+
+def _tokens_fallback(text: str) -> List[Tuple[str, str]]:
+    """Tokenize without spaCy; POS comes from NLTK when its tagger is available"""
+    words = _TOKEN_RE.findall(text)
+    if pos_tag is not None:
+        try:
+            return [(w, "NOUN" if t.startswith("NN") else "VERB" if t.startswith("VB") else t)
+                    for w, t in pos_tag(words)]
+        except Exception as e:
+            logger.warning(f"POS tagging failed, falling back: {e}")
+    return [(w, "") for w in words]
+
+
+def _keywords_from_tokens(tokens: List[Tuple[str, str]]) -> List[str]:
+    """Nouns and verbs when POS tags are known; otherwise alpha tokens longer than 3 chars"""
+    if any(pos for _, pos in tokens):
+        return [w.lower() for w, pos in tokens if pos in _KEYWORD_POS and any(c.isalnum() for c in w)]
+    return [w.lower() for w, _ in tokens if len(w) > 3 and w.isalpha()]
+
+
+def _language_from_tokens(tokens: List[Tuple[str, str]], text: str) -> Tuple[str, float]:
+    """
+    Deterministic language ID.
+
+    Text that is plain Latin script with at least _EN_MIN_STOPWORDS distinct
+    English function words, making up at least _EN_MIN_STOP_RATIO of its
+    words, is English with a confidence that grows with their share.
+    Everything else goes to langdetect, which is seeded so the same text
+    always gets the same answer, or is "unknown" without it.
+    """
+    words = [w.lower() for w, _ in tokens if w.isalpha()]
+    if not words:
+        return "unknown", 0.0
+    letters = "".join(words)
+    ascii_ratio = sum(c.isascii() for c in letters) / len(letters)
+    stopwords = [w for w in words if w in _EN_STOPWORDS]
+    stop_ratio = len(stopwords) / len(words)
+    if (ascii_ratio >= 0.95 and len(set(stopwords)) >= _EN_MIN_STOPWORDS
+            and stop_ratio >= _EN_MIN_STOP_RATIO):
+        return "en", round(min(0.99, 0.6 + stop_ratio), 4)
+    if detect_langs is None:
+        return "unknown", 0.0
     try:
-        langs = detect_langs(text)
-        best = langs[0]
+        best = detect_langs(text)[0]
         return best.lang, best.prob
     except Exception:
         return "unknown", 0.0
@@ -84,31 +129,123 @@ def generate_paraphrases(text: str) -> List[str]:
     return []  # Replace with actual logic if needed
 
 
-def preprocess_claim(text: str) -> Dict:
-    """Main pipeline to preprocess the input claim"""
-    cleaned = clean_text(text)
-    lang, confidence = detect_language(cleaned)
-    logger.info(f"🗣️ Language: {lang} ({confidence:.2f})")
+class _AnalysisCache:
+    """Thread-safe LRU of per-text analyses, keyed by the cleaned text"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
 
-    keywords = extract_keywords(cleaned)
-    logger.info(f"📦 Keywords: {keywords}")
+    def put(self, key: str, value: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
 
-    entities = extract_entities(cleaned)
-    logger.info(f"🏷️ Entities: {[e['text'] for e in entities]}")
 
-    paraphrases = generate_paraphrases(cleaned)
-    word_count = len(text.split())
-    sentence_count = len(re.findall(r'[.!?]', cleaned))
+_analysis_cache = _AnalysisCache(settings.PREPROCESS_CACHE_SIZE)
 
+
+def _analyze(cleaned: str, doc) -> Dict:
+    """Language, keywords and entities from a single tokenization of the text"""
+    tokens = _tokens_from_doc(doc) if doc is not None else _tokens_fallback(cleaned)
+    lang, confidence = _language_from_tokens(tokens, cleaned)
     return {
-        "original_text": text,
-        "cleaned_text": cleaned,
         "detected_language": lang,
         "language_confidence": confidence,
-        "entities": entities,
-        "keywords": keywords,
+        "keywords": _keywords_from_tokens(tokens),
+        "entities": _entities_from_doc(doc),
+    }
+
+
+def _build_preprocessing(text: str, cleaned: str, analysis: Dict) -> Dict:
+    logger.info(f"🗣️ Language: {analysis['detected_language']} ({analysis['language_confidence']:.2f})")
+    logger.info(f"📦 Keywords: {analysis['keywords']}")
+    logger.info(f"🏷️ Entities: {[e['text'] for e in analysis['entities']]}")
+
+    return {
+        "original_text": text,
+        "cleaned_text": cleaned,
+        "detected_language": analysis["detected_language"],
+        "language_confidence": analysis["language_confidence"],
+        "entities": [dict(e) for e in analysis["entities"]],
+        "keywords": list(analysis["keywords"]),
         "intent": "general_claim",
-        "paraphrases": paraphrases,
-        "word_count": word_count,
-        "sentence_count": sentence_count
+        "paraphrases": generate_paraphrases(cleaned),
+        "word_count": len(text.split()),
+        "sentence_count": len(re.findall(r'[.!?]', cleaned))
     }
+
+
+def _analyze_many(cleaned: List[str]) -> Dict[str, Dict]:
+    """Analyses for each distinct cleaned text: memo first, then one nlp.pipe pass over the rest"""
+    analyses: Dict[str, Dict] = {}
+    missing: List[str] = []
+    for c in dict.fromkeys(cleaned):
+        cached = _analysis_cache.get(c)
+        if cached is not None:
+            analyses[c] = cached
+        else:
+            missing.append(c)
+
+    if missing:
+        docs = [None] * len(missing)
+        nlp = get_spacy()
+        if nlp:
+            try:
+                docs = list(nlp.pipe(missing, disable=_SPACY_DISABLE, batch_size=settings.LLM_BATCH_SIZE))
+            except Exception as e:
+                logger.warning(f"Batched spaCy pass failed, using fallback tokenizer: {e}")
+                docs = [None] * len(missing)
+        for c, doc in zip(missing, docs):
+            analyses[c] = _analyze(c, doc)
+            _analysis_cache.put(c, analyses[c])
+    return analyses
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Nouns and verbs of the text (alpha tokens when no POS tagger is available)"""
+    cleaned = clean_text(text)
+    return list(_analyze_many([cleaned])[cleaned]["keywords"])
+
+
+def extract_entities(text: str) -> List[Dict]:
+    """Named entities from spaCy when available; otherwise empty."""
+    cleaned = clean_text(text)
+    return [dict(e) for e in _analyze_many([cleaned])[cleaned]["entities"]]
+
+
+def detect_language(text: str) -> Tuple[str, float]:
+    """Language code and confidence, deterministic for a given text"""
+    cleaned = clean_text(text)
+    analysis = _analyze_many([cleaned])[cleaned]
+    return analysis["detected_language"], analysis["language_confidence"]
+
+
+def preprocess_claim(text: str) -> Dict:
+    """Main pipeline to preprocess the input claim"""
+    return preprocess_batch([text])[0]
+
+
+def preprocess_batch(texts: List[str]) -> List[Dict]:
+    """
+    Preprocess several claims with one tokenization per distinct text.
+
+    Texts seen before are served from the memo; the rest go through spaCy in
+    a single nlp.pipe pass (tagger + NER only), and the same tokens feed
+    language ID, keyword extraction and entities.
+    """
+    cleaned = [clean_text(t) for t in texts]
+    analyses = _analyze_many(cleaned)
+    return [_build_preprocessing(text, c, analyses[c]) for text, c in zip(texts, cleaned)]
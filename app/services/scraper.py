@@ -1,16 +1,20 @@
 import logging
-import requests
+import os
+import sys
 from typing import List, Dict
 from urllib.parse import urlparse
 import re
 
-from app.core.config import settings
+from app.core.admission import DeadlineExceeded, with_deadline
+from app.core.cache import build_redis_cache
+from app.core.config import settings, get_cache_config
+from app.core.metrics import count_provider_error
 
 logger = logging.getLogger(__name__)
 
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (compatible; VeritasBot/1.0; +https://yourdomain.com/bot)"
-}
+# The search gateway lives with the LLM pipeline so both share one cache and quota ledger
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'LLM'))
+from search_gateway import configure_search_gateway, close_search_gateway, existing_search_gateway  # type: ignore
 
 # Known source mappings for better display names
 SOURCE_MAPPINGS = {
@@ -128,61 +132,104 @@ def extract_published_date(item: dict) -> str:
         logger.warning(f"Failed to extract date: {e}")
         return "Unknown"
 
+def _parse_search_items(data: dict, num_results: int) -> List[Dict]:
+    """Turn a Google CSE JSON response into article dicts"""
+    if "items" not in data:
+        logger.warning(f"⚠️ No items in response. Full response: {data}")
+        return []
+
+    articles = []
+    seen_links = set()
+    for item in data["items"][:num_results * 2]:  # over-fetch then filter
+        link = item.get("link")
+        if not link or link in seen_links:
+            continue
+        seen_links.add(link)
+        snippet = item.get("snippet", "") or ""
+        if len(snippet) < 80:  # low-content early skip
+            continue
+
+        # Extract source name from URL or displayLink
+        source = extract_source_name(item.get("link", ""), item.get("displayLink", ""))
+
+        articles.append({
+            "title": item.get("title"),
+            "snippet": snippet,
+            "link": link,
+            "source": source,
+            "displayLink": item.get("displayLink"),
+            "published_date": extract_published_date(item),
+        })
+
+        if len(articles) >= num_results:
+            break
+
+    logger.info(f"✅ Retrieved {len(articles)} articles.")
+    return articles
+
+
+def configure_search_clients():
+    """
+    Create the process-wide search gateway from the API settings
+
+    Called on application startup, before anything can create the gateway
+    from environment defaults.
+    """
+    return configure_search_gateway(
+        key_pairs=[
+            (settings.GOOGLE_API_KEY, settings.GOOGLE_CSE_ID),
+            (settings.GOOGLE_API_KEY_2, settings.GOOGLE_CSE_ID_2 or settings.GOOGLE_CSE_ID),
+            (settings.GOOGLE_API_KEY_NEW, settings.GOOGLE_CSE_ID),
+        ],
+        cache_path=settings.SEARCH_CACHE_PATH,
+        ttl=settings.SEARCH_CACHE_TTL,
+        daily_quota=settings.GOOGLE_CSE_DAILY_QUOTA,
+        reserve=settings.GOOGLE_CSE_QUOTA_RESERVE,
+        cooldown=settings.GOOGLE_KEY_COOLDOWN,
+        connect_timeout=settings.GOOGLE_CSE_CONNECT_TIMEOUT,
+        read_timeout=settings.GOOGLE_CSE_READ_TIMEOUT,
+        total_timeout=settings.REQUEST_TIMEOUT,
+        max_retries=settings.GOOGLE_CSE_MAX_RETRIES,
+        backoff_base=settings.GOOGLE_CSE_BACKOFF_BASE,
+        pool_size=settings.GOOGLE_CSE_POOL_SIZE,
+        shared_cache=build_redis_cache(get_cache_config(), namespace="search"),
+    )
+
+
+def _get_gateway():
+    return existing_search_gateway() or configure_search_clients()
+
+
+async def close_search_clients() -> None:
+    """Release the pooled connections on application shutdown"""
+    await close_search_gateway()
+
+
 def fetch_articles_from_google(query: str, num_results: int = 8) -> List[Dict]:
     """Fetches articles using Google Custom Search API"""
     logger.info(f"🌐 Querying Google CSE: {query}")
 
-    # Debug: Check if API credentials are loaded
-    logger.info(f"🔧 [SCRAPER] API Key present: {'Yes' if settings.GOOGLE_API_KEY else 'No'}")
-    logger.info(f"🔧 [SCRAPER] CSE ID present: {'Yes' if settings.GOOGLE_CSE_ID else 'No'}")
+    try:
+        data = _get_gateway().search_sync(query)
+        return _parse_search_items(data, num_results)
 
-    if not settings.GOOGLE_API_KEY or not settings.GOOGLE_CSE_ID:
-        logger.error("❌ Google API credentials not configured properly")
+    except Exception as e:
+        count_provider_error("google_cse")
+        logger.error(f"❌ Error fetching articles: {e}")
         return []
 
+
+async def fetch_articles_from_google_async(query: str, num_results: int = 8) -> List[Dict]:
+    """Async variant of fetch_articles_from_google that does not block the event loop"""
+    logger.info(f"🌐 Querying Google CSE (async): {query}")
+
     try:
-        url = (
-            f"https://www.googleapis.com/customsearch/v1?"
-            f"key={settings.GOOGLE_API_KEY}&cx={settings.GOOGLE_CSE_ID}&q={query}"
-        )
-
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()  # Raise HTTP errors early
-        data = response.json()
-
-        if "items" not in data:
-            logger.warning(f"⚠️ No items in response. Full response: {data}")
-            return []
-
-        articles = []
-        seen_links = set()
-        for item in data["items"][:num_results * 2]:  # over-fetch then filter
-            link = item.get("link")
-            if not link or link in seen_links:
-                continue
-            seen_links.add(link)
-            snippet = item.get("snippet", "") or ""
-            if len(snippet) < 80:  # low-content early skip
-                continue
-
-            # Extract source name from URL or displayLink
-            source = extract_source_name(item.get("link", ""), item.get("displayLink", ""))
-
-            articles.append({
-                "title": item.get("title"),
-                "snippet": snippet,
-                "link": link,
-                "source": source,
-                "displayLink": item.get("displayLink"),
-                "published_date": extract_published_date(item),
-            })
-
-            if len(articles) >= num_results:
-                break
-
-        logger.info(f"✅ Retrieved {len(articles)} articles.")
-        return articles
+        data = await with_deadline(_get_gateway().search(query))
+        return _parse_search_items(data, num_results)
 
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        count_provider_error("google_cse")
         logger.error(f"❌ Error fetching articles: {e}")
         return []
@@ -0,0 +1,119 @@
+"""
+Tests for the article matcher's stance scoring
+"""
+
+import numpy as np
+import pytest
+
+from app.services import matcher
+
+
+def test_nli_stance_is_entailment_minus_contradiction():
+    logits = np.array([0.5, 2.0, -1.0])  # [contradiction, entailment, neutral]
+    probs = np.exp(logits) / np.exp(logits).sum()
+    assert matcher._stance_from_nli(logits) == pytest.approx(probs[1] - probs[0])
+
+
+def test_nli_stance_sign_follows_the_winning_label():
+    # All-negative logits used to return the raw (negative) entailment logit
+    assert matcher._stance_from_nli(np.array([-4.0, -0.5, -3.0])) > 0.8
+    assert matcher._stance_from_nli(np.array([3.0, -2.0, -1.0])) < -0.8
+
+
+def test_nli_stance_is_neutral_when_neutral_dominates():
+    stance = matcher._stance_from_nli(np.array([-2.0, -1.5, 4.0]))
+    assert -0.2 < stance < 0.2
+
+
+def test_nli_stance_stays_in_range():
+    for row in ([50.0, -50.0, 0.0], [-50.0, 50.0, 0.0], [1e4, 1e4, 1e4], [7.5], [-7.5]):
+        assert -1.0 <= matcher._stance_from_nli(np.array(row)) <= 1.0
+
+
+class _FakeEmbedder:
+    """Embeds each known text as a fixed unit vector"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts, **kwargs):
+        rows = np.array([self.vectors[t] for t in texts], dtype=np.float32)
+        return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+class _FakeNLI:
+    def __init__(self, logits):
+        self.logits = logits
+        self.pairs = []
+
+    def predict(self, pairs, **kwargs):
+        self.pairs.extend(pairs)
+        return np.array([self.logits[text] for _, text in pairs])
+
+
+def _article(title):
+    return {"title": title, "content": ""}
+
+
+def test_prefiltered_pairs_keep_their_heuristic_stance(monkeypatch):
+    claim = "the bridge is not closed"
+    vectors = {claim: [1.0, 0.0], "bridge reopened": [0.9, 0.1], "bridge open today": [0.1, 1.0]}
+    nli = _FakeNLI({"bridge reopened": [-3.0, 3.0, 0.0]})
+    monkeypatch.setattr(matcher, "_embedder", lambda: _FakeEmbedder(vectors))
+    monkeypatch.setattr(matcher, "_nli_model", lambda: nli)
+    monkeypatch.setattr(matcher, "_fit_token_budget", lambda model, c, texts: [(t, len(t)) for t in texts])
+
+    close, far = _article("bridge reopened"), _article("bridge open today")
+    matcher.match_articles(claim, [close, far])
+
+    assert [text for _, text in nli.pairs] == ["bridge reopened"]
+    assert close["stance_score"] > 0.9
+    expected = matcher._stance_from_similarity(claim, "bridge open today", far["similarity_score"])
+    assert far["stance_score"] == pytest.approx(expected, abs=1e-4)
+    assert far["stance_score"] != 0.0
+
+
+def test_no_strong_matches_returns_top_five_of_the_callers_list(monkeypatch):
+    claim = "claim"
+    titles = [f"article {i}" for i in range(7)]
+    # Similarity to the claim grows with i, all below the neutral keep threshold
+    vectors = {claim: [1.0, 0.0]}
+    vectors.update({t: [0.3 + 0.05 * i, 1.0] for i, t in enumerate(titles)})
+    monkeypatch.setattr(matcher, "_embedder", lambda: _FakeEmbedder(vectors))
+    monkeypatch.setattr(matcher, "_nli_model", lambda: None)
+    monkeypatch.setattr(matcher, "_stance_from_similarity", lambda c, t, sim: 0.0)
+
+    articles = [_article(t) for t in titles] + [{"title": "", "content": ""}]
+    support, contradict = matcher.match_articles(claim, articles)
+
+    assert contradict == []
+    assert [a["title"] for a in support] == titles[::-1][:5]
+    # Sorted in place like the original matcher; text-less articles sink to the end
+    assert [a["title"] for a in articles[:7]] == titles[::-1]
+    assert articles[-1]["title"] == ""
+
+
+def test_chunked_scoring_matches_the_batch_split(monkeypatch):
+    claim = "the dam failed"
+    titles = ["dam failed overnight", "dam failed overnight!", "dam did not fail", "weather report"]
+    vectors = {claim: [1.0, 0.0], titles[0]: [1.0, 0.1], titles[1]: [1.0, 0.1],
+               titles[2]: [1.0, 0.3], titles[3]: [0.0, 1.0]}
+    monkeypatch.setattr(matcher, "_embedder", lambda: _FakeEmbedder(vectors))
+    monkeypatch.setattr(matcher, "_nli_model", lambda: None)
+
+    expected = matcher.match_articles(claim, [_article(t) for t in titles])
+
+    articles = [_article(t) for t in titles]
+    splitter = matcher.StanceSplitter()
+    events = []
+    for start in range(0, len(articles), 2):
+        kept, sims, stances = matcher.score_articles_batch([claim], [articles[start:start + 2]])
+        for article, sim, stance in zip(kept[0], sims[0], stances[0]):
+            events.append((splitter.add(article, sim, stance), article["title"]))
+    support, contradict = splitter.finish(articles)
+
+    assert [a["title"] for a in support] == [a["title"] for a in expected[0]]
+    assert [a["title"] for a in contradict] == [a["title"] for a in expected[1]]
+    # The near-duplicate title is dropped even though it arrived in the same chunk
+    assert events == [("supporting", titles[0]), (None, titles[1]),
+                      ("contradicting", titles[2]), (None, titles[3])]
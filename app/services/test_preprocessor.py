@@ -0,0 +1,70 @@
+"""
+Tests for claim preprocessing: language ID and keyword extraction
+"""
+
+import pytest
+
+from app.services import preprocessor
+
+
+def _tokens(text):
+    return [(w, "") for w in preprocessor._TOKEN_RE.findall(text)]
+
+
+def _language(text):
+    return preprocessor._language_from_tokens(_tokens(text), text)
+
+
+@pytest.fixture
+def no_langdetect(monkeypatch):
+    monkeypatch.setattr(preprocessor, "detect_langs", None)
+
+
+def test_english_function_words_short_circuit(no_langdetect):
+    lang, confidence = _language("The president said that the vaccine causes autism")
+    assert lang == "en"
+    assert 0.6 < confidence <= 0.99
+
+
+@pytest.mark.parametrize("text", [
+    "O presidente do Brasil disse que a vacina causa autismo",
+    "De minister is vandaag afgetreden na het schandaal",
+    "We hebben het over de verkiezingen gehad",
+    "Le vaccin est sûr selon les autorités",
+])
+def test_other_languages_are_not_read_as_english(no_langdetect, text):
+    assert _language(text) == ("unknown", 0.0)
+
+
+def test_one_function_word_is_not_enough(no_langdetect):
+    assert _language("The earth is flat") == ("unknown", 0.0)
+    assert _language("") == ("unknown", 0.0)
+
+
+def test_undecided_text_goes_to_langdetect(monkeypatch):
+    class _Guess:
+        lang, prob = "pt", 0.93
+
+    seen = []
+
+    def detect_langs(text):
+        seen.append(text)
+        return [_Guess()]
+
+    monkeypatch.setattr(preprocessor, "detect_langs", detect_langs)
+    text = "O presidente do Brasil disse que a vacina causa autismo"
+    assert _language(text) == ("pt", 0.93)
+    assert seen == [text]
+    # Clear English never reaches the detector
+    _language("They said that the bridge would not reopen")
+    assert len(seen) == 1
+
+
+def test_keywords_use_pos_tags_when_known():
+    tokens = [("NASA", "PROPN"), ("faked", "VERB"), ("the", "DET"), ("landing", "NOUN"), (".", "PUNCT")]
+    assert preprocessor._keywords_from_tokens(tokens) == ["nasa", "faked", "landing"]
+
+
+def test_keywords_without_a_tagger_are_long_alpha_tokens():
+    tokens = _tokens("The 5G towers spread the virus, NASA says.")
+    assert preprocessor._keywords_from_tokens(tokens) == ["towers", "spread", "virus", "nasa", "says"]
@@ -1,11 +1,13 @@
 import logging
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Tuple
 import uuid
 import time
 import os
 import sys
 
 from app.services import preprocessor, scraper, matcher
+from app.core.config import settings
+from app.core.metrics import observe_stage, stage_timer
 from app.models.schemas import VerificationRequest
 
 logger = logging.getLogger(__name__)
@@ -112,12 +114,14 @@ def verify_claim(request: VerificationRequest) -> Dict[str, Any]:
     pre_start = time.time()
     preprocessing = preprocessor.preprocess_claim(request.text)
     pre_elapsed = time.time() - pre_start
+    observe_stage("preprocess", pre_elapsed)
     logger.info(f"⏱️ Preprocessing time: {pre_elapsed:.2f}s")
 
     # Step 2: Fetch Articles
     logger.info("\n🔍 [STEP 2] Fetching Articles from Google...")
     search_query = " ".join(preprocessing["keywords"])
-    search_results = scraper.fetch_articles_from_google(query=search_query)
+    with stage_timer("search"):
+        search_results = scraper.fetch_articles_from_google(query=search_query)
     logger.info(f"📄 Total articles collected: {len(search_results)}")
 
     # Step 3: Match Articles
@@ -125,11 +129,155 @@ def verify_claim(request: VerificationRequest) -> Dict[str, Any]:
     match_start = time.time()
     support, contradict = matcher.match_articles(request.text, search_results)
     match_elapsed = time.time() - match_start
+    observe_stage("match", match_elapsed)
     logger.info(f"⏱️ Matching time: {match_elapsed:.2f}s")
 
+    return _build_result(claim_id, request.text, preprocessing, support, contradict, pre_elapsed + match_elapsed)
+
+
+async def verify_claim_async(request: VerificationRequest) -> Dict[str, Any]:
+    """
+    Event-loop friendly variant of verify_claim.
+
+    Preprocessing and matching run in the bounded CPU pool, and the article
+    search uses async HTTP, so the worker keeps serving other requests meanwhile.
+    """
+    from app.core.executor import run_cpu_bound
+
+    claim_id = str(uuid.uuid4())
+    logger.info(f"🆔 Verifying claim {claim_id}: {request.text}")
+
+    # Step 1: Preprocess
+    logger.info("\n🧠 [STEP 1] Preprocessing...")
+    pre_start = time.time()
+    preprocessing = await run_cpu_bound(preprocessor.preprocess_claim, request.text)
+    pre_elapsed = time.time() - pre_start
+    observe_stage("preprocess", pre_elapsed)
+    logger.info(f"⏱️ Preprocessing time: {pre_elapsed:.2f}s")
+
+    # Step 2: Fetch Articles
+    logger.info("\n🔍 [STEP 2] Fetching Articles from Google...")
+    search_query = " ".join(preprocessing["keywords"])
+    with stage_timer("search"):
+        search_results = await scraper.fetch_articles_from_google_async(query=search_query)
+    logger.info(f"📄 Total articles collected: {len(search_results)}")
+
+    # Step 3: Match Articles
+    logger.info("\n🤖 [STEP 3] Matching Claim with Articles...")
+    match_start = time.time()
+    support, contradict = await run_cpu_bound(matcher.match_articles, request.text, search_results)
+    match_elapsed = time.time() - match_start
+    observe_stage("match", match_elapsed)
+    logger.info(f"⏱️ Matching time: {match_elapsed:.2f}s")
+
+    return _build_result(claim_id, request.text, preprocessing, support, contradict, pre_elapsed + match_elapsed)
+
+
+async def verify_claims_batch_async(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Verify several claims together, amortizing model inference across the batch.
+
+    spaCy runs once over all claims, searches run concurrently, and matching
+    embeds and scores every claim/article pair in one batched call per model.
+    """
+    import asyncio
+    from app.core.executor import run_cpu_bound
+
+    logger.info(f"📦 Verifying batch of {len(texts)} claims")
+
+    pre_start = time.time()
+    preprocessings = await run_cpu_bound(preprocessor.preprocess_batch, texts)
+    pre_elapsed = time.time() - pre_start
+    observe_stage("preprocess_batch", pre_elapsed)
+
+    with stage_timer("search_batch"):
+        search_results = await asyncio.gather(*[
+            scraper.fetch_articles_from_google_async(query=" ".join(p["keywords"]))
+            for p in preprocessings
+        ])
+
+    match_start = time.time()
+    matches = await run_cpu_bound(matcher.match_articles_batch, texts, list(search_results))
+    match_elapsed = time.time() - match_start
+    observe_stage("match_batch", match_elapsed)
+    logger.info(f"⏱️ Batch preprocessing {pre_elapsed:.2f}s, matching {match_elapsed:.2f}s")
+
+    return [
+        _build_result(str(uuid.uuid4()), text, preprocessing, support, contradict, pre_elapsed + match_elapsed)
+        for text, preprocessing, (support, contradict) in zip(texts, preprocessings, matches)
+    ]
+
+
+async def verify_claim_stream(text: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the verification pipeline and yield (event, data) pairs as stages finish.
+
+    Events, in order: "preprocessing", "search", one "article" per matched
+    article, then "score" carrying the same payload verify_claim_async returns.
+    Articles are matched STREAM_MATCH_CHUNK_SIZE at a time, so the first
+    "article" events follow the search after one small batch instead of the
+    whole result list.
+    """
+    from app.core.executor import run_cpu_bound
+
+    claim_id = str(uuid.uuid4())
+    logger.info(f"🆔 Streaming verification {claim_id}: {text}")
+
+    pre_start = time.time()
+    preprocessing = await run_cpu_bound(preprocessor.preprocess_claim, text)
+    pre_elapsed = time.time() - pre_start
+    observe_stage("preprocess", pre_elapsed)
+    yield "preprocessing", {"claim_id": claim_id, **preprocessing}
+
+    with stage_timer("search"):
+        search_results = await scraper.fetch_articles_from_google_async(query=" ".join(preprocessing["keywords"]))
+    yield "search", {"claim_id": claim_id, "articles_found": len(search_results)}
+
+    splitter = matcher.StanceSplitter()
+    chunk_size = max(1, settings.STREAM_MATCH_CHUNK_SIZE)
+    match_elapsed = 0.0
+    for start in range(0, len(search_results), chunk_size):
+        match_start = time.time()
+        kept, sims, stances = await run_cpu_bound(
+            matcher.score_articles_batch, [text], [search_results[start:start + chunk_size]]
+        )
+        match_elapsed += time.time() - match_start
+        for article, sim_score, stance_score in zip(kept[0], sims[0], stances[0]):
+            stance = splitter.add(article, sim_score, stance_score)
+            if stance is not None:
+                yield "article", {"claim_id": claim_id, "stance": stance, **_transform_article(article)}
+    observe_stage("match", match_elapsed)
+
+    matched = bool(splitter.support or splitter.contradict)
+    support, contradict = splitter.finish(search_results)
+    if not matched:
+        # Fallback: the closest articles are reported as supporting context
+        for article in support:
+            yield "article", {"claim_id": claim_id, "stance": "supporting", **_transform_article(article)}
+
+    yield "score", _build_result(claim_id, text, preprocessing, support, contradict, pre_elapsed + match_elapsed)
+
+
+def _transform_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a matched search result like the ArticleInfo schema"""
+    return {
+        "url": article.get("link", ""),
+        "title": article.get("title", ""),
+        "content": article.get("snippet", ""),
+        "source": article.get("source", "Unknown"),
+        "published_date": article.get("published_date", "Unknown"),
+        "author": article.get("author"),
+        "similarity_score": article.get("similarity_score", 0.0)
+    }
+
+
+def _build_result(claim_id: str, claim_text: str, preprocessing: Dict[str, Any],
+                  support: list, contradict: list, elapsed: float) -> Dict[str, Any]:
+    """Score matched articles and assemble the verification response"""
     # Step 4: Weighted Score
     logger.info("\n🎯 [STEP 4] Calculating Weighted Scores...")
-    scores = _compute_weighted_scores(request.text, support, contradict)
+    with stage_timer("score"):
+        scores = _compute_weighted_scores(claim_text, support, contradict)
     truth_score = scores["truth"]
     confidence_score = scores["confidence"]
 
@@ -143,19 +291,8 @@ def verify_claim(request: VerificationRequest) -> Dict[str, Any]:
     logger.info(f"⚖️ Verdict: {verdict}")
 
     # Transform articles to match ArticleInfo schema
-    def transform_article(article):
-        return {
-            "url": article.get("link", ""),
-            "title": article.get("title", ""),
-            "content": article.get("snippet", ""),
-            "source": article.get("source", "Unknown"),
-            "published_date": article.get("published_date", "Unknown"),
-            "author": article.get("author"),
-            "similarity_score": article.get("similarity_score", 0.0)
-        }
-
-    transformed_support = [transform_article(article) for article in support]
-    transformed_contradict = [transform_article(article) for article in contradict]
+    transformed_support = [_transform_article(article) for article in support]
+    transformed_contradict = [_transform_article(article) for article in contradict]
 
     return {
         "claim_id": claim_id,
@@ -165,5 +302,5 @@ def verify_claim(request: VerificationRequest) -> Dict[str, Any]:
         "verdict": verdict,
         "matching_articles": transformed_support,
         "contradicting_articles": transformed_contradict,
-        "processing_time": round(pre_elapsed + match_elapsed, 2)
+        "processing_time": round(elapsed, 2)
     }
@@ -0,0 +1,83 @@
+"""
+Near-duplicate detection for article titles using MinHash + LSH
+"""
+
+import zlib
+from difflib import SequenceMatcher
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    text = " ".join(text.lower().split())
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    Finds near-duplicate titles in roughly constant time per lookup.
+
+    Titles are reduced to character 3-gram shingles and a MinHash signature,
+    which is split into LSH bands. Only titles sharing at least one band bucket
+    are compared with SequenceMatcher, so the `threshold` keeps the same ratio
+    semantics as a full pairwise scan without its O(n^2) cost.
+    """
+
+    def __init__(self, threshold: float = 0.92, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        self._titles: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._last: Tuple[str, np.ndarray] = ("", np.empty(0, dtype=np.uint64))
+
+    def _signature(self, title: str) -> np.ndarray:
+        # is_duplicate() followed by add() for the same title hashes it only once
+        if self._last[0] == title and self._last[1].size:
+            return self._last[1]
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) for s in _shingles(title)), dtype=np.uint64
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        signature = permuted.min(axis=1)
+        self._last = (title, signature)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, ...]]:
+        return [
+            tuple(signature[band * self.rows:(band + 1) * self.rows].tolist())
+            for band in range(self.bands)
+        ]
+
+    def is_duplicate(self, title: str) -> bool:
+        """True if an indexed title is at least `threshold` similar to this one"""
+        if title.lower() in self._exact:
+            return True
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(self._signature(title))):
+            candidates.update(self._buckets[band].get(key, ()))
+        return any(
+            SequenceMatcher(a=title.lower(), b=self._titles[i].lower()).ratio() >= self.threshold
+            for i in candidates
+        )
+
+    def add(self, title: str) -> None:
+        idx = len(self._titles)
+        self._titles.append(title)
+        self._exact.setdefault(title.lower(), idx)
+        for band, key in enumerate(self._band_keys(self._signature(title))):
+            self._buckets[band].setdefault(key, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self._titles)
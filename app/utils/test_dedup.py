@@ -0,0 +1,52 @@
+"""
+Tests for MinHash/LSH near-duplicate title detection
+"""
+
+from difflib import SequenceMatcher
+
+import pytest
+
+from app.utils.dedup import NearDuplicateIndex
+
+
+def test_exact_and_case_only_duplicates():
+    index = NearDuplicateIndex()
+    index.add("Moon landing was real, NASA says")
+    assert index.is_duplicate("Moon landing was real, NASA says")
+    assert index.is_duplicate("moon LANDING was real, nasa says")
+    assert len(index) == 1
+
+
+def test_near_duplicates_are_found_and_distinct_titles_are_not():
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("Scientists confirm the Moon landing was not staged")
+    assert index.is_duplicate("Scientists confirm the Moon landing was not staged!")
+    assert not index.is_duplicate("Stock markets fall sharply after rate hike")
+
+
+def test_agrees_with_a_pairwise_scan():
+    titles = [
+        "Vaccine trial shows 95% efficacy", "Vaccine trial shows 95% efficacy.",
+        "Vaccine trial shows 90% efficacy", "New vaccine trial results published",
+        "Election results delayed in three states", "Election results delayed in 3 states",
+        "Heavy rain floods city centre", "Heavy rain floods the city centre",
+    ]
+    threshold = 0.92
+    index = NearDuplicateIndex(threshold=threshold)
+    kept, expected = [], []
+    for title in titles:
+        if not index.is_duplicate(title):
+            index.add(title)
+            kept.append(title)
+        if not any(SequenceMatcher(a=title.lower(), b=k.lower()).ratio() >= threshold for k in expected):
+            expected.append(title)
+    assert kept == expected
+
+
+def test_short_titles_and_bad_band_counts():
+    index = NearDuplicateIndex()
+    index.add("ab")
+    assert index.is_duplicate("AB")
+    assert not index.is_duplicate("cd")
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=32)